@@ -0,0 +1,62 @@
+# bench_word_filter.py
+# Compara o filtro compilado do AutoMod (utils/word_filter.py) com a verificação
+# ingênua `palavra in mensagem` para listas de tamanhos diferentes.
+# Uso: python bench_word_filter.py
+import random
+import string
+import time
+
+from utils.word_filter import CompiledFilter
+
+random.seed(42)
+
+MESSAGES = 2000
+
+
+def random_word(min_len=4, max_len=10):
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(min_len, max_len)))
+
+
+def naive_search(content, words, domains):
+    """O que um filtro simples faria: um `in` por termo, a cada mensagem."""
+    lowered = content.lower()
+    for word in words:
+        if word in lowered:
+            return "word", word
+    for domain in domains:
+        if domain in lowered:
+            return "domain", domain
+    return None
+
+
+def bench(term_count):
+    words = [random_word() for _ in range(term_count)]
+    domains = [f"{random_word()}.com" for _ in range(term_count // 10)]
+    messages = [" ".join(random_word(2, 8) for _ in range(random.randint(5, 40))) for _ in range(MESSAGES)]
+
+    start = time.perf_counter()
+    compiled = CompiledFilter(words, domains)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for message in messages:
+        naive_search(message, words, domains)
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for message in messages:
+        compiled.search(message)
+    compiled_time = time.perf_counter() - start
+
+    print(
+        f"{term_count:>6} termos | compilação: {compile_time * 1000:8.2f} ms | "
+        f"ingênuo: {naive_time / MESSAGES * 1e6:9.2f} µs/msg | "
+        f"compilado: {compiled_time / MESSAGES * 1e6:7.2f} µs/msg | "
+        f"{naive_time / compiled_time:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    print(f"Verificando {MESSAGES} mensagens aleatórias por tamanho de lista:")
+    for count in (10, 100, 1000, 5000):
+        bench(count)
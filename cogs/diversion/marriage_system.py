@@ -6,6 +6,7 @@ import asyncio
 import logging
 
 from database import execute_query
+from utils.user_cache import UserResolver
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -311,12 +312,14 @@ class MarriageSystem(commands.Cog):
             color=discord.Color.gold()
         )
 
-        for p1_id, p2_id, married_at_str in marriages:
-            partner1 = interaction.guild.get_member(p1_id)
-            partner2 = interaction.guild.get_member(p2_id)
+        # Resolve todos os parceiros de uma vez (cache + buscas em paralelo)
+        names = await self.bot.user_resolver.resolve_many(
+            [user_id for p1_id, p2_id, _ in marriages for user_id in (p1_id, p2_id)], interaction.guild
+        )
 
-            p1_name = partner1.mention if partner1 else f"Usuário Desconhecido (ID: {p1_id})"
-            p2_name = partner2.mention if partner2 else f"Usuário Desconhecido (ID: {p2_id})"
+        for p1_id, p2_id, married_at_str in marriages:
+            p1_name = UserResolver.label(p1_id, names)
+            p2_name = UserResolver.label(p2_id, names)
             
             married_at = datetime.datetime.strptime(married_at_str, '%Y-%m-%d %H:%M:%S')
             timestamp_unix = int(married_at.timestamp())
@@ -0,0 +1,171 @@
+# cogs/events/audit_log_ingester.py
+import discord
+from discord.ext import commands, tasks
+import datetime
+import logging
+from typing import Optional
+
+from database import execute_query, execute_many
+
+logger = logging.getLogger(__name__)
+
+# Intervalo de gravação das entradas recebidas em tempo real
+FLUSH_INTERVAL_SECONDS = 5
+# Acima disso, as entradas pendentes são gravadas imediatamente
+FLUSH_BATCH_SIZE = 100
+# Intervalo da varredura de recuperação (entradas perdidas durante quedas/reconexões)
+CATCH_UP_INTERVAL_MINUTES = 15
+# Máximo de entradas lidas por guild em cada varredura; o restante fica para a próxima
+CATCH_UP_LIMIT = 1000
+
+INSERT_QUERY = (
+    "INSERT OR IGNORE INTO moderation_logs (guild_id, action, target_id, moderator_id, reason, timestamp, duration, audit_entry_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+CURSOR_QUERY = (
+    "INSERT INTO audit_log_cursors (guild_id, last_entry_id) VALUES (?, ?) "
+    "ON CONFLICT(guild_id) DO UPDATE SET last_entry_id = MAX(last_entry_id, excluded.last_entry_id)"
+)
+_MISSING = object()
+
+
+def _format_timeout(delta: datetime.timedelta) -> str:
+    seconds = max(int(delta.total_seconds()), 0)
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes = rest // 60
+    return "".join(f"{value}{unit}" for value, unit in ((days, "d"), (hours, "h"), (minutes, "m")) if value) or f"{seconds}s"
+
+
+def audit_entry_to_row(entry: discord.AuditLogEntry) -> Optional[tuple]:
+    """Converte uma entrada de auditoria numa linha de moderation_logs, ou None se não for uma ação de moderação."""
+    target_id = getattr(entry.target, "id", None)
+    moderator_id = entry.user.id if entry.user else entry.user_id
+    if target_id is None or moderator_id is None:
+        return None
+
+    duration = None
+    if entry.action == discord.AuditLogAction.ban:
+        action = "ban"
+    elif entry.action == discord.AuditLogAction.unban:
+        action = "unban"
+    elif entry.action == discord.AuditLogAction.kick:
+        action = "kick"
+    elif entry.action == discord.AuditLogAction.member_update:
+        timed_out_until = getattr(entry.after, "timed_out_until", _MISSING)
+        if timed_out_until is _MISSING:
+            return None # Atualização de apelido, etc.
+        if timed_out_until:
+            action, duration = "mute", _format_timeout(timed_out_until - entry.created_at)
+        else:
+            action = "unmute"
+    else:
+        return None
+
+    timestamp = entry.created_at.astimezone(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    return (entry.guild.id, action, target_id, moderator_id, entry.reason, timestamp, duration, entry.id)
+
+
+class AuditLogIngester(commands.Cog):
+    """
+    Importa para moderation_logs as ações de moderação feitas fora do bot (pela interface do Discord ou outros bots).
+
+    - Em tempo real: on_audit_log_entry_create enfileira a entrada; as pendentes são gravadas em lote.
+    - Recuperação: periodicamente, cada guild é lida a partir do seu cursor (última entrada importada),
+      nunca desde o início do registro. Só a varredura avança o cursor, porque ela lê em ordem sem lacunas;
+      entradas já gravadas em tempo real são ignoradas pelo índice único de audit_entry_id.
+    - Ações feitas pelo próprio bot são ignoradas: os comandos já as registram.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.cursors: dict[int, int] = dict(execute_query("SELECT guild_id, last_entry_id FROM audit_log_cursors", fetchall=True) or [])
+        self._pending: list[tuple] = []
+        self.flush_pending.start()
+        self.catch_up.start()
+        logger.info(f"Cog de Importação do Registro de Auditoria inicializada ({len(self.cursors)} cursores).")
+
+    async def cog_unload(self):
+        self.catch_up.cancel()
+        self.flush_pending.cancel()
+        self._flush()
+
+    def _is_own_action(self, entry: discord.AuditLogEntry) -> bool:
+        return (entry.user_id or getattr(entry.user, "id", None)) == self.bot.user.id
+
+    def _flush(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        if execute_many(INSERT_QUERY, rows) is False:
+            logger.error(f"Falha ao gravar {len(rows)} entradas de auditoria; serão recuperadas na próxima varredura.")
+        else:
+            logger.info(f"{len(rows)} entradas do registro de auditoria gravadas em moderation_logs.")
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        if self._is_own_action(entry):
+            return
+        row = audit_entry_to_row(entry)
+        if row:
+            self._pending.append(row)
+            if len(self._pending) >= FLUSH_BATCH_SIZE:
+                self._flush()
+            if row[1] == "ban":
+                # Banimentos feitos pela interface do Discord também são replicados no grupo de ban sync.
+                # Só no caminho em tempo real: a varredura de recuperação não propaga banimentos antigos.
+                ban_sync = self.bot.get_cog("BanSync")
+                if ban_sync:
+                    ban_sync.propagate(entry.guild.id, [row[2]], entry.reason, row[3])
+
+    @tasks.loop(seconds=FLUSH_INTERVAL_SECONDS)
+    async def flush_pending(self):
+        self._flush()
+
+    async def catch_up_guild(self, guild: discord.Guild) -> int:
+        """Lê as entradas posteriores ao cursor da guild (da mais antiga para a mais nova) e avança o cursor."""
+        if not guild.me.guild_permissions.view_audit_log:
+            return 0
+        cursor = self.cursors.get(guild.id, 0)
+        rows, last_id = [], cursor
+        try:
+            async for entry in guild.audit_logs(limit=CATCH_UP_LIMIT, after=discord.Object(id=cursor), oldest_first=True):
+                last_id = max(last_id, entry.id)
+                if self._is_own_action(entry):
+                    continue
+                row = audit_entry_to_row(entry)
+                if row:
+                    rows.append(row)
+        except discord.Forbidden:
+            return 0
+        except discord.HTTPException as e:
+            logger.warning(f"Erro ao ler o registro de auditoria da guild {guild.id}: {e}")
+            # Grava o que já foi lido; o cursor avança só até ali
+
+        if rows and execute_many(INSERT_QUERY, rows) is False:
+            return 0 # O cursor não avança: as entradas serão lidas de novo na próxima varredura
+        if last_id > cursor:
+            execute_query(CURSOR_QUERY, (guild.id, last_id))
+            self.cursors[guild.id] = last_id
+        return len(rows)
+
+    @tasks.loop(minutes=CATCH_UP_INTERVAL_MINUTES)
+    async def catch_up(self):
+        imported = 0
+        for guild in self.bot.guilds:
+            try:
+                imported += await self.catch_up_guild(guild)
+            except Exception as e:
+                logger.error(f"Erro na varredura do registro de auditoria da guild {guild.id}: {e}", exc_info=True)
+        if imported:
+            logger.info(f"Varredura do registro de auditoria: {imported} entradas importadas.")
+
+    @catch_up.before_loop
+    async def before_catch_up(self):
+        await self.bot.wait_until_ready()
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot: commands.Bot):
+    """Adiciona o cog de Importação do Registro de Auditoria ao bot."""
+    await bot.add_cog(AuditLogIngester(bot))
+    logger.info("Cog de Importação do Registro de Auditoria configurada e adicionada ao bot.")
@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands, ui
 import datetime
 import logging
@@ -9,6 +9,7 @@ import re
 # Importa a função execute_query do seu módulo database
 # Certifique-se de que 'database' está configurado corretamente e acessível.
 from database import execute_query
+from utils.persistent_views import PanelType
 
 # Configuração de logging (garante que o logging seja configurado, se não estiver globalmente)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -39,6 +40,32 @@ def parse_duration(duration_str: str) -> datetime.timedelta:
         raise ValueError("A duração máxima para silenciamento é de 28 dias.")
     return datetime.timedelta(seconds=seconds)
 
+def build_panel_embed(settings: dict) -> discord.Embed:
+    """Monta o embed do painel anti-raid a partir das configurações (usado no setup, refresh e restauração)."""
+    enabled = settings['enabled']
+    min_age_hours = settings['min_account_age_hours']
+    burst_threshold = settings['join_burst_threshold']
+    burst_time = settings['join_burst_time_seconds']
+
+    status = "Ativado" if enabled else "Desativado"
+    color = discord.Color.green() if enabled else discord.Color.red()
+
+    min_age_days_display = max(0, min_age_hours // 24) # Agora pode ser 0 dias para desativar
+    age_unit = "dias" if min_age_days_display != 1 else "dia"
+
+    burst_threshold_display = f"{burst_threshold} membros" if burst_threshold > 0 else "Desativado"
+    burst_time_display = f"em {burst_time} segundos" if burst_threshold > 0 else ""
+
+    embed = discord.Embed(
+        title="Painel Proteção Anti-Raid",
+        description=f"Status: **{status}**\n\nGerencie as configurações do sistema Anti-Raid.",
+        color=color
+    )
+    embed.add_field(name="Idade Mínima da Conta", value=f"{min_age_days_display} {age_unit}", inline=False)
+    embed.add_field(name="Limite de Entradas por Burst", value=f"{burst_threshold_display} {burst_time_display}".strip(), inline=False)
+    embed.set_footer(text="Use os botões abaixo para gerenciar.")
+    return embed
+
 # --- Modals ---
 class RaidProtectionSettingsModal(ui.Modal, title="Configurações Proteção Anti-Raid"):
     """Modal para configurar as definições da proteção anti-raid."""
@@ -213,29 +240,7 @@ class RaidProtectionPanelView(ui.View):
             logging.error(f"[refresh_panel] Erro inesperado ao buscar mensagem {message_id} durante refresh: {e}", exc_info=True)
             return
 
-        current_settings = self._load_settings() # Carrega as configurações mais recentes
-        enabled = current_settings['enabled']
-        min_age_hours = current_settings['min_account_age_hours']
-        burst_threshold = current_settings['join_burst_threshold']
-        burst_time = current_settings['join_burst_time_seconds']
-
-        status = "Ativado" if enabled else "Desativado"
-        color = discord.Color.green() if enabled else discord.Color.red()
-
-        min_age_days_display = max(0, min_age_hours // 24) # Agora pode ser 0 dias para desativar
-        age_unit = "dias" if min_age_days_display != 1 else "dia"
-
-        burst_threshold_display = f"{burst_threshold} membros" if burst_threshold > 0 else "Desativado"
-        burst_time_display = f"em {burst_time} segundos" if burst_threshold > 0 else ""
-
-        embed = discord.Embed(
-            title="Painel Proteção Anti-Raid",
-            description=f"Status: **{status}**\n\nGerencie as configurações do sistema Anti-Raid.",
-            color=color
-        )
-        embed.add_field(name="Idade Mínima da Conta", value=f"{min_age_days_display} {age_unit}", inline=False)
-        embed.add_field(name="Limite de Entradas por Burst", value=f"{burst_threshold_display} {burst_time_display}".strip(), inline=False)
-        embed.set_footer(text="Use os botões abaixo para gerenciar.")
+        embed = build_panel_embed(self._load_settings()) # Carrega as configurações mais recentes
 
         # Re-cria a View para garantir que ela esteja sempre atualizada e persistente
         # É crucial que a instância da View no `bot.add_view` seja a mesma que você está usando
@@ -324,62 +329,42 @@ class RaidProtectionPanelView(ui.View):
 class RaidProtectionSystem(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Inicia a tarefa para garantir as views persistentes ao iniciar o bot
-        self.ensure_persistent_views.start()
+        # Os painéis persistentes são restaurados pelo registro central (em paralelo com os demais painéis)
+        self.bot.persistent_views.register(PanelType(
+            name="raid_protection",
+            load_rows=self._load_panel_rows,
+            make_view=lambda guild_id: RaidProtectionPanelView(self.bot, guild_id),
+            cleanup_query="DELETE FROM anti_raid_settings WHERE guild_id IN ({placeholders})",
+            per_message=True,
+            on_restore=self._restore_panel
+        ))
         logging.info("Cog 'RaidProtectionSystem' carregada com sucesso.")
 
     def cog_unload(self):
-        """Para a tarefa quando a cog é descarregada."""
-        self.ensure_persistent_views.cancel()
-        logging.info("Cog 'RaidProtectionSystem' descarregada. Tarefa de persistência cancelada.")
-
-    @tasks.loop(count=1) # Executa apenas uma vez após o bot estar pronto
-    async def ensure_persistent_views(self):
-        await self.bot.wait_until_ready()
-        logging.info("Tentando carregar painéis Proteção Anti-Raid persistentes...")
-        panel_datas = execute_query("SELECT guild_id, channel_id, message_id FROM anti_raid_settings", fetchall=True)
-        logging.info(f"[ensure_persistent_views] Dados lidos do DB: {panel_datas}") 
-        
-        if panel_datas:
-            for guild_id, channel_id, message_id in panel_datas:
-                if channel_id is None or message_id is None:
-                    logging.warning(f"[ensure_persistent_views] Pulando entrada inválida no DB para guild {guild_id} (channel_id ou message_id é None). Removendo do DB.")
-                    execute_query("DELETE FROM anti_raid_settings WHERE guild_id = ?", (guild_id,))
-                    continue 
-                
-                try:
-                    guild = self.bot.get_guild(guild_id)
-                    if not guild:
-                        logging.warning(f"[ensure_persistent_views] Guild {guild_id} não encontrada para painel persistente. Removendo do DB.")
-                        execute_query("DELETE FROM anti_raid_settings WHERE guild_id = ?", (guild_id,))
-                        continue
-                    
-                    channel = await guild.fetch_channel(channel_id)
-                    if not isinstance(channel, discord.TextChannel):
-                        logging.warning(f"[ensure_persistent_views] Canal {channel_id} não é de texto para painel persistente na guild {guild_id}. Removendo do DB.")
-                        execute_query("DELETE FROM anti_raid_settings WHERE guild_id = ?", (guild_id,))
-                        continue
-
-                    message = await channel.fetch_message(message_id)
-                    
-                    # Crie a View e adicione ao bot para persistência
-                    view = RaidProtectionPanelView(self.bot, guild_id)
-                    view.message = message 
-                    self.bot.add_view(view, message_id=message.id)
-                    
-                    # Opcional: Atualizar o embed da mensagem no carregamento para garantir que ele reflita o estado atual
-                    await view.refresh_panel(guild_id, self.bot) # Garante que o painel mostre as configs atuais
-                    
-                    logging.info(f"Painel Proteção Anti-Raid persistente carregado para guild {guild_id} no canal {channel_id}, mensagem {message_id}.")
-                except discord.NotFound:
-                    logging.warning(f"Mensagem do painel Proteção Anti-Raid ({message_id}) ou canal ({channel_id}) não encontrada. Removendo do DB para evitar carregamentos futuros.")
-                    execute_query("DELETE FROM anti_raid_settings WHERE guild_id = ?", (guild_id,))
-                except discord.Forbidden:
-                    logging.error(f"Bot sem permissão para acessar o canal {channel_id} ou mensagem {message_id} na guild {guild_id}. Não foi possível carregar o painel persistente.")
-                except Exception as e:
-                    logging.error(f"Erro inesperado ao carregar painel persistente para guild {guild_id}, mensagem {message_id}: {e}", exc_info=True)
-        else:
-            logging.info("Nenhum painel Proteção Anti-Raid persistente para carregar.")
+        """Remove o painel do registro quando a cog é descarregada."""
+        self.bot.persistent_views.unregister("raid_protection")
+        logging.info("Cog 'RaidProtectionSystem' descarregada. Painel removido do registro de views persistentes.")
+
+    def _load_panel_rows(self):
+        # As configurações vêm junto para que a restauração não precise de uma query por guild
+        return execute_query(
+            "SELECT guild_id, channel_id, message_id, enabled, min_account_age_hours, join_burst_threshold, join_burst_time_seconds FROM anti_raid_settings",
+            fetchall=True
+        )
+
+    async def _restore_panel(self, view: RaidProtectionPanelView, channel: discord.TextChannel, row: tuple) -> bool:
+        """Atualiza o embed do painel com as configurações atuais, sem buscar a mensagem antes (uma única chamada à API)."""
+        guild_id, channel_id, message_id, enabled, min_age_hours, burst_threshold, burst_time = row
+        message = channel.get_partial_message(message_id)
+        view.message = message
+        await message.edit(embed=build_panel_embed({
+            'enabled': bool(enabled),
+            'min_account_age_hours': min_age_hours,
+            'join_burst_threshold': burst_threshold,
+            'join_burst_time_seconds': burst_time
+        }), view=view)
+        logging.info(f"Painel Proteção Anti-Raid persistente carregado para guild {guild_id} no canal {channel_id}, mensagem {message_id}.")
+        return True
 
     # Evento de entrada de membro
     @commands.Cog.listener()
@@ -545,23 +530,12 @@ class RaidProtectionSystem(commands.Cog):
 
 
         # Cria o embed e a view para o novo painel
-        min_age_days_display = max(0, min_age_hours // 24)
-        age_unit = "dias" if min_age_days_display != 1 else "dia"
-
-        status = "Ativado" if enabled else "Desativado"
-        color = discord.Color.green() if enabled else discord.Color.red()
-
-        burst_threshold_display = f"{burst_threshold} membros" if burst_threshold > 0 else "Desativado"
-        burst_time_display = f"em {burst_time} segundos" if burst_threshold > 0 else ""
-
-        embed = discord.Embed(
-            title="Painel Proteção Anti-Raid",
-            description=f"Status: **{status}**\n\nGerencie as configurações do sistema Anti-Raid.",
-            color=color
-        )
-        embed.add_field(name="Idade Mínima da Conta", value=f"{min_age_days_display} {age_unit}", inline=False)
-        embed.add_field(name="Limite de Entradas por Burst", value=f"{burst_threshold_display} {burst_time_display}".strip(), inline=False)
-        embed.set_footer(text="Use os botões abaixo para gerenciar.")
+        embed = build_panel_embed({
+            'enabled': bool(enabled),
+            'min_account_age_hours': min_age_hours,
+            'join_burst_threshold': burst_threshold,
+            'join_burst_time_seconds': burst_time
+        })
 
         view = RaidProtectionPanelView(self.bot, guild_id) # Cria a nova View
         
@@ -0,0 +1,175 @@
+# cogs/moderation/automod.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import logging
+from typing import Optional, Literal
+
+from database import execute_query
+from utils.word_filter import CompiledFilter, normalize_word, normalize_domain
+
+logger = logging.getLogger(__name__)
+
+# Limite de termos por guild (a regex compilada continua rápida, mas evita abusos)
+MAX_TERMS_PER_GUILD = 2000
+
+
+class AutoMod(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        # Cache: guild_id -> CompiledFilter (ou None se a guild não tiver termos bloqueados).
+        # Só é recompilado quando a lista da guild muda (a entrada é invalidada pelos comandos).
+        self._filters: dict[int, Optional[CompiledFilter]] = {}
+        logger.info("Cog de AutoMod inicializada.")
+
+    def _get_filter(self, guild_id: int) -> Optional[CompiledFilter]:
+        """Retorna o filtro compilado da guild, compilando-o a partir do DB apenas se não estiver em cache."""
+        if guild_id in self._filters:
+            return self._filters[guild_id]
+
+        rows = execute_query(
+            "SELECT kind, term FROM automod_blocked_terms WHERE guild_id = ?",
+            (guild_id,), fetchall=True
+        ) or []
+        words = [term for kind, term in rows if kind == "word"]
+        domains = [term for kind, term in rows if kind == "domain"]
+        compiled = CompiledFilter(words, domains) if rows else None
+        self._filters[guild_id] = compiled
+        logger.info(f"Filtro do AutoMod compilado para guild {guild_id}: {len(words)} palavras, {len(domains)} domínios.")
+        return compiled
+
+    def invalidate(self, guild_id: int):
+        """Descarta o filtro compilado da guild; ele será recompilado na próxima mensagem."""
+        self._filters.pop(guild_id, None)
+
+    async def _check_message(self, message: discord.Message):
+        if not message.guild or message.author.bot or not message.content:
+            return
+        if isinstance(message.author, discord.Member) and message.author.guild_permissions.manage_messages:
+            return # Moderadores não são filtrados
+
+        compiled = self._get_filter(message.guild.id)
+        if not compiled:
+            return
+        hit = compiled.search(message.content)
+        if not hit:
+            return
+
+        kind, matched = hit
+        kind_label = "palavra" if kind == "word" else "domínio"
+        try:
+            await message.delete()
+        except discord.NotFound:
+            return # Já foi apagada
+        except discord.Forbidden:
+            logger.warning(f"Sem permissão para apagar mensagem filtrada pelo AutoMod no canal {message.channel.id} da guild {message.guild.id}.")
+            return
+        except Exception as e:
+            logger.error(f"Erro ao apagar mensagem filtrada pelo AutoMod na guild {message.guild.id}: {e}", exc_info=True)
+            return
+
+        execute_query(
+            "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason) VALUES (?, ?, ?, ?, ?)",
+            (message.guild.id, "automod", message.author.id, self.bot.user.id, f"AutoMod: termo bloqueado ({kind_label}: {matched}) em #{message.channel.name}")
+        )
+        logger.info(f"AutoMod apagou mensagem de {message.author.id} no canal {message.channel.id} da guild {message.guild.id} ({kind}: {matched}).")
+
+        try:
+            await message.channel.send(f"🚫 {message.author.mention}, sua mensagem foi removida por conter um(a) {kind_label} bloqueado(a).", delete_after=5)
+        except discord.Forbidden:
+            pass
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        await self._check_message(message)
+
+    @commands.Cog.listener()
+    async def on_message_edit(self, before: discord.Message, after: discord.Message):
+        if before.content != after.content:
+            await self._check_message(after)
+
+    @commands.hybrid_group(name="automod", description="Comandos para gerenciar o filtro de palavras e domínios.")
+    @commands.has_permissions(manage_guild=True)
+    @app_commands.default_permissions(manage_guild=True)
+    async def automod_group(self, ctx: commands.Context):
+        """Comandos para gerenciar o filtro de palavras e domínios."""
+        if ctx.invoked_subcommand is None:
+            await ctx.send("Comando inválido para o AutoMod. Use `add`, `remove` ou `list`.", ephemeral=True)
+
+    @automod_group.command(name="add", description="Bloqueia uma palavra/frase ou um domínio.")
+    @commands.has_permissions(manage_guild=True)
+    @app_commands.describe(
+        kind="Tipo do termo: 'word' (palavra ou frase) ou 'domain' (domínio de link).",
+        term="A palavra, frase ou domínio a ser bloqueado."
+    )
+    async def add_term(self, ctx: commands.Context, kind: Literal["word", "domain"], *, term: str):
+        normalized = normalize_word(term) if kind == "word" else normalize_domain(term)
+        if not normalized:
+            return await ctx.send("❌ Termo inválido. Domínios devem ser como `exemplo.com`.", ephemeral=True)
+
+        count = execute_query("SELECT COUNT(*) FROM automod_blocked_terms WHERE guild_id = ?", (ctx.guild.id,), fetchone=True)
+        if count and count[0] >= MAX_TERMS_PER_GUILD:
+            return await ctx.send(f"⚠️ Limite de {MAX_TERMS_PER_GUILD} termos bloqueados atingido.", ephemeral=True)
+
+        execute_query(
+            "INSERT OR IGNORE INTO automod_blocked_terms (guild_id, kind, term, added_by_id) VALUES (?, ?, ?, ?)",
+            (ctx.guild.id, kind, normalized, ctx.author.id)
+        )
+        self.invalidate(ctx.guild.id)
+        await ctx.send(f"✅ `{normalized}` adicionado ao filtro ({kind}).", ephemeral=True)
+        logger.info(f"Termo '{normalized}' ({kind}) bloqueado na guild {ctx.guild.id} por {ctx.author.id}.")
+
+    @automod_group.command(name="remove", description="Remove uma palavra/frase ou domínio do filtro.")
+    @commands.has_permissions(manage_guild=True)
+    @app_commands.describe(
+        kind="Tipo do termo: 'word' ou 'domain'.",
+        term="O termo a ser removido."
+    )
+    async def remove_term(self, ctx: commands.Context, kind: Literal["word", "domain"], *, term: str):
+        normalized = normalize_word(term) if kind == "word" else normalize_domain(term)
+        exists = normalized and execute_query(
+            "SELECT 1 FROM automod_blocked_terms WHERE guild_id = ? AND kind = ? AND term = ?",
+            (ctx.guild.id, kind, normalized), fetchone=True
+        )
+        if not exists:
+            return await ctx.send("⚠️ Este termo não está no filtro.", ephemeral=True)
+
+        execute_query(
+            "DELETE FROM automod_blocked_terms WHERE guild_id = ? AND kind = ? AND term = ?",
+            (ctx.guild.id, kind, normalized)
+        )
+        self.invalidate(ctx.guild.id)
+        await ctx.send(f"✅ `{normalized}` removido do filtro.", ephemeral=True)
+        logger.info(f"Termo '{normalized}' ({kind}) removido do filtro da guild {ctx.guild.id} por {ctx.author.id}.")
+
+    @staticmethod
+    def _field_value(items: list[str], empty: str) -> str:
+        """Junta os termos para um campo de embed (limitado a 1024 caracteres)."""
+        value = ", ".join(items)
+        if not value:
+            return empty
+        return value if len(value) <= 1024 else value[:1021] + "..."
+
+    @automod_group.command(name="list", description="Lista os termos bloqueados do servidor.")
+    @commands.has_permissions(manage_guild=True)
+    async def list_terms(self, ctx: commands.Context):
+        rows = execute_query(
+            "SELECT kind, term FROM automod_blocked_terms WHERE guild_id = ? ORDER BY kind, term",
+            (ctx.guild.id,), fetchall=True
+        )
+        if not rows:
+            return await ctx.send("ℹ️ Nenhum termo bloqueado neste servidor.", ephemeral=True)
+
+        words = [f"`{term}`" for kind, term in rows if kind == "word"]
+        domains = [f"`{term}`" for kind, term in rows if kind == "domain"]
+        embed = discord.Embed(title="Filtro do AutoMod", color=discord.Color.dark_orange())
+        embed.add_field(name=f"Palavras ({len(words)})", value=self._field_value(words, "Nenhuma"), inline=False)
+        embed.add_field(name=f"Domínios ({len(domains)})", value=self._field_value(domains, "Nenhum"), inline=False)
+        await ctx.send(embed=embed, ephemeral=True)
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot):
+    """Adiciona o cog de AutoMod ao bot."""
+    await bot.add_cog(AutoMod(bot))
+    logger.info("Cog de AutoMod configurada e adicionada ao bot.")
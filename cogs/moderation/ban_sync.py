@@ -0,0 +1,312 @@
+# cogs/moderation/ban_sync.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import logging
+import secrets
+from typing import NamedTuple, Optional
+
+from database import execute_query
+from utils.rate_limit import RateLimiter, run_limited
+from cogs.moderation.mass_actions import log_moderation_actions
+
+logger = logging.getLogger(__name__)
+
+# Workers que consomem a fila de propagação (cada um atende uma guild de destino por vez)
+BAN_SYNC_WORKERS = 4
+# Chamadas à API de banimento por segundo, somando todos os workers
+BAN_SYNC_RATE_PER_SECOND = 10
+# O endpoint de banimento em massa aceita até 200 usuários por chamada
+BAN_SYNC_CHUNK_SIZE = 200
+# Novas tentativas de um job inteiro (ex: guild indisponível), além das repetições de 429/5xx do run_limited
+MAX_JOB_ATTEMPTS = 3
+JOB_RETRY_BASE_SECONDS = 30
+
+
+class BanSyncJob(NamedTuple):
+    target_guild_id: int
+    user_ids: tuple[int, ...]
+    reason: str
+    source_guild_id: int
+    moderator_id: int
+    attempt: int = 0
+
+
+class BanSync(commands.Cog):
+    """
+    Sincronização de banimentos entre servidores de uma mesma rede.
+
+    Guilds entram num grupo com um código. Um banimento registrado numa guild do grupo (BanModal, /massban
+    ou o importador do registro de auditoria) vira um job por guild de destino numa fila em memória,
+    consumida por alguns workers com um RateLimiter compartilhado. Listas grandes usam o banimento em massa
+    (200 por chamada) quando o bot tem 'Gerenciar Servidor' no destino. Cada banimento propagado é
+    registrado uma vez em moderation_logs da guild de destino; as ações do próprio bot não são reimportadas
+    pelo importador de auditoria, então a propagação não volta em loop.
+    A guild dona do grupo pode remover membros e trocar o código; se ela sair, a posse passa ao membro mais antigo.
+    """
+    ban_sync = app_commands.Group(
+        name="bansync",
+        description="Sincroniza banimentos entre servidores de uma mesma rede.",
+        default_permissions=discord.Permissions(administrator=True)
+    )
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.limiter = RateLimiter(BAN_SYNC_RATE_PER_SECOND)
+        self.queue: asyncio.Queue[BanSyncJob] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self.group_of: dict[int, int] = {} # guild_id -> group_id
+        self.members: dict[int, set[int]] = {} # group_id -> guild_ids
+        self._load()
+
+    def _load(self):
+        self.group_of.clear()
+        self.members.clear()
+        for guild_id, group_id in execute_query("SELECT guild_id, group_id FROM ban_sync_members", fetchall=True) or []:
+            self.group_of[guild_id] = group_id
+            self.members.setdefault(group_id, set()).add(guild_id)
+        logger.info(f"Sincronização de banimentos: {len(self.members)} grupos, {len(self.group_of)} servidores.")
+
+    async def cog_load(self):
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(BAN_SYNC_WORKERS)]
+
+    async def cog_unload(self):
+        for task in self._workers:
+            task.cancel()
+        if not self.queue.empty():
+            logger.warning(f"Sincronização de banimentos descarregada com {self.queue.qsize()} jobs pendentes.")
+
+    # --- Propagação ---
+    def propagate(self, source_guild_id: int, user_ids: list[int], reason: Optional[str], moderator_id: int) -> int:
+        """Enfileira os banimentos para as outras guilds do grupo da origem. Retorna o número de guilds de destino."""
+        group_id = self.group_of.get(source_guild_id)
+        if group_id is None or not user_ids:
+            return 0
+        targets = self.members.get(group_id, set()) - {source_guild_id}
+        source = self.bot.get_guild(source_guild_id)
+        sync_reason = f"[Ban sync de {source.name if source else source_guild_id}] {reason or 'Sem razão'}"[:512]
+        for target_guild_id in targets:
+            self.queue.put_nowait(BanSyncJob(target_guild_id, tuple(user_ids), sync_reason, source_guild_id, moderator_id))
+        if targets:
+            logger.info(f"Ban sync: {len(user_ids)} banimentos da guild {source_guild_id} enfileirados para {len(targets)} guilds.")
+        return len(targets)
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run_job(job)
+            except Exception as e:
+                logger.error(f"Erro no worker {index} da sincronização de banimentos (guild {job.target_guild_id}): {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    def _retry_later(self, job: BanSyncJob, user_ids: tuple[int, ...], error: Exception):
+        if job.attempt + 1 >= MAX_JOB_ATTEMPTS:
+            logger.error(f"Ban sync para a guild {job.target_guild_id} desistiu de {len(user_ids)} usuários após {MAX_JOB_ATTEMPTS} tentativas: {error}")
+            return
+        delay = JOB_RETRY_BASE_SECONDS * 2 ** job.attempt
+        retry = job._replace(user_ids=user_ids, attempt=job.attempt + 1)
+        asyncio.get_running_loop().call_later(delay, self.queue.put_nowait, retry)
+        logger.warning(f"Ban sync para a guild {job.target_guild_id}: {len(user_ids)} usuários serão tentados de novo em {delay}s ({error}).")
+
+    async def _run_job(self, job: BanSyncJob):
+        guild = self.bot.get_guild(job.target_guild_id)
+        if guild is None:
+            self._retry_later(job, job.user_ids, RuntimeError("guild indisponível"))
+            return
+        permissions = guild.me.guild_permissions
+        if not permissions.ban_members:
+            logger.warning(f"Ban sync: sem permissão para banir na guild {guild.id}; {len(job.user_ids)} banimentos descartados.")
+            return
+
+        # Membros acima do bot não podem ser banidos; não adianta tentar
+        user_ids = [
+            user_id for user_id in job.user_ids
+            if not ((member := guild.get_member(user_id)) and (member.id == guild.owner_id or member.top_role >= guild.me.top_role))
+        ]
+        banned: list[int] = []
+        transient: list[int] = []
+
+        if permissions.manage_guild:
+            # O endpoint em lote também serve para um único ID: ele informa quem já estava banido,
+            # evitando um segundo registro quando o mesmo usuário chega por outra guild do grupo
+            chunks = [user_ids[i:i + BAN_SYNC_CHUNK_SIZE] for i in range(0, len(user_ids), BAN_SYNC_CHUNK_SIZE)]
+            results = await run_limited(
+                chunks, lambda chunk: guild.bulk_ban([discord.Object(id=user_id) for user_id in chunk], reason=job.reason, delete_message_seconds=0),
+                concurrency=1, limiter=self.limiter
+            )
+            for chunk, result in results:
+                if isinstance(result, discord.Forbidden):
+                    continue
+                if isinstance(result, Exception):
+                    transient.extend(chunk)
+                else:
+                    # Usuários já banidos voltam em 'failed': não há nada a registrar para eles
+                    banned.extend(user.id for user in result.banned)
+        else:
+            # Sem o endpoint em lote: guild.ban responde 204 também para quem já está banido,
+            # então cada usuário é consultado antes, para não registrar o mesmo banimento de novo
+            async def ban_if_not_banned(user_id: int) -> bool:
+                target = discord.Object(id=user_id)
+                try:
+                    await guild.fetch_ban(target)
+                    return False # Já banido
+                except discord.NotFound:
+                    pass
+                await guild.ban(target, reason=job.reason, delete_message_seconds=0)
+                return True
+
+            results = await run_limited(user_ids, ban_if_not_banned, concurrency=2, limiter=self.limiter)
+            for user_id, result in results:
+                if isinstance(result, (discord.Forbidden, discord.NotFound)):
+                    continue
+                if isinstance(result, Exception):
+                    transient.append(user_id)
+                elif result is True:
+                    banned.append(user_id)
+
+        log_moderation_actions([(guild.id, "ban", user_id, job.moderator_id, job.reason, None) for user_id in banned])
+        if transient:
+            self._retry_later(job, tuple(transient), RuntimeError("erros da API"))
+        logger.info(f"Ban sync: {len(banned)}/{len(job.user_ids)} banimentos aplicados na guild {guild.id} (origem {job.source_guild_id}).")
+
+    # --- Comandos ---
+    def _group_info(self, group_id: int) -> Optional[tuple]:
+        return execute_query("SELECT name, owner_guild_id, join_code FROM ban_sync_groups WHERE group_id = ?", (group_id,), fetchone=True)
+
+    def _is_owner(self, guild_id: int) -> bool:
+        group_id = self.group_of.get(guild_id)
+        info = self._group_info(group_id) if group_id is not None else None
+        return bool(info) and info[1] == guild_id
+
+    def _remove_member(self, guild_id: int):
+        """
+        Remove a guild do grupo. Se ela era a dona, a posse passa para o membro mais antigo;
+        se era o último membro, o grupo deixa de existir.
+        """
+        execute_query("DELETE FROM ban_sync_members WHERE guild_id = ?", (guild_id,))
+        execute_query("""
+            UPDATE ban_sync_groups SET owner_guild_id = (
+                SELECT m.guild_id FROM ban_sync_members m WHERE m.group_id = ban_sync_groups.group_id ORDER BY m.joined_at, m.guild_id LIMIT 1
+            )
+            WHERE owner_guild_id NOT IN (SELECT m.guild_id FROM ban_sync_members m WHERE m.group_id = ban_sync_groups.group_id)
+              AND EXISTS (SELECT 1 FROM ban_sync_members m WHERE m.group_id = ban_sync_groups.group_id)
+        """)
+        execute_query("DELETE FROM ban_sync_groups WHERE group_id NOT IN (SELECT group_id FROM ban_sync_members)")
+        self._load()
+
+    @ban_sync.command(name="create", description="Cria um grupo de sincronização de banimentos com este servidor.")
+    @app_commands.describe(name="Nome do grupo (ex: nome da sua rede de servidores).")
+    async def create(self, interaction: discord.Interaction, name: app_commands.Range[str, 1, 64]):
+        if interaction.guild.id in self.group_of:
+            return await interaction.response.send_message("⚠️ Este servidor já participa de um grupo. Use `/bansync leave` primeiro.", ephemeral=True)
+        join_code = secrets.token_urlsafe(9)
+        execute_query(
+            "INSERT INTO ban_sync_groups (name, owner_guild_id, join_code) VALUES (?, ?, ?)",
+            (name, interaction.guild.id, join_code)
+        )
+        group_id = execute_query("SELECT group_id FROM ban_sync_groups WHERE join_code = ?", (join_code,), fetchone=True)[0]
+        execute_query("INSERT INTO ban_sync_members (guild_id, group_id) VALUES (?, ?)", (interaction.guild.id, group_id))
+        self._load()
+        await interaction.response.send_message(
+            f"✅ Grupo **{name}** criado. Nos outros servidores da rede, um administrador deve usar:\n`/bansync join code:{join_code}`\n"
+            "⚠️ Guarde este código: quem o tiver pode inscrever um servidor no grupo. Se ele vazar, use `/bansync rotate_code` e `/bansync kick`.",
+            ephemeral=True
+        )
+        logger.info(f"Grupo de ban sync {group_id} ('{name}') criado pela guild {interaction.guild.id}.")
+
+    @ban_sync.command(name="join", description="Entra num grupo de sincronização de banimentos com um código.")
+    @app_commands.describe(code="Código do grupo (gerado por /bansync create).")
+    async def join(self, interaction: discord.Interaction, code: str):
+        if interaction.guild.id in self.group_of:
+            return await interaction.response.send_message("⚠️ Este servidor já participa de um grupo. Use `/bansync leave` primeiro.", ephemeral=True)
+        group = execute_query("SELECT group_id, name FROM ban_sync_groups WHERE join_code = ?", (code.strip(),), fetchone=True)
+        if not group:
+            return await interaction.response.send_message("❌ Código inválido.", ephemeral=True)
+        group_id, name = group
+        execute_query("INSERT INTO ban_sync_members (guild_id, group_id) VALUES (?, ?)", (interaction.guild.id, group_id))
+        self._load()
+        await interaction.response.send_message(
+            f"✅ Este servidor entrou no grupo **{name}** ({len(self.members[group_id])} servidores). "
+            "Banimentos feitos aqui serão replicados nos outros servidores do grupo, e vice-versa.",
+            ephemeral=True
+        )
+        logger.info(f"Guild {interaction.guild.id} entrou no grupo de ban sync {group_id}.")
+
+    @ban_sync.command(name="leave", description="Sai do grupo de sincronização de banimentos.")
+    async def leave(self, interaction: discord.Interaction):
+        group_id = self.group_of.get(interaction.guild.id)
+        if group_id is None:
+            return await interaction.response.send_message("ℹ️ Este servidor não participa de nenhum grupo.", ephemeral=True)
+        self._remove_member(interaction.guild.id)
+        info = self._group_info(group_id)
+        new_owner = self.bot.get_guild(info[1]) if info else None
+        await interaction.response.send_message(
+            "✅ Este servidor saiu do grupo de sincronização de banimentos."
+            + (f" A administração do grupo passou para **{new_owner.name if new_owner else info[1]}**." if info else ""),
+            ephemeral=True
+        )
+        logger.info(f"Guild {interaction.guild.id} saiu do grupo de ban sync {group_id}" + (f"; dono atual: {info[1]}." if info else "; grupo removido."))
+
+    @ban_sync.command(name="kick", description="Remove um servidor do grupo (apenas o servidor dono do grupo).")
+    @app_commands.describe(guild_id="ID do servidor a remover (veja /bansync status).")
+    async def kick(self, interaction: discord.Interaction, guild_id: str):
+        group_id = self.group_of.get(interaction.guild.id)
+        if group_id is None or not self._is_owner(interaction.guild.id):
+            return await interaction.response.send_message("🚫 Apenas o servidor dono do grupo pode remover membros.", ephemeral=True)
+        try:
+            target_guild_id = int(guild_id)
+        except ValueError:
+            return await interaction.response.send_message("❌ `guild_id` deve ser um ID de servidor.", ephemeral=True)
+        if target_guild_id == interaction.guild.id:
+            return await interaction.response.send_message("⚠️ Para tirar este servidor do grupo, use `/bansync leave`.", ephemeral=True)
+        if self.group_of.get(target_guild_id) != group_id:
+            return await interaction.response.send_message("❌ Este servidor não faz parte do seu grupo.", ephemeral=True)
+        self._remove_member(target_guild_id)
+        target = self.bot.get_guild(target_guild_id)
+        await interaction.response.send_message(
+            f"✅ **{target.name if target else target_guild_id}** foi removido do grupo. "
+            "Considere usar `/bansync rotate_code` se o código de entrada vazou.",
+            ephemeral=True
+        )
+        logger.info(f"Guild {target_guild_id} removida do grupo de ban sync {group_id} pela guild dona {interaction.guild.id}.")
+
+    @ban_sync.command(name="rotate_code", description="Gera um novo código de entrada para o grupo (apenas o servidor dono do grupo).")
+    async def rotate_code(self, interaction: discord.Interaction):
+        group_id = self.group_of.get(interaction.guild.id)
+        if group_id is None or not self._is_owner(interaction.guild.id):
+            return await interaction.response.send_message("🚫 Apenas o servidor dono do grupo pode trocar o código.", ephemeral=True)
+        join_code = secrets.token_urlsafe(9)
+        execute_query("UPDATE ban_sync_groups SET join_code = ? WHERE group_id = ?", (join_code, group_id))
+        await interaction.response.send_message(
+            f"✅ Novo código de entrada: `{join_code}`\nO código anterior deixou de funcionar; os servidores que já participam continuam no grupo.",
+            ephemeral=True
+        )
+        logger.info(f"Código de entrada do grupo de ban sync {group_id} trocado pela guild {interaction.guild.id}.")
+
+    @ban_sync.command(name="status", description="Mostra o grupo de sincronização deste servidor.")
+    async def status(self, interaction: discord.Interaction):
+        group_id = self.group_of.get(interaction.guild.id)
+        if group_id is None:
+            return await interaction.response.send_message("ℹ️ Este servidor não participa de nenhum grupo. Use `/bansync create` ou `/bansync join`.", ephemeral=True)
+        info = self._group_info(group_id)
+        name, owner_guild_id = (info[0], info[1]) if info else ("?", None)
+        embed = discord.Embed(title=f"Ban Sync: {name}", color=discord.Color.dark_red())
+        embed.description = "\n".join(
+            f"• {guild.name if (guild := self.bot.get_guild(guild_id)) else 'Servidor indisponível'} (`{guild_id}`)"
+            + (" 👑" if guild_id == owner_guild_id else "")
+            for guild_id in sorted(self.members.get(group_id, ()))
+        )
+        embed.set_footer(text=f"Jobs pendentes na fila: {self.queue.qsize()}")
+        if info and interaction.guild.id == owner_guild_id:
+            embed.add_field(name="Código de entrada", value=f"||`{info[2]}`||", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot: commands.Bot):
+    """Adiciona o cog de Sincronização de Banimentos ao bot."""
+    await bot.add_cog(BanSync(bot))
+    logger.info("Cog de Sincronização de Banimentos configurada e adicionada ao bot.")
@@ -2,49 +2,155 @@
 import discord
 from discord.ext import commands
 import logging
-from database import execute_query
-import asyncio
+from database import execute_query, execute_many
+from utils.rate_limit import RateLimiter, run_limited
+from utils.expiry_scheduler import ExpiryScheduler
+from cogs.moderation.lockdown_state import LockdownState, LockedChannel
 import time
 from typing import Optional 
 from discord import app_commands # Adicionado: Importa app_commands
 
 logger = logging.getLogger(__name__)
 
+# Lockdown do servidor: quantas edições de canal ficam em andamento ao mesmo tempo
+# e quantas são iniciadas por segundo (abaixo do limite global de 50 req/s do Discord)
+BULK_CONCURRENCY = 8
+BULK_RATE_PER_SECOND = 20
+
 class LockdownCore(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         logger.info("Cog de Lockdown Core inicializada.")
-        self.lockdown_tasks = {} # Para gerenciar lockdowns temporários
+        self.limiter = RateLimiter(BULK_RATE_PER_SECOND) # Compartilhado entre todas as guilds
+        # Índice em memória do estado de lockdown (também usado pelo painel de lockdown)
+        self.state = LockdownState()
+        self.state.load()
+        # Um único agendador para todos os lockdowns temporários (em vez de uma task por canal)
+        self.unlock_scheduler = ExpiryScheduler(self._expire_lockdown, name="lockdown")
+
+    async def cog_load(self):
+        self.unlock_scheduler.start()
+
+    async def cog_unload(self):
+        self.unlock_scheduler.stop()
+
+    def _snapshot_overwrites(self, channels: list[discord.TextChannel]):
+        """
+        Salva o overwrite atual de @everyone de cada canal ANTES do lockdown.
+        Snapshots existentes não são sobrescritos (reaplicar o lockdown não perde o estado original).
+        """
+        rows = []
+        for channel in channels:
+            overwrite = channel.overwrites_for(channel.guild.default_role)
+            allow, deny = overwrite.pair()
+            rows.append((channel.id, channel.guild.id, not overwrite.is_empty(), allow.value, deny.value))
+        execute_many(
+            "INSERT OR IGNORE INTO lockdown_overwrite_snapshots (channel_id, guild_id, had_overwrite, allow_value, deny_value) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _load_snapshots(self, guild_id: int) -> dict[int, tuple]:
+        """Retorna channel_id -> (had_overwrite, allow_value, deny_value) para todos os snapshots da guild."""
+        rows = execute_query(
+            "SELECT channel_id, had_overwrite, allow_value, deny_value FROM lockdown_overwrite_snapshots WHERE guild_id = ?",
+            (guild_id,), fetchall=True
+        ) or []
+        return {row[0]: row[1:] for row in rows}
+
+    def _locked_overwrite(self, channel: discord.TextChannel) -> discord.PermissionOverwrite:
+        """Overwrite de @everyone com send_messages negado, mantendo o resto do overwrite do canal."""
+        overwrite = channel.overwrites_for(channel.guild.default_role)
+        overwrite.send_messages = False
+        return overwrite
+
+    def _restored_overwrite(self, channel: discord.TextChannel, snapshot: Optional[tuple]) -> discord.PermissionOverwrite:
+        """Overwrite de @everyone salvo no snapshot (vazio se o canal não tinha um)."""
+        if snapshot is None:
+            # Sem snapshot (lockdown feito antes dos snapshots existirem): apenas volta send_messages a herdar
+            overwrite = channel.overwrites_for(channel.guild.default_role)
+            overwrite.send_messages = None
+            return overwrite
+        had_overwrite, allow_value, deny_value = snapshot
+        if had_overwrite:
+            return discord.PermissionOverwrite.from_pair(discord.Permissions(allow_value), discord.Permissions(deny_value))
+        return discord.PermissionOverwrite()
+
+    def _needs_edit(self, channel: discord.TextChannel, desired: discord.PermissionOverwrite) -> bool:
+        """Compara o overwrite de @everyone em cache com o desejado; só há edição se forem diferentes."""
+        return channel.overwrites_for(channel.guild.default_role).pair() != desired.pair()
 
-    async def _update_channel_permissions(self, channel: discord.TextChannel, locked: bool):
+    async def _set_everyone_overwrite(self, channel: discord.TextChannel, overwrite: discord.PermissionOverwrite, reason: str):
+        await channel.set_permissions(channel.guild.default_role, overwrite=None if overwrite.is_empty() else overwrite, reason=reason)
+
+    async def _apply_lock(self, channel: discord.TextChannel) -> bool:
+        """Bloqueia o canal. Retorna False (sem chamar a API) se ele já estava bloqueado."""
+        desired = self._locked_overwrite(channel)
+        if not self._needs_edit(channel, desired):
+            return False
+        await self._set_everyone_overwrite(channel, desired, "Lockdown ativado.")
+        return True
+
+    async def _restore_overwrite(self, channel: discord.TextChannel, snapshot: Optional[tuple]) -> bool:
+        """Restaura exatamente o overwrite salvo. Retorna False (sem chamar a API) se ele já estava assim."""
+        desired = self._restored_overwrite(channel, snapshot)
+        if not self._needs_edit(channel, desired):
+            return False
+        await self._set_everyone_overwrite(channel, desired, "Lockdown desativado.")
+        return True
+
+    async def _reconcile(self, targets: list[tuple[discord.TextChannel, discord.PermissionOverwrite]], reason: str):
+        """
+        Leva cada canal ao overwrite desejado, editando apenas os que realmente diferem (em paralelo e
+        respeitando o limiter). Retorna (editados, chamadas poupadas, [(canal, exceção)]).
+        """
+        edits = [(channel, desired) for channel, desired in targets if self._needs_edit(channel, desired)]
+        saved = len(targets) - len(edits)
+        results = await run_limited(
+            edits, lambda edit: self._set_everyone_overwrite(edit[0], edit[1], reason),
+            concurrency=BULK_CONCURRENCY, limiter=self.limiter
+        )
+        failed = [(edit[0], result) for edit, result in results if isinstance(result, Exception)]
+        return len(edits) - len(failed), saved, failed
+
+    async def _update_channel_permissions(self, channel: discord.TextChannel, locked: bool, snapshot: bool = True):
         """
         Atualiza as permissões de envio de mensagens para o @everyone.
+        Ao bloquear, salva antes o overwrite atual (a menos que snapshot=False, ex: ao reaplicar um lockdown existente);
+        ao desbloquear, restaura o overwrite salvo.
         """
-        everyone_role = channel.guild.default_role
-        
         if locked:
-            # Sobrescrever a permissão de @everyone para remover permissão de enviar mensagens
-            # Permissões.send_messages deve ser False para lockdown
-            await channel.set_permissions(everyone_role, send_messages=False, reason="Lockdown ativado.")
+            if snapshot:
+                self._snapshot_overwrites([channel])
+            await self._apply_lock(channel)
         else:
-            # Remover a sobrescrita para @everyone ou definir como None (herdar)
-            # Neste caso, queremos definir como None para que o canal volte ao normal
-            # ou herde as permissões da categoria.
-            await channel.set_permissions(everyone_role, send_messages=None, reason="Lockdown desativado.")
+            saved = execute_query(
+                "SELECT had_overwrite, allow_value, deny_value FROM lockdown_overwrite_snapshots WHERE channel_id = ?",
+                (channel.id,), fetchone=True
+            )
+            await self._restore_overwrite(channel, saved)
+            execute_query("DELETE FROM lockdown_overwrite_snapshots WHERE channel_id = ?", (channel.id,))
         
-    async def _add_locked_channel_to_db(self, channel_id: int, guild_id: int, locked_until: Optional[int], reason: Optional[str], locked_by_id: int):
-        """Adiciona um canal bloqueado ao banco de dados."""
-        execute_query(
-            "INSERT OR REPLACE INTO locked_channels (channel_id, guild_id, locked_until_timestamp, reason, locked_by_id) VALUES (?, ?, ?, ?, ?)",
-            (channel_id, guild_id, locked_until, reason, locked_by_id)
-        )
+    async def _add_locked_channel_to_db(self, channel_id: int, guild_id: int, locked_until: Optional[int], reason: Optional[str], locked_by_id: int) -> bool:
+        """Adiciona um canal bloqueado ao banco de dados. Retorna False se não foi possível persistir."""
+        if not self.state.add_locks([LockedChannel(channel_id, guild_id, locked_until, reason, locked_by_id)]):
+            return False
         logger.info(f"Canal {channel_id} do guild {guild_id} adicionado ao DB como bloqueado.")
+        return True
 
     async def _remove_locked_channel_from_db(self, channel_id: int):
         """Remove um canal bloqueado do banco de dados."""
-        execute_query("DELETE FROM locked_channels WHERE channel_id = ?", (channel_id,))
+        self.state.remove_locks([channel_id])
+        execute_query("DELETE FROM lockdown_overwrite_snapshots WHERE channel_id = ?", (channel_id,))
+        self.unlock_scheduler.cancel(channel_id) # Cancela o desbloqueio agendado, se houver
         logger.info(f"Canal {channel_id} removido do DB de canais bloqueados.")
 
+    def _remove_locked_channels_from_db(self, channel_ids: list[int]):
+        """Remove vários canais (e seus snapshots) do banco de dados em lote."""
+        self.state.remove_locks(channel_ids)
+        execute_many("DELETE FROM lockdown_overwrite_snapshots WHERE channel_id = ?", [(channel_id,) for channel_id in channel_ids])
+        for channel_id in channel_ids:
+            self.unlock_scheduler.cancel(channel_id)
+
     @commands.hybrid_command(name="lockdown", description="Ativa o modo de lockdown para o canal atual ou especificado.")
     @commands.has_permissions(manage_channels=True)
     @commands.bot_has_permissions(manage_channels=True)
@@ -56,8 +162,8 @@ class LockdownCore(commands.Cog):
     async def lockdown(self, ctx: commands.Context, channel: Optional[discord.TextChannel] = None, duration: Optional[str] = None, *, reason: Optional[str] = "Nenhuma razão fornecida."):
         channel = channel or ctx.channel
         
-        # Verificar se o canal já está bloqueado no DB
-        if execute_query("SELECT channel_id FROM locked_channels WHERE channel_id = ?", (channel.id,), fetchone=True):
+        # Verificar se o canal já está bloqueado
+        if self.state.is_locked(channel.id):
             return await ctx.send(f"⚠️ O canal {channel.mention} já está em lockdown!")
 
         locked_until_timestamp = None
@@ -69,15 +175,15 @@ class LockdownCore(commands.Cog):
             
         await self._update_channel_permissions(channel, True)
         
-        # Adicionar ao DB
-        await self._add_locked_channel_to_db(channel.id, ctx.guild.id, locked_until_timestamp, reason, ctx.author.id)
+        # Adicionar ao DB; sem persistência, o bloqueio seria perdido num reinício: desfaz
+        if not await self._add_locked_channel_to_db(channel.id, ctx.guild.id, locked_until_timestamp, reason, ctx.author.id):
+            await self._update_channel_permissions(channel, False)
+            return await ctx.send(f"❌ Não foi possível salvar o lockdown de {channel.mention} no banco de dados. O canal não foi bloqueado.")
 
         if duration:
             await ctx.send(f"🔒 {channel.mention} colocado em lockdown por {duration} devido a: {reason}. Eu irei desbloqueá-lo automaticamente.")
-            # Iniciar tarefa de desbloqueio agendado
-            self.lockdown_tasks[channel.id] = self.bot.loop.create_task(
-                self._timed_unlock(channel, seconds)
-            )
+            # Agendar desbloqueio
+            self.unlock_scheduler.schedule(channel.id, locked_until_timestamp)
         else:
             await ctx.send(f"🔒 {channel.mention} colocado em lockdown indefinidamente devido a: {reason}.")
         logger.info(f"Canal {channel.id} em {ctx.guild.id} bloqueado por {ctx.author.id}. Duração: {duration}, Razão: {reason}")
@@ -92,35 +198,266 @@ class LockdownCore(commands.Cog):
     async def unlock(self, ctx: commands.Context, channel: Optional[discord.TextChannel] = None):
         channel = channel or ctx.channel
 
-        # Verificar se o canal está bloqueado no DB
-        if not execute_query("SELECT channel_id FROM locked_channels WHERE channel_id = ?", (channel.id,), fetchone=True):
+        # Verificar se o canal está bloqueado
+        if not self.state.is_locked(channel.id):
             return await ctx.send(f"⚠️ O canal {channel.mention} não está em lockdown!")
 
         await self._update_channel_permissions(channel, False)
-        await self._remove_locked_channel_from_db(channel.id)
-
-        # Cancelar tarefa agendada se existir
-        if channel.id in self.lockdown_tasks:
-            self.lockdown_tasks[channel.id].cancel()
-            del self.lockdown_tasks[channel.id]
+        await self._remove_locked_channel_from_db(channel.id) # Também cancela o desbloqueio agendado
 
         await ctx.send(f"🔓 {channel.mention} foi desbloqueado.")
         logger.info(f"Canal {channel.id} em {ctx.guild.id} desbloqueado por {ctx.author.id}.")
 
-    async def _timed_unlock(self, channel: discord.TextChannel, seconds: int):
-        await asyncio.sleep(seconds)
-        if execute_query("SELECT channel_id FROM locked_channels WHERE channel_id = ?", (channel.id,), fetchone=True):
-            await self._update_channel_permissions(channel, False)
-            await self._remove_locked_channel_from_db(channel.id)
-            try:
-                await channel.send(f"🔓 O lockdown deste canal ({channel.mention}) foi automaticamente desativado após {self._format_seconds(seconds)}.")
-            except discord.Forbidden:
-                logger.warning(f"Não foi possível enviar mensagem de desbloqueio para {channel.id} após lockdown temporário.")
-            except Exception as e:
-                logger.error(f"Erro ao enviar mensagem de desbloqueio para {channel.id}: {e}", exc_info=True)
-            logger.info(f"Lockdown temporário do canal {channel.id} em {channel.guild.id} finalizado.")
-        if channel.id in self.lockdown_tasks:
-            del self.lockdown_tasks[channel.id]
+    @commands.hybrid_command(name="lockdown_server", description="Ativa o lockdown em todos os canais de texto do servidor.")
+    @commands.has_permissions(manage_guild=True, manage_channels=True)
+    @commands.bot_has_permissions(manage_channels=True)
+    @app_commands.describe(
+        reason="A razão para o lockdown."
+    )
+    async def lockdown_server(self, ctx: commands.Context, *, reason: Optional[str] = "Nenhuma razão fornecida."):
+        if self.state.is_guild_locked(ctx.guild.id):
+            return await ctx.send("⚠️ O servidor já está em lockdown! Use `unlock_server` para desativá-lo.")
+
+        await ctx.defer()
+        started = time.perf_counter()
+
+        # Canais já bloqueados individualmente ficam como estão (e não são desbloqueados pelo unlock_server)
+        # Canais sincronizados com uma categoria em lockdown já estão bloqueados pelo overwrite da categoria
+        candidates = [
+            channel for channel in ctx.guild.text_channels
+            if not self.state.is_locked(channel.id)
+            and not (channel.category_id and self.state.is_category_locked(channel.category_id) and channel.permissions_synced)
+        ]
+        # Evita chamadas que certamente falhariam com 403
+        channels = [channel for channel in candidates if channel.permissions_for(ctx.guild.me).manage_roles]
+        skipped = len(candidates) - len(channels)
+
+        # Persiste o estado ANTES de editar: se o bot cair no meio, o unlock_server ainda sabe o que restaurar
+        self.state.set_guild_lockdown(ctx.guild.id, reason, ctx.author.id)
+        self._snapshot_overwrites(channels)
+        if not self.state.add_locks(LockedChannel(channel.id, ctx.guild.id, None, reason, ctx.author.id, "server") for channel in channels):
+            self.state.clear_guild_lockdown(ctx.guild.id)
+            self._remove_locked_channels_from_db([channel.id for channel in channels]) # Descarta os snapshots
+            return await ctx.send("❌ Não foi possível salvar o estado do lockdown no banco de dados. Nenhum canal foi alterado.")
+
+        edited, saved, failed = await self._reconcile(
+            [(channel, self._locked_overwrite(channel)) for channel in channels], "Lockdown do servidor ativado."
+        )
+        if failed:
+            self._remove_locked_channels_from_db([channel.id for channel, _ in failed])
+            for channel, error in failed:
+                logger.error(f"Falha ao bloquear canal {channel.id} no lockdown do servidor {ctx.guild.id}: {error}")
+
+        elapsed = time.perf_counter() - started
+        message = f"🔒 Servidor em lockdown: {len(channels) - len(failed)} canais bloqueados em {elapsed:.1f}s devido a: {reason}."
+        if saved:
+            message += f"\nℹ️ {saved} canais já estavam sem permissão de envio (chamadas à API evitadas)."
+        if failed:
+            message += f"\n⚠️ {len(failed)} canais não puderam ser bloqueados."
+        if skipped:
+            message += f"\nℹ️ {skipped} canais ignorados (sem permissão para editar)."
+        await ctx.send(message)
+        logger.info(f"Servidor {ctx.guild.id} em lockdown por {ctx.author.id}: {edited} editados, {saved} chamadas evitadas, {len(failed)} falhas, {skipped} ignorados em {elapsed:.2f}s.")
+
+    @commands.hybrid_command(name="unlock_server", description="Desativa o lockdown do servidor, restaurando as permissões anteriores.")
+    @commands.has_permissions(manage_guild=True, manage_channels=True)
+    @commands.bot_has_permissions(manage_channels=True)
+    async def unlock_server(self, ctx: commands.Context):
+        if not self.state.is_guild_locked(ctx.guild.id):
+            return await ctx.send("⚠️ O servidor não está em lockdown!")
+
+        await ctx.defer()
+        started = time.perf_counter()
+
+        records = self.state.guild_channels(ctx.guild.id, scope="server")
+        snapshots = self._load_snapshots(ctx.guild.id)
+        channels = []
+        missing_ids = [] # Canais apagados durante o lockdown: só precisam sair do DB
+        for record in records:
+            channel = ctx.guild.get_channel(record.channel_id)
+            if channel:
+                channels.append(channel)
+            else:
+                missing_ids.append(record.channel_id)
+
+        edited, saved, failed = await self._reconcile(
+            [(channel, self._restored_overwrite(channel, snapshots.get(channel.id))) for channel in channels],
+            "Lockdown do servidor desativado."
+        )
+        failed_ids = {channel.id for channel, _ in failed}
+        restored_ids = [channel.id for channel in channels if channel.id not in failed_ids]
+        self._remove_locked_channels_from_db(restored_ids + missing_ids)
+
+        elapsed = time.perf_counter() - started
+        if failed:
+            # Mantém o lockdown do servidor registrado para que o comando possa ser repetido só para os que faltaram
+            for channel, result in failed:
+                logger.error(f"Falha ao desbloquear canal {channel.id} no unlock do servidor {ctx.guild.id}: {result}")
+            await ctx.send(f"⚠️ {len(restored_ids)} canais desbloqueados em {elapsed:.1f}s, mas {len(failed)} falharam. Use `unlock_server` novamente para tentar de novo.")
+        else:
+            self.state.clear_guild_lockdown(ctx.guild.id)
+            await ctx.send(f"🔓 Lockdown do servidor desativado: {len(restored_ids)} canais restaurados em {elapsed:.1f}s.")
+        logger.info(f"Unlock do servidor {ctx.guild.id} por {ctx.author.id}: {edited} editados, {saved} chamadas evitadas, {len(failed)} falhas em {elapsed:.2f}s.")
+
+    @commands.hybrid_command(name="lockdown_category", description="Ativa o lockdown em uma categoria inteira.")
+    @commands.has_permissions(manage_channels=True)
+    @commands.bot_has_permissions(manage_channels=True)
+    @app_commands.describe(
+        category="A categoria a ser bloqueada.",
+        reason="A razão para o lockdown."
+    )
+    async def lockdown_category(self, ctx: commands.Context, category: discord.CategoryChannel, *, reason: Optional[str] = "Nenhuma razão fornecida."):
+        if self.state.is_category_locked(category.id):
+            return await ctx.send(f"⚠️ A categoria **{category.name}** já está em lockdown!")
+        if not category.permissions_for(ctx.guild.me).manage_roles:
+            return await ctx.send(f"🚫 Não tenho permissão para editar as permissões da categoria **{category.name}**.")
+
+        await ctx.defer()
+        started = time.perf_counter()
+
+        # Canais sincronizados herdam o overwrite da categoria: uma única edição na categoria bloqueia todos eles.
+        # Só os canais fora de sincronia precisam ser editados individualmente.
+        children = [channel for channel in category.text_channels if not self.state.is_locked(channel.id)]
+        synced = [channel for channel in children if channel.permissions_synced]
+        out_of_sync = [channel for channel in children if not channel.permissions_synced]
+
+        # Persiste o estado ANTES de editar
+        self._snapshot_overwrites([category] + out_of_sync)
+        self.state.add_category_lock(category.id, ctx.guild.id, reason, ctx.author.id)
+        if not self.state.add_locks(LockedChannel(channel.id, ctx.guild.id, None, reason, ctx.author.id, "category", category.id) for channel in out_of_sync):
+            self.state.remove_category_lock(category.id)
+            self._remove_locked_channels_from_db([category.id] + [channel.id for channel in out_of_sync]) # Descarta os snapshots
+            return await ctx.send("❌ Não foi possível salvar o estado do lockdown no banco de dados. Nenhum canal foi alterado.")
+
+        try:
+            category_edited = await self._apply_lock(category)
+        except Exception as e:
+            self.state.remove_category_lock(category.id)
+            self._remove_locked_channels_from_db([category.id] + [channel.id for channel in out_of_sync])
+            logger.error(f"Erro ao bloquear categoria {category.id} na guild {ctx.guild.id}: {e}", exc_info=True)
+            return await ctx.send(f"❌ Ocorreu um erro ao bloquear a categoria: {e}")
+
+        edited, saved, failed = await self._reconcile(
+            [(channel, self._locked_overwrite(channel)) for channel in out_of_sync], "Lockdown da categoria ativado."
+        )
+        if failed:
+            self._remove_locked_channels_from_db([channel.id for channel, _ in failed])
+            for channel, error in failed:
+                logger.error(f"Falha ao bloquear canal {channel.id} no lockdown da categoria {category.id}: {error}")
+
+        elapsed = time.perf_counter() - started
+        api_calls = int(category_edited) + edited + len(failed)
+        message = (
+            f"🔒 Categoria **{category.name}** em lockdown devido a: {reason}.\n"
+            f"{len(synced)} canais sincronizados bloqueados pela categoria e {len(out_of_sync) - len(failed)} fora de sincronia editados individualmente "
+            f"({api_calls} chamadas à API em vez de {len(children)}, {elapsed:.1f}s)."
+        )
+        if failed:
+            message += f"\n⚠️ {len(failed)} canais não puderam ser bloqueados."
+        await ctx.send(message)
+        logger.info(f"Categoria {category.id} em {ctx.guild.id} bloqueada por {ctx.author.id}: {len(synced)} sincronizados, {edited} editados, {saved} já bloqueados, {len(failed)} falhas em {elapsed:.2f}s.")
+
+    @commands.hybrid_command(name="unlock_category", description="Desativa o lockdown de uma categoria, restaurando as permissões anteriores.")
+    @commands.has_permissions(manage_channels=True)
+    @commands.bot_has_permissions(manage_channels=True)
+    @app_commands.describe(
+        category="A categoria a ser desbloqueada."
+    )
+    async def unlock_category(self, ctx: commands.Context, category: discord.CategoryChannel):
+        if not self.state.is_category_locked(category.id):
+            return await ctx.send(f"⚠️ A categoria **{category.name}** não está em lockdown!")
+
+        await ctx.defer()
+        started = time.perf_counter()
+        snapshots = self._load_snapshots(ctx.guild.id)
+
+        try:
+            await self._restore_overwrite(category, snapshots.get(category.id))
+        except Exception as e:
+            logger.error(f"Erro ao desbloquear categoria {category.id} na guild {ctx.guild.id}: {e}", exc_info=True)
+            return await ctx.send(f"❌ Ocorreu um erro ao desbloquear a categoria: {e}")
+        self.state.remove_category_lock(category.id)
+        self._remove_locked_channels_from_db([category.id])
+
+        channels = []
+        missing_ids = []
+        for record in self.state.category_channels(ctx.guild.id, category.id):
+            channel = ctx.guild.get_channel(record.channel_id)
+            if channel:
+                channels.append(channel)
+            else:
+                missing_ids.append(record.channel_id)
+
+        edited, saved, failed = await self._reconcile(
+            [(channel, self._restored_overwrite(channel, snapshots.get(channel.id))) for channel in channels],
+            "Lockdown da categoria desativado."
+        )
+        failed_ids = {channel.id for channel, _ in failed}
+        self._remove_locked_channels_from_db([channel.id for channel in channels if channel.id not in failed_ids] + missing_ids)
+
+        elapsed = time.perf_counter() - started
+        if failed:
+            for channel, error in failed:
+                logger.error(f"Falha ao desbloquear canal {channel.id} no unlock da categoria {category.id}: {error}")
+            await ctx.send(f"⚠️ Categoria **{category.name}** desbloqueada, mas {len(failed)} canais falharam. Use `unlock` neles para tentar de novo.")
+        else:
+            await ctx.send(f"🔓 Categoria **{category.name}** desbloqueada ({len(channels)} canais fora de sincronia restaurados, {elapsed:.1f}s).")
+        logger.info(f"Categoria {category.id} em {ctx.guild.id} desbloqueada por {ctx.author.id}: {edited} editados, {saved} chamadas evitadas, {len(failed)} falhas em {elapsed:.2f}s.")
+
+    @commands.hybrid_command(name="lockdown_status", description="Mostra os canais em lockdown neste servidor.")
+    @commands.has_permissions(manage_channels=True)
+    async def lockdown_status(self, ctx: commands.Context):
+        records = sorted(self.state.guild_channels(ctx.guild.id), key=lambda record: (record.locked_until or float("inf"), record.channel_id))
+        panel = self.state.panel_for(ctx.guild.id)
+
+        embed = discord.Embed(title="Estado do Lockdown", color=discord.Color.red() if records else discord.Color.green())
+        embed.add_field(name="Lockdown do servidor", value="🔒 Ativo" if self.state.is_guild_locked(ctx.guild.id) else "🔓 Inativo", inline=True)
+        embed.add_field(name="Canais bloqueados", value=str(len(records)), inline=True)
+        categories = self.state.guild_categories(ctx.guild.id)
+        if categories:
+            embed.add_field(name="Categorias bloqueadas", value=", ".join(f"<#{category_id}>" for category_id in categories)[:1024], inline=False)
+        embed.add_field(name="Painel", value=f"<#{panel[0]}>" if panel else "Não configurado", inline=True)
+
+        if records:
+            lines = []
+            for record in records[:25]:
+                line = f"<#{record.channel_id}>"
+                if record.locked_until:
+                    line += f" — até <t:{record.locked_until}:R>"
+                if record.scope == "server":
+                    line += " (servidor)"
+                elif record.scope == "category":
+                    line += " (categoria)"
+                lines.append(line)
+            if len(records) > 25:
+                lines.append(f"... e mais {len(records) - 25} canais.")
+            embed.add_field(name="Canais", value="\n".join(lines), inline=False)
+        await ctx.send(embed=embed, ephemeral=True)
+
+    async def _expire_lockdown(self, channel_id: int):
+        """Chamado pelo agendador quando o lockdown temporário de um canal vence."""
+        record = self.state.get(channel_id)
+        if not record or not record.locked_until:
+            return # Já foi desbloqueado (ou virou permanente) nesse meio tempo
+        if record.locked_until > time.time():
+            self.unlock_scheduler.schedule(channel_id, record.locked_until) # O vencimento foi alterado; reagenda
+            return
+
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            logger.warning(f"Canal em lockdown {channel_id} não encontrado ao expirar, removendo do DB.")
+            await self._remove_locked_channel_from_db(channel_id)
+            return
+
+        await self._update_channel_permissions(channel, False)
+        await self._remove_locked_channel_from_db(channel_id)
+        try:
+            await channel.send(f"🔓 O lockdown temporário deste canal ({channel.mention}) foi automaticamente desativado.")
+        except discord.Forbidden:
+            logger.warning(f"Não foi possível enviar mensagem de desbloqueio para {channel.id} após lockdown temporário.")
+        except Exception as e:
+            logger.error(f"Erro ao enviar mensagem de desbloqueio para {channel.id}: {e}", exc_info=True)
+        logger.info(f"Lockdown temporário do canal {channel.id} em {channel.guild.id} finalizado.")
 
     def _parse_duration(self, duration_str: str) -> Optional[int]:
         """Converte uma string de duração (ex: '1h', '30m', '5s') em segundos."""
@@ -163,42 +500,50 @@ class LockdownCore(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
         logger.info("Verificando canais em lockdown persistentes...")
-        locked_channels_data = execute_query("SELECT channel_id, locked_until_timestamp FROM locked_channels", fetchall=True)
-        if locked_channels_data:
-            current_time = int(time.time())
-            for channel_id, locked_until_timestamp in locked_channels_data:
-                channel = self.bot.get_channel(channel_id)
-                if not channel:
-                    logger.warning(f"Canal em lockdown {channel_id} não encontrado, removendo do DB.")
-                    await self._remove_locked_channel_from_db(channel_id)
-                    continue
-
-                if locked_until_timestamp and locked_until_timestamp <= current_time:
-                    # O tempo de lockdown já expirou, desbloquear e remover
-                    await self._update_channel_permissions(channel, False)
-                    await self._remove_locked_channel_from_db(channel_id)
-                    try:
-                        await channel.send(f"🔓 O lockdown deste canal ({channel.mention}) foi automaticamente desativado ao reiniciar o bot (tempo expirado).")
-                    except discord.Forbidden:
-                        logger.warning(f"Não foi possível enviar mensagem de desbloqueio para {channel.id} após reiniciar o bot (tempo expirado).")
-                    except Exception as e:
-                        logger.error(f"Erro ao enviar mensagem de desbloqueio para {channel.id}: {e}", exc_info=True)
-                    logger.info(f"Lockdown temporário do canal {channel.id} em {channel.guild.id} finalizado.")
-                else:
-                    # Ainda em lockdown, garantir permissões e agendar desbloqueio se temporário
-                    await self._update_channel_permissions(channel, True)
-                    if locked_until_timestamp:
-                        remaining_seconds = locked_until_timestamp - current_time
-                        if remaining_seconds > 0:
-                            self.lockdown_tasks[channel_id] = self.bot.loop.create_task(
-                                self._timed_unlock(channel, remaining_seconds)
-                            )
-                            logger.info(f"Lockdown temporário para {channel.id} restabelecido por {remaining_seconds} segundos.")
-                        else: # Caso por algum motivo o timestamp seja futuro mas menor que 0
-                             await self._update_channel_permissions(channel, False)
-                             await self._remove_locked_channel_from_db(channel_id)
-                             logger.info(f"Lockdown para {channel.id} expirou durante a inicialização e foi desativado.")
-                    logger.info(f"Canal {channel.id} em {channel.guild.id} carregado como em lockdown.")
+
+        # Lockdowns temporários: os já vencidos são agendados no passado e o agendador os desbloqueia imediatamente.
+        timed = self.state.timed_locks()
+        for record in timed:
+            self.unlock_scheduler.schedule(record.channel_id, record.locked_until)
+        if timed:
+            logger.info(f"{len(timed)} desbloqueios temporários reagendados.")
+
+        current_time = int(time.time())
+        locked_channels_data = [
+            record.channel_id for record in self.state.locked.values()
+            if not record.locked_until or record.locked_until > current_time
+        ]
+        channels = []
+        missing_ids = []
+        for channel_id in locked_channels_data:
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                channels.append(channel)
+            else:
+                logger.warning(f"Canal em lockdown {channel_id} não encontrado, removendo do DB.")
+                missing_ids.append(channel_id)
+        if missing_ids:
+            self._remove_locked_channels_from_db(missing_ids)
+
+        # Categorias em lockdown também precisam manter o overwrite bloqueado
+        for category_id in list(self.state.categories):
+            category = self.bot.get_channel(category_id)
+            if category:
+                channels.append(category)
+            else:
+                logger.warning(f"Categoria em lockdown {category_id} não encontrada, removendo do DB.")
+                self.state.remove_category_lock(category_id)
+                self._remove_locked_channels_from_db([category_id])
+
+        if channels:
+            # Ainda em lockdown: garante as permissões, editando apenas os canais cujo overwrite foi alterado
+            # (on_ready também dispara após reconexões, quando quase todos já estão corretos)
+            edited, saved, failed = await self._reconcile(
+                [(channel, self._locked_overwrite(channel)) for channel in channels], "Lockdown reaplicado."
+            )
+            for channel, error in failed:
+                logger.error(f"Falha ao reaplicar lockdown no canal {channel.id}: {error}")
+            logger.info(f"{len(channels)} canais carregados como em lockdown: {edited} reaplicados, {saved} chamadas à API evitadas, {len(failed)} falhas.")
         else:
             logger.info("Nenhum canal em lockdown persistente encontrado.")
 
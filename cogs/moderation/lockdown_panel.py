@@ -1,9 +1,13 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import logging
+import time
+from typing import Optional
 from discord.ui import Button, View
 from discord import ButtonStyle, app_commands
-from database import execute_query # Certifique-se de que database.py está no caminho correto
+from database import execute_query, execute_many # Certifique-se de que database.py está no caminho correto
+from utils.persistent_views import PanelType
+from cogs.moderation.traffic_monitor import TrafficMonitor, ChannelTraffic, EDIT_COOLDOWN_SECONDS, SLOWMODE_STEPS
 import json # Para lidar com embeds em formato JSON
 
 logger = logging.getLogger(__name__)
@@ -30,15 +34,12 @@ class LockdownPanelButtons(View):
             await interaction.response.send_message("🚫 Você não tem permissão para ativar o lockdown (requer 'Gerenciar Canais').", ephemeral=True)
             return
 
-        # Busca o canal atual do painel de lockdown para ver se ele já está bloqueado
-        panel_settings = execute_query("SELECT channel_id FROM lockdown_panel_settings WHERE guild_id = ?", 
-                                        (interaction.guild_id,), fetchone=True)
+        # Busca o canal atual do painel de lockdown (índice em memória do LockdownCore)
+        panel_settings = lockdown_cog.state.panel_for(interaction.guild_id)
         
         if panel_settings and panel_settings[0] == interaction.channel_id:
             # Se o botão está no canal do painel, verificar se o *canal do painel* já está em lockdown
-            is_locked = execute_query("SELECT channel_id FROM locked_channels WHERE channel_id = ?", 
-                                      (interaction.channel_id,), fetchone=True)
-            if is_locked:
+            if lockdown_cog.state.is_locked(interaction.channel_id):
                 await interaction.response.send_message("⚠️ Este canal já está em lockdown.", ephemeral=True)
                 return
 
@@ -46,7 +47,9 @@ class LockdownPanelButtons(View):
                 # Usar a função de lockdown do LockdownCore para o canal atual
                 await interaction.response.defer(ephemeral=True) # Defer para evitar "Interaction failed"
                 await lockdown_cog._update_channel_permissions(interaction.channel, True)
-                await lockdown_cog._add_locked_channel_to_db(interaction.channel.id, interaction.guild_id, None, "Ativado via painel de lockdown", interaction.user.id)
+                if not await lockdown_cog._add_locked_channel_to_db(interaction.channel.id, interaction.guild_id, None, "Ativado via painel de lockdown", interaction.user.id):
+                    await lockdown_cog._update_channel_permissions(interaction.channel, False)
+                    return await interaction.followup.send("❌ Não foi possível salvar o lockdown no banco de dados. O canal não foi bloqueado.", ephemeral=True)
                 await interaction.followup.send(f"🔒 Este canal ({interaction.channel.mention}) foi colocado em lockdown!", ephemeral=False)
                 logger.info(f"Canal {interaction.channel.id} bloqueado via painel por {interaction.user.id}.")
             except Exception as e:
@@ -69,15 +72,12 @@ class LockdownPanelButtons(View):
             await interaction.response.send_message("🚫 Você não tem permissão para desativar o lockdown (requer 'Gerenciar Canais').", ephemeral=True)
             return
 
-        # Busca o canal atual do painel de lockdown para ver se ele está bloqueado
-        panel_settings = execute_query("SELECT channel_id FROM lockdown_panel_settings WHERE guild_id = ?", 
-                                        (interaction.guild_id,), fetchone=True)
+        # Busca o canal atual do painel de lockdown (índice em memória do LockdownCore)
+        panel_settings = lockdown_cog.state.panel_for(interaction.guild_id)
         
         if panel_settings and panel_settings[0] == interaction.channel_id:
             # Se o botão está no canal do painel, verificar se o *canal do painel* está em lockdown
-            is_locked = execute_query("SELECT channel_id FROM locked_channels WHERE channel_id = ?", 
-                                      (interaction.channel_id,), fetchone=True)
-            if not is_locked:
+            if not lockdown_cog.state.is_locked(interaction.channel_id):
                 await interaction.response.send_message("⚠️ Este canal não está em lockdown.", ephemeral=True)
                 return
 
@@ -85,11 +85,7 @@ class LockdownPanelButtons(View):
                 # Usar a função de unlock do LockdownCore para o canal atual
                 await interaction.response.defer(ephemeral=True)
                 await lockdown_cog._update_channel_permissions(interaction.channel, False)
-                await lockdown_cog._remove_locked_channel_from_db(interaction.channel.id)
-                # Cancelar tarefa agendada se existir
-                if interaction.channel.id in lockdown_cog.lockdown_tasks:
-                    lockdown_cog.lockdown_tasks[interaction.channel.id].cancel()
-                    del lockdown_cog.lockdown_tasks[interaction.channel.id]
+                await lockdown_cog._remove_locked_channel_from_db(interaction.channel.id) # Também cancela o desbloqueio agendado
 
                 await interaction.followup.send(f"🔓 Este canal ({interaction.channel.mention}) foi desbloqueado!", ephemeral=False)
                 logger.info(f"Canal {interaction.channel.id} desbloqueado via painel por {interaction.user.id}.")
@@ -104,17 +100,47 @@ class LockdownPanel(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         logger.info("Cog de Painel de Lockdown inicializada.")
-        # O bot.add_view(LockdownPanelButtons(self.bot)) é normalmente feito no on_ready
-        # ou em um setup_hook para views persistentes carregadas do DB.
-        # Mas para garantir que a view é "conhecida" pelo bot desde o início, mantemos aqui.
-        # A forma mais robusta é no listener on_ready ou setup_hook após o carregamento do DB.
+        # A view persistente é registrada no registro central, que a adiciona ao bot
+        # e limpa do DB os painéis cujos canais não existem mais.
+        self.bot.persistent_views.register(PanelType(
+            name="lockdown_panel",
+            load_rows=lambda: execute_query("SELECT guild_id, channel_id, message_id FROM lockdown_panel_settings", fetchall=True),
+            make_view=lambda guild_id: LockdownPanelButtons(self.bot),
+            # A limpeza passa pelo LockdownState, para o índice de painéis não apontar para mensagens removidas
+            on_cleanup=self._cleanup_panels
+        ))
+
+        # Auto-slowmode: contadores de mensagens por canal e cache das configurações por guild
+        # (guild_id -> (limite por minuto, slowmode máximo), ou None se desativado)
+        self.traffic = TrafficMonitor()
+        self._slowmode_settings: dict[int, Optional[tuple[int, int]]] = {}
+        # Canais que o bot deixou com slowmode antes de reiniciar continuam sendo aliviados
+        for channel_id, original_delay in execute_query("SELECT channel_id, original_delay FROM auto_slowmode_channels", fetchall=True) or []:
+            self.traffic.channels[channel_id] = ChannelTraffic(original_delay=original_delay)
+        self.relax_slowmode.start()
+
+    def cog_unload(self):
+        self.bot.persistent_views.unregister("lockdown_panel")
+        self.relax_slowmode.cancel()
+
+    def _get_state(self):
+        """Índice de estado do LockdownCore (as escritas de painel passam por ele para manter o cache sincronizado)."""
+        lockdown_cog = self.bot.get_cog("LockdownCore")
+        return lockdown_cog.state if lockdown_cog else None
+
+    def _cleanup_panels(self, guild_ids: list[int]):
+        state = self._get_state()
+        if state:
+            state.remove_panels(guild_ids)
+        else:
+            execute_many("DELETE FROM lockdown_panel_settings WHERE guild_id = ?", [(guild_id,) for guild_id in guild_ids])
 
     @commands.hybrid_group(name="lockdown_panel", description="Comandos para gerenciar o painel de lockdown.")
     @commands.has_permissions(manage_guild=True)
     async def lockdown_panel_group(self, ctx: commands.Context):
         """Comandos para gerenciar o painel de lockdown."""
         if ctx.invoked_subcommand is None:
-            await ctx.send("Comando inválido para o painel de lockdown. Use `setup` ou `remove`.", ephemeral=True) # Adicionado ephemeral=True
+            await ctx.send("Comando inválido para o painel de lockdown. Use `setup`, `remove` ou `autoslowmode`.", ephemeral=True) # Adicionado ephemeral=True
 
     @lockdown_panel_group.command(name="setup", description="Configura o painel de lockdown em um canal.")
     @app_commands.describe(
@@ -123,6 +149,9 @@ class LockdownPanel(commands.Cog):
     async def setup_panel(self, ctx: commands.Context, channel: discord.TextChannel):
         if not ctx.guild:
             return await ctx.send("Este comando só pode ser usado em um servidor.", ephemeral=True)
+        state = self._get_state()
+        if not state:
+            return await ctx.send("❌ Erro interno: O módulo de lockdown não está carregado corretamente.", ephemeral=True)
 
         embed = discord.Embed(
             title="Painel de Lockdown",
@@ -135,11 +164,8 @@ class LockdownPanel(commands.Cog):
         try:
             message = await channel.send(embed=embed, view=LockdownPanelButtons(self.bot))
             
-            # Salva no banco de dados
-            execute_query(
-                "INSERT OR REPLACE INTO lockdown_panel_settings (guild_id, channel_id, message_id) VALUES (?, ?, ?)",
-                (ctx.guild.id, channel.id, message.id)
-            )
+            # Salva no banco de dados (e no índice em memória)
+            state.set_panel(ctx.guild.id, channel.id, message.id)
             await ctx.send(f"✅ Painel de lockdown configurado em {channel.mention}.", ephemeral=True)
             logger.info(f"Painel de lockdown configurado no guild {ctx.guild.id} no canal {channel.id} (message_id: {message.id}).")
         except discord.Forbidden:
@@ -154,9 +180,11 @@ class LockdownPanel(commands.Cog):
     async def remove_panel(self, ctx: commands.Context):
         if not ctx.guild:
             return await ctx.send("Este comando só pode ser usado em um servidor.", ephemeral=True)
+        state = self._get_state()
+        if not state:
+            return await ctx.send("❌ Erro interno: O módulo de lockdown não está carregado corretamente.", ephemeral=True)
 
-        settings = execute_query("SELECT channel_id, message_id FROM lockdown_panel_settings WHERE guild_id = ?", 
-                                 (ctx.guild.id,), fetchone=True)
+        settings = state.panel_for(ctx.guild.id)
 
         if not settings:
             return await ctx.send("⚠️ Nenhum painel de lockdown configurado para este servidor.", ephemeral=True)
@@ -178,19 +206,119 @@ class LockdownPanel(commands.Cog):
                 await ctx.send(f"❌ Ocorreu um erro ao tentar apagar a mensagem: {e}", ephemeral=True)
                 logger.error(f"Erro ao apagar mensagem do painel de lockdown: {e}", exc_info=True)
         
-        execute_query("DELETE FROM lockdown_panel_settings WHERE guild_id = ?", (ctx.guild.id,))
+        state.remove_panel(ctx.guild.id)
         logger.info(f"Painel de lockdown removido do DB para guild {ctx.guild.id}.")
         
         if not channel: # Se o canal não foi encontrado, mas a entrada existia no DB
             await ctx.send("✅ Configuração do painel de lockdown removida do banco de dados (o canal original pode não existir mais).", ephemeral=True)
 
+    @lockdown_panel_group.command(name="autoslowmode", description="Configura o slowmode automático baseado na taxa de mensagens.")
+    @commands.has_permissions(manage_guild=True)
+    @app_commands.describe(
+        enabled="Ativar ou desativar o auto-slowmode.",
+        threshold="Mensagens por minuto, em um canal, que acionam o slowmode (padrão: 30).",
+        max_delay="Slowmode máximo aplicado, em segundos (padrão: 30)."
+    )
+    async def auto_slowmode(self, ctx: commands.Context, enabled: bool, threshold: Optional[int] = 30, max_delay: Optional[int] = 30):
+        if not ctx.guild:
+            return await ctx.send("Este comando só pode ser usado em um servidor.", ephemeral=True)
+        if not 5 <= threshold <= 1000:
+            return await ctx.send("❌ O limite deve estar entre 5 e 1000 mensagens por minuto.", ephemeral=True)
+        if not 1 <= max_delay <= SLOWMODE_STEPS[-1]:
+            return await ctx.send(f"❌ O slowmode máximo deve estar entre 1 e {SLOWMODE_STEPS[-1]} segundos.", ephemeral=True)
+
+        execute_query(
+            "INSERT OR REPLACE INTO auto_slowmode_settings (guild_id, enabled, threshold_per_minute, max_delay_seconds) VALUES (?, ?, ?, ?)",
+            (ctx.guild.id, enabled, threshold, max_delay)
+        )
+        self._slowmode_settings.pop(ctx.guild.id, None)
+
+        if enabled:
+            await ctx.send(f"✅ Auto-slowmode ativado: acima de {threshold} mensagens/minuto em um canal, o slowmode sobe gradualmente até {max_delay}s e é aliviado quando o movimento diminuir.", ephemeral=True)
+        else:
+            await ctx.send("✅ Auto-slowmode desativado. Os canais alterados voltarão ao slowmode original.", ephemeral=True)
+        logger.info(f"Auto-slowmode configurado na guild {ctx.guild.id} por {ctx.author.id}: enabled={enabled}, threshold={threshold}, max_delay={max_delay}.")
+
+    def _get_slowmode_settings(self, guild_id: int) -> Optional[tuple[int, int]]:
+        if guild_id not in self._slowmode_settings:
+            row = execute_query(
+                "SELECT enabled, threshold_per_minute, max_delay_seconds FROM auto_slowmode_settings WHERE guild_id = ?",
+                (guild_id,), fetchone=True
+            )
+            self._slowmode_settings[guild_id] = (row[1], row[2]) if row and row[0] else None
+        return self._slowmode_settings[guild_id]
+
+    def _release_channel(self, channel_id: int, traffic: ChannelTraffic):
+        """O canal voltou ao slowmode original: o bot deixa de controlá-lo."""
+        traffic.original_delay = None
+        execute_query("DELETE FROM auto_slowmode_channels WHERE channel_id = ?", (channel_id,))
+
+    async def _set_slowmode(self, channel: discord.TextChannel, traffic: ChannelTraffic, delay: int, now: float):
+        if traffic.original_delay is None:
+            traffic.original_delay = channel.slowmode_delay
+            execute_query(
+                "INSERT OR REPLACE INTO auto_slowmode_channels (channel_id, guild_id, original_delay) VALUES (?, ?, ?)",
+                (channel.id, channel.guild.id, channel.slowmode_delay)
+            )
+        traffic.last_edit = now # Marcado antes do await para que mensagens simultâneas não disparem outra edição
+        rate = traffic.counter.per_minute(now)
+        try:
+            await channel.edit(slowmode_delay=delay, reason=f"Auto-slowmode: {rate:.0f} mensagens/minuto.")
+        except discord.Forbidden:
+            logger.warning(f"Sem permissão para alterar o slowmode do canal {channel.id} na guild {channel.guild.id}.")
+            self._release_channel(channel.id, traffic)
+            return
+        except discord.HTTPException as e:
+            logger.error(f"Erro ao alterar o slowmode do canal {channel.id}: {e}")
+            return
+
+        if delay == traffic.original_delay:
+            self._release_channel(channel.id, traffic)
+        logger.info(f"Auto-slowmode: canal {channel.id} na guild {channel.guild.id} de {channel.slowmode_delay}s para {delay}s ({rate:.0f} mensagens/minuto).")
 
     @commands.Cog.listener()
-    async def on_ready(self):
-        # Garante que as views persistentes são adicionadas ao bot
-        # Isso é importante para que os botões do painel funcionem após um reinício
-        self.bot.add_view(LockdownPanelButtons(self.bot))
-        logger.info("Views persistentes de Painel de Lockdown garantidas.")
+    async def on_message(self, message: discord.Message):
+        if not message.guild or message.author.bot or not isinstance(message.channel, discord.TextChannel):
+            return
+        settings = self._get_slowmode_settings(message.guild.id)
+        if not settings:
+            return
+
+        now = time.time()
+        traffic = self.traffic.record(message.channel.id, now)
+        delay = self.traffic.next_delay(traffic, now, message.channel.slowmode_delay, *settings)
+        if delay is not None:
+            await self._set_slowmode(message.channel, traffic, delay, now)
+
+    @tasks.loop(seconds=10)
+    async def relax_slowmode(self):
+        """Alivia gradualmente o slowmode dos canais cujo movimento voltou ao normal."""
+        now = time.time()
+        for channel_id, traffic in list(self.traffic.channels.items()):
+            if traffic.original_delay is None:
+                continue
+            channel = self.bot.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                self._release_channel(channel_id, traffic)
+                continue
+            if channel.slowmode_delay <= traffic.original_delay:
+                self._release_channel(channel_id, traffic) # Já voltou ao normal (ex: alterado manualmente)
+                continue
+
+            settings = self._get_slowmode_settings(channel.guild.id)
+            if settings:
+                delay = self.traffic.next_delay(traffic, now, channel.slowmode_delay, *settings)
+            elif now - traffic.last_edit >= EDIT_COOLDOWN_SECONDS:
+                delay = traffic.original_delay # Auto-slowmode desativado: volta direto ao original
+            else:
+                delay = None
+            if delay is not None and delay < channel.slowmode_delay:
+                await self._set_slowmode(channel, traffic, delay, now)
+        self.traffic.forget_idle(now)
+
+    @relax_slowmode.before_loop
+    async def before_relax_slowmode(self):
+        await self.bot.wait_until_ready()
 
 
 # Esta função é CRUCIAL para o bot carregar o cog.
@@ -0,0 +1,161 @@
+# cogs/moderation/lockdown_state.py
+import logging
+from typing import Iterable, NamedTuple, Optional
+
+from database import execute_query, execute_many
+
+logger = logging.getLogger(__name__)
+
+
+class LockedChannel(NamedTuple):
+    channel_id: int
+    guild_id: int
+    locked_until: Optional[int]
+    reason: Optional[str]
+    locked_by_id: Optional[int]
+    scope: str = "channel"
+    category_id: Optional[int] = None # Categoria cujo lockdown bloqueou este canal (scope 'category')
+
+
+class LockdownState:
+    """
+    Índice em memória do estado de lockdown (canais e categorias bloqueados, lockdowns de servidor e painéis).
+    É carregado do DB uma única vez e toda escrita passa por aqui (memória + DB), então as
+    verificações dos comandos e botões são consultas a dicionários, sem tocar no SQLite.
+    """
+    def __init__(self):
+        self.locked: dict[int, LockedChannel] = {}
+        self.by_guild: dict[int, set[int]] = {}
+        self.guild_lockdowns: set[int] = set()
+        self.categories: dict[int, int] = {} # category_id -> guild_id
+        self.panels: dict[int, tuple[int, int]] = {} # guild_id -> (channel_id, message_id)
+
+    def load(self):
+        rows = execute_query(
+            "SELECT channel_id, guild_id, locked_until_timestamp, reason, locked_by_id, COALESCE(scope, 'channel'), category_id FROM locked_channels",
+            fetchall=True
+        ) or []
+        self.locked.clear()
+        self.by_guild.clear()
+        for row in rows:
+            self._index(LockedChannel(*row))
+
+        self.categories = dict(execute_query("SELECT category_id, guild_id FROM locked_categories", fetchall=True) or [])
+        self.guild_lockdowns = {row[0] for row in execute_query("SELECT guild_id FROM guild_lockdowns", fetchall=True) or []}
+        self.panels = {
+            guild_id: (channel_id, message_id)
+            for guild_id, channel_id, message_id in execute_query("SELECT guild_id, channel_id, message_id FROM lockdown_panel_settings", fetchall=True) or []
+        }
+        logger.info(f"Estado de lockdown carregado: {len(self.locked)} canais bloqueados, {len(self.categories)} categorias, {len(self.guild_lockdowns)} servidores em lockdown, {len(self.panels)} painéis.")
+
+    def _index(self, record: LockedChannel):
+        self.locked[record.channel_id] = record
+        self.by_guild.setdefault(record.guild_id, set()).add(record.channel_id)
+
+    def _unindex(self, channel_id: int):
+        record = self.locked.pop(channel_id, None)
+        if record:
+            channels = self.by_guild.get(record.guild_id)
+            if channels is not None:
+                channels.discard(channel_id)
+                if not channels:
+                    del self.by_guild[record.guild_id]
+
+    # --- Canais bloqueados ---
+    def is_locked(self, channel_id: int) -> bool:
+        return channel_id in self.locked
+
+    def get(self, channel_id: int) -> Optional[LockedChannel]:
+        return self.locked.get(channel_id)
+
+    def guild_channels(self, guild_id: int, scope: Optional[str] = None) -> list[LockedChannel]:
+        """Canais bloqueados da guild (opcionalmente apenas de um escopo: 'channel', 'server'...)."""
+        records = (self.locked[channel_id] for channel_id in self.by_guild.get(guild_id, ()))
+        return [record for record in records if scope is None or record.scope == scope]
+
+    def timed_locks(self) -> list[LockedChannel]:
+        return [record for record in self.locked.values() if record.locked_until]
+
+    def add_locks(self, records: Iterable[LockedChannel]) -> bool:
+        """Persiste os bloqueios e só então os indexa. Retorna False (sem alterar o índice) se a escrita falhar."""
+        records = list(records)
+        if execute_many(
+            "INSERT OR REPLACE INTO locked_channels (channel_id, guild_id, locked_until_timestamp, reason, locked_by_id, scope, category_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            records
+        ) is False:
+            logger.error(f"Falha ao persistir {len(records)} canais bloqueados; o índice em memória não foi alterado.")
+            return False
+        for record in records:
+            self._unindex(record.channel_id)
+            self._index(record)
+        return True
+
+    def remove_locks(self, channel_ids: Iterable[int]) -> bool:
+        """Remove os bloqueios do DB e só então do índice. Retorna False (sem alterar o índice) se a escrita falhar."""
+        channel_ids = list(channel_ids)
+        if execute_many("DELETE FROM locked_channels WHERE channel_id = ?", [(channel_id,) for channel_id in channel_ids]) is False:
+            logger.error(f"Falha ao remover {len(channel_ids)} canais bloqueados do DB; o índice em memória não foi alterado.")
+            return False
+        for channel_id in channel_ids:
+            self._unindex(channel_id)
+        return True
+
+    # --- Categorias ---
+    def is_category_locked(self, category_id: int) -> bool:
+        return category_id in self.categories
+
+    def guild_categories(self, guild_id: int) -> list[int]:
+        return [category_id for category_id, owner_id in self.categories.items() if owner_id == guild_id]
+
+    def category_channels(self, guild_id: int, category_id: int) -> list[LockedChannel]:
+        """Canais bloqueados individualmente como parte do lockdown da categoria (os que não estavam sincronizados)."""
+        return [record for record in self.guild_channels(guild_id, scope="category") if record.category_id == category_id]
+
+    def add_category_lock(self, category_id: int, guild_id: int, reason: Optional[str], locked_by_id: int):
+        execute_query(
+            "INSERT OR REPLACE INTO locked_categories (category_id, guild_id, reason, locked_by_id) VALUES (?, ?, ?, ?)",
+            (category_id, guild_id, reason, locked_by_id)
+        )
+        self.categories[category_id] = guild_id
+
+    def remove_category_lock(self, category_id: int):
+        execute_query("DELETE FROM locked_categories WHERE category_id = ?", (category_id,))
+        self.categories.pop(category_id, None)
+
+    # --- Lockdown do servidor ---
+    def is_guild_locked(self, guild_id: int) -> bool:
+        return guild_id in self.guild_lockdowns
+
+    def set_guild_lockdown(self, guild_id: int, reason: Optional[str], locked_by_id: int):
+        execute_query(
+            "INSERT OR REPLACE INTO guild_lockdowns (guild_id, reason, locked_by_id) VALUES (?, ?, ?)",
+            (guild_id, reason, locked_by_id)
+        )
+        self.guild_lockdowns.add(guild_id)
+
+    def clear_guild_lockdown(self, guild_id: int):
+        execute_query("DELETE FROM guild_lockdowns WHERE guild_id = ?", (guild_id,))
+        self.guild_lockdowns.discard(guild_id)
+
+    # --- Painéis ---
+    def panel_for(self, guild_id: int) -> Optional[tuple[int, int]]:
+        return self.panels.get(guild_id)
+
+    def set_panel(self, guild_id: int, channel_id: int, message_id: int):
+        execute_query(
+            "INSERT OR REPLACE INTO lockdown_panel_settings (guild_id, channel_id, message_id) VALUES (?, ?, ?)",
+            (guild_id, channel_id, message_id)
+        )
+        self.panels[guild_id] = (channel_id, message_id)
+
+    def remove_panel(self, guild_id: int):
+        execute_query("DELETE FROM lockdown_panel_settings WHERE guild_id = ?", (guild_id,))
+        self.panels.pop(guild_id, None)
+
+    def remove_panels(self, guild_ids: Iterable[int]):
+        """Remove vários painéis em lote (limpeza de painéis obsoletos pelo registro de views persistentes)."""
+        guild_ids = list(guild_ids)
+        if execute_many("DELETE FROM lockdown_panel_settings WHERE guild_id = ?", [(guild_id,) for guild_id in guild_ids]) is False:
+            return
+        for guild_id in guild_ids:
+            self.panels.pop(guild_id, None)
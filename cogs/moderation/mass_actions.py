@@ -0,0 +1,273 @@
+# cogs/moderation/mass_actions.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import datetime
+import logging
+import re
+import time
+from typing import Optional
+
+from database import insert_moderation_logs
+from utils.rate_limit import RateLimiter, run_limited
+from cogs.moderation.moderation_commands import parse_duration
+
+logger = logging.getLogger(__name__)
+
+# IDs de usuário do Discord (snowflakes) em texto colado ou arquivo
+ID_PATTERN = re.compile(r"\b\d{17,20}\b")
+MAX_TARGETS = 1000
+MAX_ATTACHMENT_BYTES = 512 * 1024
+# O endpoint de banimento em massa aceita até 200 usuários por chamada
+BAN_CHUNK_SIZE = 200
+MASS_ACTION_CONCURRENCY = 5
+MASS_ACTION_RATE_PER_SECOND = 10
+# Intervalo mínimo entre edições da mensagem de progresso
+PROGRESS_EDIT_INTERVAL = 2.0
+
+
+def parse_ids(text: str) -> list[int]:
+    """Extrai os IDs do texto, sem repetições e na ordem em que aparecem."""
+    return list(dict.fromkeys(int(match) for match in ID_PATTERN.findall(text)))
+
+
+def log_moderation_actions(rows: list[tuple]):
+    """Registra várias ações em moderation_logs em uma única transação, com um bloco de números de caso por guild.
+    Cada linha: (guild_id, action, target_id, moderator_id, reason, duration)."""
+    if rows:
+        insert_moderation_logs(rows)
+
+
+class ProgressMessage:
+    """Uma única mensagem de progresso, editada no máximo a cada PROGRESS_EDIT_INTERVAL segundos."""
+    def __init__(self, message: discord.WebhookMessage, label: str):
+        self.message = message
+        self.label = label
+        self.started = time.perf_counter()
+        self._last_edit = 0.0
+
+    async def update(self, done: int, total: int):
+        now = time.perf_counter()
+        if done < total and now - self._last_edit < PROGRESS_EDIT_INTERVAL:
+            return
+        self._last_edit = now
+        try:
+            await self.message.edit(content=f"⏳ {self.label}: {done}/{total} ({now - self.started:.0f}s)...")
+        except discord.HTTPException:
+            pass # O progresso é apenas informativo
+
+    async def finish(self, content: str):
+        try:
+            await self.message.edit(content=content)
+        except discord.HTTPException as e:
+            logger.warning(f"Não foi possível editar a mensagem de progresso: {e}")
+
+
+class MassActions(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.limiter = RateLimiter(MASS_ACTION_RATE_PER_SECOND)
+        logger.info("Cog de Ações em Massa inicializada.")
+
+    async def _collect_ids(self, ids: Optional[str], attachment: Optional[discord.Attachment]) -> tuple[list[int], Optional[str]]:
+        text = ids or ""
+        if attachment:
+            if attachment.size > MAX_ATTACHMENT_BYTES:
+                return [], f"❌ O arquivo é muito grande (máximo {MAX_ATTACHMENT_BYTES // 1024} KB)."
+            try:
+                text += "\n" + (await attachment.read()).decode("utf-8", errors="ignore")
+            except discord.HTTPException as e:
+                return [], f"❌ Não foi possível ler o arquivo: {e}"
+
+        target_ids = parse_ids(text)
+        if not target_ids:
+            return [], "❌ Nenhum ID válido encontrado. Cole os IDs (separados por espaço, vírgula ou linha) ou envie um arquivo .txt."
+        if len(target_ids) > MAX_TARGETS:
+            return [], f"❌ Máximo de {MAX_TARGETS} IDs por comando (recebidos: {len(target_ids)})."
+        return target_ids, None
+
+    def _filter_targets(self, interaction: discord.Interaction, target_ids: list[int], require_member: bool):
+        """
+        Aplica as mesmas proteções das ações individuais (si mesmo, dono, bot, hierarquia de cargos).
+        Retorna (alvos, quantidade ignorada por motivo). Os alvos são Members, ou Objects para IDs fora do servidor.
+        """
+        guild = interaction.guild
+        is_owner = interaction.user.id == guild.owner_id
+        targets = []
+        skipped: dict[str, int] = {}
+
+        def skip(reason: str):
+            skipped[reason] = skipped.get(reason, 0) + 1
+
+        for target_id in target_ids:
+            if target_id in (interaction.user.id, guild.owner_id, self.bot.user.id):
+                skip("protegidos")
+                continue
+            member = guild.get_member(target_id)
+            if member is None:
+                if require_member:
+                    skip("fora do servidor")
+                else:
+                    targets.append(discord.Object(id=target_id))
+                continue
+            if (member.top_role >= interaction.user.top_role and not is_owner) or member.top_role >= guild.me.top_role:
+                skip("cargo igual ou superior")
+                continue
+            targets.append(member)
+        return targets, skipped
+
+    async def _start(self, interaction: discord.Interaction, label: str, count: int) -> ProgressMessage:
+        message = await interaction.followup.send(f"⏳ {label}: 0/{count}...", ephemeral=True, wait=True)
+        return ProgressMessage(message, label)
+
+    @staticmethod
+    def _summary(title: str, done: int, failed: int, skipped: dict[str, int], elapsed: float) -> str:
+        lines = [f"✅ {title}: {done} concluídos em {elapsed:.1f}s."]
+        if failed:
+            lines.append(f"⚠️ {failed} falharam.")
+        for reason, count in skipped.items():
+            lines.append(f"ℹ️ {count} ignorados ({reason}).")
+        return "\n".join(lines)
+
+    @app_commands.command(name="massban", description="Bane vários usuários de uma vez a partir de uma lista de IDs.")
+    @app_commands.checks.has_permissions(ban_members=True)
+    @app_commands.checks.bot_has_permissions(ban_members=True)
+    @app_commands.describe(
+        ids="IDs dos usuários, separados por espaço, vírgula ou linha.",
+        attachment="Arquivo de texto com os IDs (um por linha).",
+        reason="A razão do banimento.",
+        delete_days="Dias de mensagens a apagar (0 a 7)."
+    )
+    async def massban(self, interaction: discord.Interaction, reason: str, ids: Optional[str] = None,
+                      attachment: Optional[discord.Attachment] = None, delete_days: app_commands.Range[int, 0, 7] = 0):
+        await interaction.response.defer(ephemeral=True)
+        target_ids, error = await self._collect_ids(ids, attachment)
+        if error:
+            return await interaction.followup.send(error, ephemeral=True)
+
+        # IDs fora do servidor também podem ser banidos (impede que voltem)
+        targets, skipped = self._filter_targets(interaction, target_ids, require_member=False)
+        if not targets:
+            return await interaction.followup.send(self._summary("Banimento em massa", 0, 0, skipped, 0), ephemeral=True)
+
+        progress = await self._start(interaction, "Banindo", len(targets))
+        audit_reason = f"{reason} (massban por {interaction.user})"[:512]
+        delete_seconds = delete_days * 86400
+        banned_ids: list[int] = []
+        failed = 0
+
+        if interaction.guild.me.guild_permissions.manage_guild:
+            # Banimento em lote: até 200 usuários por chamada à API
+            chunks = [targets[i:i + BAN_CHUNK_SIZE] for i in range(0, len(targets), BAN_CHUNK_SIZE)]
+            processed = 0
+
+            async def ban_chunk(chunk):
+                nonlocal processed
+                result = await interaction.guild.bulk_ban(chunk, reason=audit_reason, delete_message_seconds=delete_seconds)
+                processed += len(chunk)
+                await progress.update(processed, len(targets))
+                return result
+
+            for chunk, result in await run_limited(chunks, ban_chunk, concurrency=1, limiter=self.limiter):
+                if isinstance(result, Exception):
+                    failed += len(chunk)
+                    logger.error(f"Erro no banimento em lote na guild {interaction.guild.id}: {result}")
+                else:
+                    banned_ids.extend(user.id for user in result.banned)
+                    failed += len(result.failed)
+        else:
+            # Sem 'Gerenciar Servidor' o endpoint em lote não está disponível: banimentos individuais em paralelo
+            results = await run_limited(
+                targets, lambda target: interaction.guild.ban(target, reason=audit_reason, delete_message_seconds=delete_seconds),
+                concurrency=MASS_ACTION_CONCURRENCY, limiter=self.limiter, on_progress=progress.update
+            )
+            for target, result in results:
+                if isinstance(result, Exception):
+                    failed += 1
+                else:
+                    banned_ids.append(target.id)
+
+        log_moderation_actions([(interaction.guild.id, "ban", user_id, interaction.user.id, reason, None) for user_id in banned_ids])
+        ban_sync = self.bot.get_cog("BanSync")
+        if ban_sync:
+            ban_sync.propagate(interaction.guild.id, banned_ids, reason, interaction.user.id)
+        await progress.finish(self._summary("Banimento em massa", len(banned_ids), failed, skipped, time.perf_counter() - progress.started))
+        logger.info(f"Massban na guild {interaction.guild.id} por {interaction.user.id}: {len(banned_ids)} banidos, {failed} falhas, {sum(skipped.values())} ignorados.")
+
+    @app_commands.command(name="masskick", description="Expulsa vários membros de uma vez a partir de uma lista de IDs.")
+    @app_commands.checks.has_permissions(kick_members=True)
+    @app_commands.checks.bot_has_permissions(kick_members=True)
+    @app_commands.describe(
+        ids="IDs dos membros, separados por espaço, vírgula ou linha.",
+        attachment="Arquivo de texto com os IDs (um por linha).",
+        reason="A razão da expulsão."
+    )
+    async def masskick(self, interaction: discord.Interaction, reason: str, ids: Optional[str] = None,
+                       attachment: Optional[discord.Attachment] = None):
+        await interaction.response.defer(ephemeral=True)
+        target_ids, error = await self._collect_ids(ids, attachment)
+        if error:
+            return await interaction.followup.send(error, ephemeral=True)
+
+        targets, skipped = self._filter_targets(interaction, target_ids, require_member=True)
+        if not targets:
+            return await interaction.followup.send(self._summary("Expulsão em massa", 0, 0, skipped, 0), ephemeral=True)
+
+        progress = await self._start(interaction, "Expulsando", len(targets))
+        audit_reason = f"{reason} (masskick por {interaction.user})"[:512]
+        results = await run_limited(
+            targets, lambda member: member.kick(reason=audit_reason),
+            concurrency=MASS_ACTION_CONCURRENCY, limiter=self.limiter, on_progress=progress.update
+        )
+        kicked_ids = [member.id for member, result in results if not isinstance(result, Exception)]
+        failed = len(results) - len(kicked_ids)
+
+        log_moderation_actions([(interaction.guild.id, "kick", user_id, interaction.user.id, reason, None) for user_id in kicked_ids])
+        await progress.finish(self._summary("Expulsão em massa", len(kicked_ids), failed, skipped, time.perf_counter() - progress.started))
+        logger.info(f"Masskick na guild {interaction.guild.id} por {interaction.user.id}: {len(kicked_ids)} expulsos, {failed} falhas, {sum(skipped.values())} ignorados.")
+
+    @app_commands.command(name="masstimeout", description="Silencia vários membros de uma vez a partir de uma lista de IDs.")
+    @app_commands.checks.has_permissions(moderate_members=True)
+    @app_commands.checks.bot_has_permissions(moderate_members=True)
+    @app_commands.describe(
+        duration="Duração do silenciamento (ex: 30m, 1h, 2d; máx: 28d).",
+        ids="IDs dos membros, separados por espaço, vírgula ou linha.",
+        attachment="Arquivo de texto com os IDs (um por linha).",
+        reason="A razão do silenciamento."
+    )
+    async def masstimeout(self, interaction: discord.Interaction, duration: str, reason: str, ids: Optional[str] = None,
+                          attachment: Optional[discord.Attachment] = None):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            timeout_delta = parse_duration(duration)
+        except ValueError as e:
+            return await interaction.followup.send(f"❌ {e}", ephemeral=True)
+
+        target_ids, error = await self._collect_ids(ids, attachment)
+        if error:
+            return await interaction.followup.send(error, ephemeral=True)
+
+        targets, skipped = self._filter_targets(interaction, target_ids, require_member=True)
+        if not targets:
+            return await interaction.followup.send(self._summary("Silenciamento em massa", 0, 0, skipped, 0), ephemeral=True)
+
+        progress = await self._start(interaction, "Silenciando", len(targets))
+        audit_reason = f"{reason} (masstimeout por {interaction.user})"[:512]
+        timeout_until = datetime.datetime.now(datetime.timezone.utc) + timeout_delta
+        results = await run_limited(
+            targets, lambda member: member.timeout(timeout_until, reason=audit_reason),
+            concurrency=MASS_ACTION_CONCURRENCY, limiter=self.limiter, on_progress=progress.update
+        )
+        muted_ids = [member.id for member, result in results if not isinstance(result, Exception)]
+        failed = len(results) - len(muted_ids)
+
+        log_moderation_actions([(interaction.guild.id, "mute", user_id, interaction.user.id, reason, duration) for user_id in muted_ids])
+        await progress.finish(self._summary("Silenciamento em massa", len(muted_ids), failed, skipped, time.perf_counter() - progress.started))
+        logger.info(f"Masstimeout na guild {interaction.guild.id} por {interaction.user.id}: {len(muted_ids)} silenciados, {failed} falhas, {sum(skipped.values())} ignorados.")
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot: commands.Bot):
+    """Adiciona o cog de Ações em Massa ao bot."""
+    await bot.add_cog(MassActions(bot))
+    logger.info("Cog de Ações em Massa configurada e adicionada ao bot.")
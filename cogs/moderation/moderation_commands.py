@@ -4,17 +4,21 @@ from discord import app_commands, ui
 import datetime
 import logging
 import re # Para parsing do tempo
+from typing import Optional, Literal
 
 from database import execute_query
+from utils.user_cache import UserResolver
+from utils.channel_index import SendableChannelIndex, channel_page
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # --- Funções Auxiliares para Parsing de Tempo ---
-def parse_duration(duration_str: str) -> datetime.timedelta:
+def parse_duration(duration_str: str, max_seconds: Optional[int] = 2419200) -> datetime.timedelta:
     """
     Parses a duration string (e.g., "1h", "30m", "2d") into a datetime.timedelta object.
     Supports: s (seconds), m (minutes), h (hours), d (days).
+    max_seconds defaults to Discord's 28-day timeout cap; pass a larger value (or None) for temp-bans and timed roles.
     """
     seconds = 0
     if not duration_str:
@@ -37,11 +41,77 @@ def parse_duration(duration_str: str) -> datetime.timedelta:
             seconds += value * 86400
     
     # Discord API timeout limit is 28 days (2419200 seconds)
-    if seconds > 2419200:
-        raise ValueError("A duração máxima para silenciamento é de 28 dias.")
+    if max_seconds is not None and seconds > max_seconds:
+        if max_seconds == 2419200:
+            raise ValueError("A duração máxima para silenciamento é de 28 dias.")
+        raise ValueError(f"A duração máxima é de {max_seconds // 86400} dias.")
 
     return datetime.timedelta(seconds=seconds)
 
+# Duração máxima de banimentos e cargos temporários (expirados pelo cog TempActions)
+TEMP_ACTION_MAX_SECONDS = 365 * 86400
+
+
+# --- Escalonamento Automático de Advertências ---
+# Cache: guild_id -> {número de advertências: (ação, duração)}; invalidado pelos comandos /warn_rules
+_escalation_rules_cache: dict[int, dict[int, tuple[str, Optional[str]]]] = {}
+
+def get_escalation_rules(guild_id: int) -> dict[int, tuple[str, Optional[str]]]:
+    if guild_id not in _escalation_rules_cache:
+        rows = execute_query(
+            "SELECT warn_count, action, duration FROM warn_escalation_rules WHERE guild_id = ?",
+            (guild_id,), fetchall=True
+        ) or []
+        _escalation_rules_cache[guild_id] = {warn_count: (action, duration) for warn_count, action, duration in rows}
+    return _escalation_rules_cache[guild_id]
+
+def invalidate_escalation_rules(guild_id: int):
+    _escalation_rules_cache.pop(guild_id, None)
+
+async def apply_warn_escalation(guild: discord.Guild, member: discord.Member, bot_user: discord.ClientUser) -> Optional[str]:
+    """
+    Aplica a regra de escalonamento correspondente ao número atual de advertências do membro.
+    O número vem de warn_counters (mantido por triggers), sem COUNT(*) sobre moderation_logs.
+    Retorna uma descrição da ação aplicada, ou None se nenhuma regra se aplica.
+    """
+    rules = get_escalation_rules(guild.id)
+    if not rules:
+        return None # Guild sem regras: nenhuma consulta extra
+    row = execute_query(
+        "SELECT active_warns FROM warn_counters WHERE guild_id = ? AND user_id = ?",
+        (guild.id, member.id), fetchone=True
+    )
+    warn_count = row[0] if row else 0
+    rule = rules.get(warn_count)
+    if not rule:
+        return None
+
+    action, duration_str = rule
+    reason = f"Escalonamento automático: {warn_count} advertências."
+    try:
+        if action == "timeout":
+            await member.timeout(datetime.datetime.now(datetime.timezone.utc) + parse_duration(duration_str), reason=reason)
+            log_action, description = "mute", f"silenciado(a) por {duration_str}"
+        elif action == "kick":
+            await member.kick(reason=reason)
+            log_action, description = "kick", "expulso(a)"
+        else:
+            await member.ban(reason=reason, delete_message_seconds=0)
+            log_action, description = "ban", "banido(a)"
+    except (discord.Forbidden, ValueError) as e:
+        logging.warning(f"Não foi possível aplicar o escalonamento '{action}' a {member.id} na guild {guild.id}: {e}")
+        return f"⚠️ {member.mention} atingiu {warn_count} advertências, mas não foi possível aplicar a ação automática ({action})."
+    except discord.HTTPException as e:
+        logging.error(f"Erro ao aplicar escalonamento '{action}' a {member.id} na guild {guild.id}: {e}")
+        return None
+
+    execute_query(
+        "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason, duration) VALUES (?, ?, ?, ?, ?, ?)",
+        (guild.id, log_action, member.id, bot_user.id, reason, duration_str if action == "timeout" else None)
+    )
+    logging.info(f"Escalonamento aplicado a {member.id} na guild {guild.id}: {warn_count} advertências -> {action}.")
+    return f"🔺 {member.mention} atingiu {warn_count} advertências e foi {description} automaticamente."
+
 
 # --- Modals para Ações de Moderação ---
 class WarnModal(ui.Modal, title="Advertir Usuário"):
@@ -107,6 +177,11 @@ class WarnModal(ui.Modal, title="Advertir Usuário"):
             except Exception as e:
                 logging.error(f"Erro ao enviar DM de advertência para {self.target_member.id}: {e}")
 
+            # Verifica as regras de escalonamento da guild (ex: 3 advertências = timeout)
+            escalation = await apply_warn_escalation(interaction.guild, self.target_member, interaction.client.user)
+            if escalation:
+                await interaction.followup.send(escalation, ephemeral=True)
+
         else:
             await interaction.followup.send("Ocorreu um erro ao registrar a advertência no banco de dados.", ephemeral=True)
             logging.error(f"Erro ao registrar advertência no DB para {self.target_member.id} por {interaction.user.id} na guild {interaction.guild_id}.")
@@ -223,10 +298,30 @@ class BanModal(ui.Modal, title="Banir Usuário"):
             default="0"
         )
         self.add_item(self.delete_message_days)
+        self.duration = ui.TextInput(
+            label="Duração (opcional)",
+            placeholder="Ex: 12h, 7d. Vazio para banimento permanente (máx: 365d)",
+            style=discord.TextStyle.short,
+            required=False,
+            max_length=20
+        )
+        self.add_item(self.duration)
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         reason_text = self.reason.value
+        duration_str = self.duration.value.strip() or None
+        expires_at = None
+        if duration_str:
+            try:
+                expires_at = int((datetime.datetime.now(datetime.timezone.utc) + parse_duration(duration_str, max_seconds=TEMP_ACTION_MAX_SECONDS)).timestamp())
+            except ValueError as e:
+                await interaction.followup.send(f"Erro na duração: {e}", ephemeral=True)
+                return
+            temp_actions = interaction.client.get_cog("TempActions")
+            if not temp_actions:
+                await interaction.followup.send("O sistema de expirações não está carregado; não é possível aplicar um banimento temporário.", ephemeral=True)
+                return
         delete_days = 0
         try:
             delete_days = int(self.delete_message_days.value)
@@ -265,7 +360,11 @@ class BanModal(ui.Modal, title="Banir Usuário"):
                     color=discord.Color.dark_red()
                 )
                 dm_embed.add_field(name="Razão", value=reason_text, inline=False)
-                dm_embed.set_footer(text="Esta ação é permanente e impede que você entre novamente.")
+                if expires_at:
+                    dm_embed.add_field(name="Duração", value=f"{duration_str} (até <t:{expires_at}:F>)", inline=False)
+                    dm_embed.set_footer(text="O banimento será removido automaticamente ao fim da duração.")
+                else:
+                    dm_embed.set_footer(text="Esta ação é permanente e impede que você entre novamente.")
                 await self.target_member.send(embed=dm_embed)
                 logging.info(f"DM de banimento enviada para {self.target_member.id}.")
             except discord.Forbidden:
@@ -276,9 +375,16 @@ class BanModal(ui.Modal, title="Banir Usuário"):
             await self.target_member.ban(reason=reason_text, delete_message_days=delete_days)
             
             execute_query(
-                "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason) VALUES (?, ?, ?, ?, ?)",
-                (interaction.guild.id, "ban", self.target_member.id, interaction.user.id, reason_text)
+                "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason, duration) VALUES (?, ?, ?, ?, ?, ?)",
+                (interaction.guild.id, "ban", self.target_member.id, interaction.user.id, reason_text, duration_str)
             )
+            if expires_at:
+                temp_actions.schedule(interaction.guild.id, "unban", self.target_member.id, expires_at, reason_text, interaction.user.id)
+            else:
+                # Banimentos permanentes são replicados nos servidores do grupo de ban sync (se houver)
+                ban_sync = interaction.client.get_cog("BanSync")
+                if ban_sync:
+                    ban_sync.propagate(interaction.guild.id, [self.target_member.id], reason_text, interaction.user.id)
 
             embed = discord.Embed(
                 title="Usuário Banido",
@@ -288,6 +394,8 @@ class BanModal(ui.Modal, title="Banir Usuário"):
             embed.add_field(name="Moderador", value=interaction.user.mention, inline=True)
             embed.add_field(name="Razão", value=reason_text, inline=False)
             embed.add_field(name="Mensagens Deletadas (dias)", value=delete_days, inline=True)
+            if expires_at:
+                embed.add_field(name="Duração", value=f"{duration_str} (expira <t:{expires_at}:R>)", inline=True)
             embed.add_field(name="Canal do Banimento", value=self.target_channel.mention, inline=True)
             embed.set_footer(text=f"ID do Usuário: {self.target_member.id}")
 
@@ -508,14 +616,70 @@ class UnmuteModal(ui.Modal, title="Remover Silenciamento"):
 
 
 # --- View para Seleção de Canal ---
+class ChannelSearchModal(ui.Modal, title="Buscar Canal"):
+    def __init__(self, select_view: "BaseChannelSelectView"):
+        super().__init__()
+        self.select_view = select_view
+        self.query = ui.TextInput(label="Nome do canal", placeholder="Parte do nome (vazio para listar todos)", required=False, max_length=100)
+        self.add_item(self.query)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        self.select_view.apply_search(self.query.value.strip() or None)
+        await interaction.response.edit_message(view=self.select_view)
+
+
 class BaseChannelSelectView(ui.View):
-    def __init__(self, target_member: discord.Member, modal_class: type[ui.Modal]):
+    """
+    Seletor de canal paginado (25 canais por página, com busca por nome).
+    Os canais vêm do índice de canais enviáveis do bot (SendableChannelIndex), mantido por eventos,
+    então abrir o seletor não recalcula permissões de todos os canais da guild.
+    """
+    def __init__(self, target_member: discord.Member, modal_class: type[ui.Modal], channel_index: SendableChannelIndex):
         super().__init__(timeout=60)
         self.target_member = target_member
         self.modal_class = modal_class
+        self.channel_index = channel_index
         self.message = None
-
-        self.add_item(self.ChannelSelect(target_member.guild.text_channels, self.modal_class))
+        self.entries = channel_index.channels(target_member.guild)
+        self.query: Optional[str] = None
+        self.page = 0
+        self._render()
+
+    def _render(self):
+        self.clear_items()
+        items, self.page, pages = channel_page(self.entries, self.page)
+        self.add_item(self.ChannelSelect(items, self.modal_class, self.page, pages))
+        if pages > 1:
+            previous_button = ui.Button(label="Anterior", emoji="⬅️", style=discord.ButtonStyle.secondary, disabled=self.page == 0)
+            previous_button.callback = self._previous
+            self.add_item(previous_button)
+            next_button = ui.Button(label="Próxima", emoji="➡️", style=discord.ButtonStyle.secondary, disabled=self.page >= pages - 1)
+            next_button.callback = self._next
+            self.add_item(next_button)
+        if pages > 1 or self.query:
+            search_button = ui.Button(label="Buscar", emoji="🔎", style=discord.ButtonStyle.primary)
+            search_button.callback = self._search
+            self.add_item(search_button)
+
+    def apply_search(self, query: Optional[str]):
+        self.query = query
+        guild = self.target_member.guild
+        self.entries = self.channel_index.search(guild, query) if query else self.channel_index.channels(guild)
+        self.page = 0
+        self._render()
+
+    async def _previous(self, interaction: discord.Interaction):
+        self.page -= 1
+        self._render()
+        await interaction.response.edit_message(view=self)
+
+    async def _next(self, interaction: discord.Interaction):
+        self.page += 1
+        self._render()
+        await interaction.response.edit_message(view=self)
+
+    async def _search(self, interaction: discord.Interaction):
+        await interaction.response.send_modal(ChannelSearchModal(self))
 
     async def on_timeout(self):
         if self.message:
@@ -524,16 +688,13 @@ class BaseChannelSelectView(ui.View):
             await self.message.edit(content="Tempo esgotado para seleção de canal.", view=self)
 
     class ChannelSelect(ui.Select):
-        def __init__(self, text_channels: list[discord.TextChannel], modal_class: type[ui.Modal]):
-            options = [
-                discord.SelectOption(label=channel.name, value=str(channel.id))
-                for channel in text_channels if channel.permissions_for(channel.guild.me).send_messages
-            ]
+        def __init__(self, channels: list[tuple[int, str]], modal_class: type[ui.Modal], page: int, pages: int):
+            options = [discord.SelectOption(label=name[:100], value=str(channel_id)) for channel_id, name in channels]
             if not options:
                 options.append(discord.SelectOption(label="Nenhum canal de texto disponível", value="none", default=True))
 
             super().__init__(
-                placeholder="Selecione o canal...",
+                placeholder="Selecione o canal..." if pages == 1 else f"Selecione o canal... (página {page + 1}/{pages})",
                 min_values=1,
                 max_values=1,
                 options=options,
@@ -558,31 +719,32 @@ class BaseChannelSelectView(ui.View):
 
 
 class WarnChannelSelectView(BaseChannelSelectView):
-    def __init__(self, target_member: discord.Member):
-        super().__init__(target_member, WarnModal)
+    def __init__(self, target_member: discord.Member, channel_index: SendableChannelIndex):
+        super().__init__(target_member, WarnModal, channel_index)
 
 class KickChannelSelectView(BaseChannelSelectView):
-    def __init__(self, target_member: discord.Member):
-        super().__init__(target_member, KickModal)
+    def __init__(self, target_member: discord.Member, channel_index: SendableChannelIndex):
+        super().__init__(target_member, KickModal, channel_index)
 
 class BanChannelSelectView(BaseChannelSelectView):
-    def __init__(self, target_member: discord.Member):
-        super().__init__(target_member, BanModal)
+    def __init__(self, target_member: discord.Member, channel_index: SendableChannelIndex):
+        super().__init__(target_member, BanModal, channel_index)
 
 class MuteChannelSelectView(BaseChannelSelectView):
-    def __init__(self, target_member: discord.Member):
-        super().__init__(target_member, MuteModal)
+    def __init__(self, target_member: discord.Member, channel_index: SendableChannelIndex):
+        super().__init__(target_member, MuteModal, channel_index)
 
 class UnmuteChannelSelectView(BaseChannelSelectView):
-    def __init__(self, target_member: discord.Member):
-        super().__init__(target_member, UnmuteModal)
+    def __init__(self, target_member: discord.Member, channel_index: SendableChannelIndex):
+        super().__init__(target_member, UnmuteModal, channel_index)
 
 
 # --- View de Confirmação para Deletar Advertência ---
 class DeleteWarnConfirmView(ui.View):
-    def __init__(self, log_id: int, target_member: discord.Member, interaction_user_id: int):
+    def __init__(self, log_id: int, case_no: int, target_member: discord.Member, interaction_user_id: int):
         super().__init__(timeout=60) # 60 segundos para confirmar
         self.log_id = log_id
+        self.case_no = case_no # Número exibido aos moderadores
         self.target_member = target_member
         self.interaction_user_id = interaction_user_id # ID do usuário que iniciou a interação
         self.confirmed = False
@@ -614,11 +776,11 @@ class DeleteWarnConfirmView(ui.View):
         )
 
         if success:
-            await interaction.followup.send(f"Advertência (ID: `{self.log_id}`) de {self.target_member.mention} removida com sucesso.", ephemeral=False)
-            logging.info(f"Advertência (ID: {self.log_id}) de {self.target_member.id} removida por {interaction.user.id} na guild {interaction.guild.id}.")
+            await interaction.followup.send(f"Advertência (Caso `#{self.case_no}`) de {self.target_member.mention} removida com sucesso.", ephemeral=False)
+            logging.info(f"Advertência (ID: {self.log_id}, caso #{self.case_no}) de {self.target_member.id} removida por {interaction.user.id} na guild {interaction.guild.id}.")
         else:
-            await interaction.followup.send(f"Não foi possível remover a advertência (ID: `{self.log_id}`). Pode já ter sido removida ou o ID está incorreto.", ephemeral=True)
-            logging.error(f"Erro ao remover advertência (ID: {self.log_id}) de {self.target_member.id} por {interaction.user.id} na guild {interaction.guild.id}.")
+            await interaction.followup.send(f"Não foi possível remover a advertência (Caso `#{self.case_no}`). Pode já ter sido removida ou o número está incorreto.", ephemeral=True)
+            logging.error(f"Erro ao remover advertência (ID: {self.log_id}, caso #{self.case_no}) de {self.target_member.id} por {interaction.user.id} na guild {interaction.guild.id}.")
         self.stop() # Para a view
 
     @ui.button(label="Cancelar", style=discord.ButtonStyle.secondary, emoji="❌")
@@ -630,6 +792,144 @@ class DeleteWarnConfirmView(ui.View):
         self.stop() # Para a view
 
 
+# --- Busca Textual nos Logs de Moderação (FTS5) ---
+MODLOG_SEARCH_PAGE_SIZE = 5
+
+def build_fts_query(text: str) -> Optional[str]:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura (sem operadores vindos do usuário).
+    Texto entre aspas vira busca pela frase exata; termos soltos precisam aparecer todos (o último aceita prefixo).
+    """
+    text = text.strip()
+    if len(text) > 2 and text.startswith('"') and text.endswith('"'):
+        words = re.findall(r"\w+", text[1:-1])
+        return '"' + " ".join(words) + '"' if words else None
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_moderation_logs(guild_id: int, fts_query: str, filters: dict, limit: int, offset: int):
+    """
+    Busca nos logs pelo índice FTS5, ordenando por relevância (bm25).
+    Retorna (total de resultados, linhas da página).
+    """
+    conditions = ["moderation_logs_fts MATCH ?", "l.guild_id = ?"]
+    params = [fts_query, guild_id]
+    if filters.get("action"):
+        conditions.append("l.action = ?")
+        params.append(filters["action"])
+    if filters.get("moderator_id"):
+        conditions.append("l.moderator_id = ?")
+        params.append(filters["moderator_id"])
+    if filters.get("target_id"):
+        conditions.append("l.target_id = ?")
+        params.append(filters["target_id"])
+    if filters.get("since"):
+        conditions.append("l.timestamp >= ?")
+        params.append(filters["since"])
+    if filters.get("until"):
+        conditions.append("l.timestamp < date(?, '+1 day')")
+        params.append(filters["until"])
+
+    from_clause = f"FROM moderation_logs_fts JOIN moderation_logs l ON l.log_id = moderation_logs_fts.rowid WHERE {' AND '.join(conditions)}"
+    total = execute_query(f"SELECT COUNT(*) {from_clause}", tuple(params), fetchone=True)
+    rows = execute_query(
+        f"SELECT l.case_no, l.action, l.target_id, l.moderator_id, snippet(moderation_logs_fts, 0, '**', '**', '…', 24), l.timestamp, l.duration "
+        f"{from_clause} ORDER BY bm25(moderation_logs_fts) LIMIT ? OFFSET ?",
+        tuple(params) + (limit, offset), fetchall=True
+    )
+    return (total[0] if total else 0), (rows or [])
+
+
+class ModLogSearchView(ui.View):
+    def __init__(self, bot: commands.Bot, author_id: int, guild_id: int, query_text: str, fts_query: str, filters: dict, total: int):
+        super().__init__(timeout=300)
+        self.bot = bot
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.query_text = query_text
+        self.fts_query = fts_query
+        self.filters = filters
+        self.total = total
+        self.page = 0
+        self.pages = max(1, (total + MODLOG_SEARCH_PAGE_SIZE - 1) // MODLOG_SEARCH_PAGE_SIZE)
+        self.message = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Apenas quem fez a busca pode navegar pelos resultados.", ephemeral=True)
+            return False
+        return True
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    def build_embed(self, rows: list) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"Busca nos Logs: {self.query_text[:200]}",
+            description=f"{self.total} resultado(s), ordenados por relevância.",
+            color=discord.Color.blue()
+        )
+        for case_no, action, target_id, moderator_id, snippet, timestamp_str, duration in rows:
+            timestamp = datetime.datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
+            value = (
+                f"**Alvo:** <@{target_id}>\n"
+                f"**Moderador:** <@{moderator_id}>\n"
+                f"**Razão:** {snippet}\n"
+            )
+            if duration:
+                value += f"**Duração:** {duration}\n"
+            value += f"**Quando:** <t:{int(timestamp.timestamp())}:F>"
+            embed.add_field(name=f"Caso #{case_no}: {action.upper()}", value=value[:1024], inline=False)
+        embed.set_footer(text=f"Página {self.page + 1}/{self.pages}")
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+        return embed
+
+    def fetch_page(self) -> list:
+        _, rows = search_moderation_logs(
+            self.guild_id, self.fts_query, self.filters,
+            MODLOG_SEARCH_PAGE_SIZE, self.page * MODLOG_SEARCH_PAGE_SIZE
+        )
+        return rows
+
+    @ui.button(label="Anterior", style=discord.ButtonStyle.secondary, emoji="⬅️")
+    async def previous_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=self.build_embed(self.fetch_page()), view=self)
+
+    @ui.button(label="Próxima", style=discord.ButtonStyle.secondary, emoji="➡️")
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page = min(self.pages - 1, self.page + 1)
+        await interaction.response.edit_message(embed=self.build_embed(self.fetch_page()), view=self)
+
+
+# --- Estatísticas de Moderação ---
+def _text_bar(value: int, maximum: int, width: int = 14) -> str:
+    """Barra horizontal em texto para os gráficos do /modstats."""
+    filled = round(width * value / maximum) if maximum else 0
+    return "█" * filled + "░" * (width - filled)
+
+
+def _bar_chart(rows: list[tuple[str, int]]) -> str:
+    if not rows:
+        return "Sem dados"
+    maximum = max(count for _, count in rows)
+    label_width = max(len(label) for label, _ in rows)
+    lines = [f"{label:<{label_width}} {_text_bar(count, maximum)} {count}" for label, count in rows]
+    return "```\n" + "\n".join(lines)[:1000] + "\n```"
+
+
 # --- View para Ações de Moderação (Botões) ---
 class ModActionsView(ui.View):
     def __init__(self, target_member: discord.Member):
@@ -645,39 +945,97 @@ class ModActionsView(ui.View):
 
     @ui.button(label="Advertir", style=discord.ButtonStyle.secondary, emoji="⚠️")
     async def warn_button(self, interaction: discord.Interaction, button: ui.Button):
-        select_view = WarnChannelSelectView(target_member=self.target_member)
+        select_view = WarnChannelSelectView(target_member=self.target_member, channel_index=interaction.client.channel_index)
         await interaction.response.send_message("Por favor, selecione o canal onde a advertência será enviada:", view=select_view, ephemeral=True)
         select_view.message = await interaction.original_response()
 
     @ui.button(label="Silenciar", style=discord.ButtonStyle.secondary, emoji=None) # Removido emoji, usando None
     async def mute_button(self, interaction: discord.Interaction, button: ui.Button):
-        select_view = MuteChannelSelectView(target_member=self.target_member)
+        select_view = MuteChannelSelectView(target_member=self.target_member, channel_index=interaction.client.channel_index)
         await interaction.response.send_message("Por favor, selecione o canal onde o silenciamento será enviado:", view=select_view, ephemeral=True)
         select_view.message = await interaction.original_response()
 
     @ui.button(label="Remover Silenciamento", style=discord.ButtonStyle.secondary, emoji=None) # Removido emoji, usando None
     async def unmute_button(self, interaction: discord.Interaction, button: ui.Button):
-        select_view = UnmuteChannelSelectView(target_member=self.target_member)
+        select_view = UnmuteChannelSelectView(target_member=self.target_member, channel_index=interaction.client.channel_index)
         await interaction.response.send_message("Por favor, selecione o canal onde a remoção do silenciamento será enviada:", view=select_view, ephemeral=True)
         select_view.message = await interaction.original_response()
 
     @ui.button(label="Expulsar", style=discord.ButtonStyle.secondary, emoji="❌") # Alterado para '❌'
     async def kick_button(self, interaction: discord.Interaction, button: ui.Button):
-        select_view = KickChannelSelectView(target_member=self.target_member)
+        select_view = KickChannelSelectView(target_member=self.target_member, channel_index=interaction.client.channel_index)
         await interaction.response.send_message("Por favor, selecione o canal onde a expulsão será enviada:", view=select_view, ephemeral=True)
         select_view.message = await interaction.original_response()
 
     @ui.button(label="Banir", style=discord.ButtonStyle.danger, emoji="⛔") # Alterado para '⛔'
     async def ban_button(self, interaction: discord.Interaction, button: ui.Button):
-        select_view = BanChannelSelectView(target_member=self.target_member)
+        select_view = BanChannelSelectView(target_member=self.target_member, channel_index=interaction.client.channel_index)
         await interaction.response.send_message("Por favor, selecione o canal onde o banimento será enviado:", view=select_view, ephemeral=True)
         select_view.message = await interaction.original_response()
 
 
 class ModerationCommands(commands.Cog):
+    warn_rules = app_commands.Group(
+        name="warn_rules",
+        description="Configura ações automáticas ao atingir um número de advertências.",
+        default_permissions=discord.Permissions(manage_guild=True)
+    )
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    @warn_rules.command(name="set", description="Define a ação aplicada quando um membro atinge N advertências.")
+    @app_commands.describe(
+        warn_count="Número de advertências que aciona a ação.",
+        action="Ação a aplicar: timeout, kick ou ban.",
+        duration="Duração do timeout (ex: 1h, 1d; obrigatório para timeout)."
+    )
+    async def warn_rules_set(self, interaction: discord.Interaction, warn_count: app_commands.Range[int, 1, 100],
+                             action: Literal["timeout", "kick", "ban"], duration: Optional[str] = None):
+        if action == "timeout":
+            try:
+                parse_duration(duration)
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+                return
+        else:
+            duration = None
+
+        execute_query(
+            "INSERT OR REPLACE INTO warn_escalation_rules (guild_id, warn_count, action, duration) VALUES (?, ?, ?, ?)",
+            (interaction.guild.id, warn_count, action, duration)
+        )
+        invalidate_escalation_rules(interaction.guild.id)
+        detail = f" de {duration}" if duration else ""
+        await interaction.response.send_message(f"✅ Ao atingir {warn_count} advertências, o membro receberá: **{action}**{detail}.", ephemeral=True)
+        logging.info(f"Regra de escalonamento definida na guild {interaction.guild.id} por {interaction.user.id}: {warn_count} -> {action} {duration or ''}.")
+
+    @warn_rules.command(name="remove", description="Remove a regra de um número de advertências.")
+    @app_commands.describe(warn_count="Número de advertências da regra a remover.")
+    async def warn_rules_remove(self, interaction: discord.Interaction, warn_count: int):
+        if warn_count not in get_escalation_rules(interaction.guild.id):
+            await interaction.response.send_message(f"⚠️ Não há regra para {warn_count} advertências.", ephemeral=True)
+            return
+        execute_query(
+            "DELETE FROM warn_escalation_rules WHERE guild_id = ? AND warn_count = ?",
+            (interaction.guild.id, warn_count)
+        )
+        invalidate_escalation_rules(interaction.guild.id)
+        await interaction.response.send_message(f"✅ Regra de {warn_count} advertências removida.", ephemeral=True)
+
+    @warn_rules.command(name="list", description="Lista as regras de escalonamento de advertências.")
+    async def warn_rules_list(self, interaction: discord.Interaction):
+        rules = get_escalation_rules(interaction.guild.id)
+        if not rules:
+            await interaction.response.send_message("ℹ️ Nenhuma regra de escalonamento configurada.", ephemeral=True)
+            return
+        embed = discord.Embed(title="Escalonamento de Advertências", color=discord.Color.orange())
+        embed.description = "\n".join(
+            f"**{warn_count} advertências:** {action}" + (f" ({duration})" if duration else "")
+            for warn_count, (action, duration) in sorted(rules.items())
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="mod_actions", description="Abre um painel de ações de moderação para um usuário.")
     @app_commands.checks.has_permissions(kick_members=True) # Requer permissão para usar o comando
     @app_commands.describe(member="O membro para o qual você deseja realizar ações de moderação.")
@@ -728,7 +1086,7 @@ class ModerationCommands(commands.Cog):
 
         # Busca todas as advertências para o usuário no servidor
         warn_logs = execute_query(
-            "SELECT log_id, moderator_id, reason, timestamp FROM moderation_logs WHERE guild_id = ? AND action = 'warn' AND target_id = ? ORDER BY timestamp DESC",
+            "SELECT case_no, moderator_id, reason, timestamp FROM moderation_logs WHERE guild_id = ? AND action = 'warn' AND target_id = ? ORDER BY timestamp DESC",
             (guild_id, target_id),
             fetchall=True
         )
@@ -745,17 +1103,19 @@ class ModerationCommands(commands.Cog):
         embed.set_thumbnail(url=member.display_avatar.url)
         embed.set_footer(text=f"ID do Usuário: {member.id}")
 
+        # Resolve todos os moderadores de uma vez (cache + buscas em paralelo)
+        names = await self.bot.user_resolver.resolve_many((log[1] for log in warn_logs), interaction.guild)
+
         for log in warn_logs:
-            log_id, moderator_id, reason, timestamp_str = log
+            case_no, moderator_id, reason, timestamp_str = log
             
-            moderator_user = self.bot.get_user(moderator_id)
-            moderator_name = moderator_user.mention if moderator_user else f"ID: {moderator_id}"
+            moderator_name = UserResolver.label(moderator_id, names)
 
             timestamp = datetime.datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
             timestamp_unix = int(timestamp.timestamp())
 
             embed.add_field(
-                name=f"Advertência ID: `{log_id}`",
+                name=f"Advertência — Caso `#{case_no}`",
                 value=(
                     f"**Moderador:** {moderator_name}\n"
                     f"**Razão:** {reason if reason else 'N/A'}\n"
@@ -770,38 +1130,38 @@ class ModerationCommands(commands.Cog):
 
     @app_commands.command(name="delwarn", description="Remove uma advertência específica de um usuário.")
     @app_commands.checks.has_permissions(kick_members=True) # Permissão para gerenciar advertências
-    @app_commands.describe(log_id="O ID da advertência a ser removida (obtido de /warns).")
-    async def delwarn(self, interaction: discord.Interaction, log_id: int):
+    @app_commands.describe(case_no="O número do caso da advertência a ser removida (obtido de /warns).")
+    async def delwarn(self, interaction: discord.Interaction, case_no: int):
         await interaction.response.defer(ephemeral=True)
 
         guild_id = interaction.guild.id
 
-        # Verifica se a advertência existe e pertence a este servidor e é uma 'warn'
+        # Verifica se a advertência existe e pertence a este servidor e é uma 'warn' (busca pelo índice único (guild_id, case_no))
         warn_info = execute_query(
-            "SELECT target_id, reason FROM moderation_logs WHERE log_id = ? AND guild_id = ? AND action = 'warn'",
-            (log_id, guild_id),
+            "SELECT log_id, target_id, reason FROM moderation_logs WHERE guild_id = ? AND case_no = ? AND action = 'warn'",
+            (guild_id, case_no),
             fetchone=True
         )
 
         if not warn_info:
-            await interaction.followup.send(f"Advertência com ID `{log_id}` não encontrada ou não pertence a este servidor.", ephemeral=True)
+            await interaction.followup.send(f"Advertência do caso `#{case_no}` não encontrada neste servidor.", ephemeral=True)
             return
 
-        target_id, reason = warn_info
+        log_id, target_id, reason = warn_info
         target_member = interaction.guild.get_member(target_id)
         target_name = target_member.mention if target_member else f"Usuário Desconhecido (ID: {target_id})"
 
         # Envia a confirmação
-        confirm_view = DeleteWarnConfirmView(log_id, target_member, interaction.user.id)
+        confirm_view = DeleteWarnConfirmView(log_id, case_no, target_member, interaction.user.id)
         confirm_message = await interaction.followup.send(
-            f"Tem certeza que deseja remover a advertência (ID: `{log_id}`) de {target_name}?\n"
+            f"Tem certeza que deseja remover a advertência (Caso `#{case_no}`) de {target_name}?\n"
             f"Razão original: `{reason}`",
             view=confirm_view,
             ephemeral=True
         )
         confirm_view.message = confirm_message # Armazena a mensagem para timeout
 
-        logging.info(f"Comando /delwarn iniciado por {interaction.user.id} para advertência ID: {log_id} na guild {interaction.guild.id}.")
+        logging.info(f"Comando /delwarn iniciado por {interaction.user.id} para advertência do caso #{case_no} na guild {interaction.guild.id}.")
 
 
     @app_commands.command(name="view_mod_logs", description="Visualiza os últimos logs de moderação do servidor.")
@@ -811,7 +1171,7 @@ class ModerationCommands(commands.Cog):
 
         guild_id = interaction.guild.id
         logs = execute_query(
-            "SELECT action, target_id, moderator_id, reason, timestamp, duration FROM moderation_logs WHERE guild_id = ? ORDER BY timestamp DESC LIMIT 10",
+            "SELECT case_no, action, target_id, moderator_id, reason, timestamp, duration FROM moderation_logs WHERE guild_id = ? ORDER BY timestamp DESC LIMIT 10",
             (guild_id,),
             fetchall=True
         )
@@ -826,14 +1186,16 @@ class ModerationCommands(commands.Cog):
             color=discord.Color.blue()
         )
 
+        # Resolve alvos e moderadores de uma vez (cache + buscas em paralelo)
+        names = await self.bot.user_resolver.resolve_many(
+            [user_id for log in logs for user_id in (log[2], log[3])], interaction.guild
+        )
+
         for log in logs:
-            action, target_id, moderator_id, reason, timestamp_str, duration = log
-            
-            target_user = self.bot.get_user(target_id)
-            moderator_user = self.bot.get_user(moderator_id)
+            case_no, action, target_id, moderator_id, reason, timestamp_str, duration = log
 
-            target_name = target_user.mention if target_user else f"ID: {target_id}"
-            moderator_name = moderator_user.mention if moderator_user else f"ID: {moderator_id}"
+            target_name = UserResolver.label(target_id, names)
+            moderator_name = UserResolver.label(moderator_id, names)
 
             timestamp = datetime.datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
             timestamp_unix = int(timestamp.timestamp())
@@ -843,12 +1205,12 @@ class ModerationCommands(commands.Cog):
                 f"**Moderador:** {moderator_name}\n"
                 f"**Razão:** {reason if reason else 'N/A'}\n"
             )
-            if action in ["mute"] and duration: # Apenas para mute, mostrar duração
+            if action in ["mute", "ban", "temprole"] and duration: # Ações temporárias: mostrar duração
                 log_value += f"**Duração:** {duration}\n"
             log_value += f"**Quando:** <t:{timestamp_unix}:F>"
 
             embed.add_field(
-                name=f"Ação: {action.upper()}",
+                name=f"Caso #{case_no}: {action.upper()}",
                 value=log_value,
                 inline=False
             )
@@ -856,5 +1218,98 @@ class ModerationCommands(commands.Cog):
         await interaction.followup.send(embed=embed, ephemeral=True)
 
 
+    @app_commands.command(name="modlog_search", description="Busca nos logs de moderação pelo texto da razão.")
+    @app_commands.checks.has_permissions(view_audit_log=True)
+    @app_commands.describe(
+        query="Texto a buscar na razão (use aspas para uma frase exata).",
+        action="Filtrar por ação (ex: ban, kick, warn, mute).",
+        moderator="Filtrar pelo moderador que aplicou a ação.",
+        target="Filtrar pelo usuário alvo.",
+        since="A partir desta data (AAAA-MM-DD).",
+        until="Até esta data, inclusive (AAAA-MM-DD)."
+    )
+    async def modlog_search(self, interaction: discord.Interaction, query: str, action: Optional[str] = None,
+                            moderator: Optional[discord.User] = None, target: Optional[discord.User] = None,
+                            since: Optional[str] = None, until: Optional[str] = None):
+        await interaction.response.defer(ephemeral=True)
+
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            await interaction.followup.send("❌ Digite ao menos uma palavra para buscar.", ephemeral=True)
+            return
+        try:
+            since_date = datetime.date.fromisoformat(since).isoformat() if since else None
+            until_date = datetime.date.fromisoformat(until).isoformat() if until else None
+        except ValueError:
+            await interaction.followup.send("❌ Data inválida. Use o formato AAAA-MM-DD (ex: 2024-05-31).", ephemeral=True)
+            return
+
+        filters = {
+            "action": action.lower().strip() if action else None,
+            "moderator_id": moderator.id if moderator else None,
+            "target_id": target.id if target else None,
+            "since": since_date,
+            "until": until_date,
+        }
+        total, rows = search_moderation_logs(interaction.guild.id, fts_query, filters, MODLOG_SEARCH_PAGE_SIZE, 0)
+        if not total:
+            await interaction.followup.send(f"Nenhum log encontrado para `{query}`.", ephemeral=True)
+            return
+
+        view = ModLogSearchView(self.bot, interaction.user.id, interaction.guild.id, query, fts_query, filters, total)
+        view.message = await interaction.followup.send(embed=view.build_embed(rows), view=view, ephemeral=True)
+        logging.info(f"Comando /modlog_search usado por {interaction.user.id} na guild {interaction.guild.id}: '{query}' ({total} resultados).")
+
+    @app_commands.command(name="modstats", description="Mostra estatísticas de moderação por ação, moderador e dia.")
+    @app_commands.checks.has_permissions(view_audit_log=True)
+    @app_commands.describe(
+        days="Período em dias (padrão: 30).",
+        moderator="Mostrar apenas as ações deste moderador."
+    )
+    async def modstats(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 365] = 30,
+                       moderator: Optional[discord.User] = None):
+        await interaction.response.defer(ephemeral=True)
+
+        # Tudo vem de moderation_stats_daily (agregada por triggers): o custo depende do período, não do histórico
+        conditions = "guild_id = ? AND day >= date('now', ?)"
+        params = (interaction.guild.id, f"-{days - 1} days")
+        if moderator:
+            conditions += " AND moderator_id = ?"
+            params += (moderator.id,)
+
+        by_action = execute_query(
+            f"SELECT action, SUM(count) FROM moderation_stats_daily WHERE {conditions} GROUP BY action HAVING SUM(count) > 0 ORDER BY 2 DESC",
+            params, fetchall=True
+        ) or []
+        if not by_action:
+            await interaction.followup.send(f"Nenhuma ação de moderação registrada nos últimos {days} dias.", ephemeral=True)
+            return
+        by_day = execute_query(
+            f"SELECT day, SUM(count) FROM moderation_stats_daily WHERE {conditions} GROUP BY day ORDER BY day DESC LIMIT 14",
+            params, fetchall=True
+        ) or []
+
+        embed = discord.Embed(
+            title=f"Estatísticas de Moderação ({days} dias)",
+            description=f"Total: **{sum(count for _, count in by_action)}** ações" + (f" de {moderator.mention}" if moderator else ""),
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Por ação", value=_bar_chart([(action, count) for action, count in by_action]), inline=False)
+
+        if not moderator:
+            by_moderator = execute_query(
+                f"SELECT moderator_id, SUM(count) FROM moderation_stats_daily WHERE {conditions} GROUP BY moderator_id HAVING SUM(count) > 0 ORDER BY 2 DESC LIMIT 10",
+                params, fetchall=True
+            ) or []
+            embed.add_field(
+                name="Moderadores mais ativos",
+                value="\n".join(f"**{position}.** <@{moderator_id}> — {count}" for position, (moderator_id, count) in enumerate(by_moderator, start=1)) or "Sem dados",
+                inline=False
+            )
+
+        embed.add_field(name="Por dia (últimos 14 com atividade)", value=_bar_chart([(day[5:], count) for day, count in reversed(by_day)]), inline=False)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+        logging.info(f"Comando /modstats usado por {interaction.user.id} na guild {interaction.guild.id} ({days} dias).")
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(ModerationCommands(bot))
\ No newline at end of file
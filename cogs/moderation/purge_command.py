@@ -0,0 +1,198 @@
+# cogs/moderation/purge_command.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import datetime
+import fnmatch
+import logging
+import re
+import time
+from typing import Callable, Optional
+
+from database import execute_query
+from utils.rate_limit import RateLimiter, run_limited
+from cogs.moderation.mass_actions import ProgressMessage
+
+logger = logging.getLogger(__name__)
+
+# O endpoint de exclusão em massa aceita de 2 a 100 mensagens com menos de 14 dias
+BULK_DELETE_SIZE = 100
+# Margem para não enviar ao bulk_delete mensagens que cruzam o limite de 14 dias durante o purge
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+# Mensagens antigas só podem ser apagadas uma a uma; a rota tem limite baixo por canal
+OLD_DELETE_RATE_PER_SECOND = 1
+# Máximo de mensagens antigas por comando: a 1/s, o purge termina bem antes de o token da interação (15 min) expirar
+MAX_OLD_DELETES = 600
+# Quantas mensagens do histórico podem ser lidas por comando
+MAX_SCAN = 5000
+MAX_PATTERN_LENGTH = 200
+URL_PATTERN = re.compile(r"https?://\S+|discord(?:\.gg|(?:app)?\.com/invite)/\S+", re.IGNORECASE)
+
+
+def compile_glob(glob: str) -> re.Pattern:
+    """
+    Converte um padrão curinga (* e ?) numa expressão regular que o procura em qualquer parte da mensagem.
+    Expressões regulares livres não são aceitas: um padrão com backtracking catastrófico travaria o loop de eventos
+    (o módulo re não libera o GIL). O fnmatch gera grupos atômicos, com tempo de busca linear.
+    """
+    return re.compile(fnmatch.translate(f"*{glob}*"), re.IGNORECASE)
+
+
+def build_filter(author: Optional[discord.User], contains: Optional[str], pattern: Optional[re.Pattern],
+                 links: bool, attachments: bool, bots: bool) -> Callable[[discord.Message], bool]:
+    """Monta o predicado do purge; todos os filtros informados precisam ser satisfeitos."""
+    contains = contains.lower() if contains else None
+
+    def check(message: discord.Message) -> bool:
+        if message.pinned:
+            return False # Mensagens fixadas nunca são apagadas pelo purge
+        if author and message.author.id != author.id:
+            return False
+        if bots and not message.author.bot:
+            return False
+        if contains and contains not in message.content.lower():
+            return False
+        if pattern and not pattern.match(message.content):
+            return False
+        if links and not URL_PATTERN.search(message.content):
+            return False
+        if attachments and not message.attachments:
+            return False
+        return True
+
+    return check
+
+
+class PurgeCommand(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.old_limiter = RateLimiter(OLD_DELETE_RATE_PER_SECOND)
+        logger.info("Cog de Purge inicializada.")
+
+    @app_commands.command(name="purge", description="Apaga mensagens do canal em massa, com filtros.")
+    @app_commands.checks.has_permissions(manage_messages=True)
+    @app_commands.checks.bot_has_permissions(manage_messages=True, read_message_history=True)
+    @app_commands.describe(
+        amount="Quantas mensagens (que passam nos filtros) apagar.",
+        author="Apagar apenas mensagens deste usuário.",
+        contains="Apagar apenas mensagens que contêm este texto.",
+        pattern="Apagar apenas mensagens que casam com este padrão (* = qualquer texto, ? = um caractere).",
+        links="Apenas mensagens com links.",
+        attachments="Apenas mensagens com anexos.",
+        bots="Apenas mensagens de bots.",
+        before="Apenas mensagens anteriores a este ID de mensagem.",
+        after="Apenas mensagens posteriores a este ID de mensagem."
+    )
+    async def purge(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1, 1000],
+                    author: Optional[discord.User] = None, contains: Optional[str] = None, pattern: Optional[str] = None,
+                    links: bool = False, attachments: bool = False, bots: bool = False,
+                    before: Optional[str] = None, after: Optional[str] = None):
+        channel = interaction.channel
+        if pattern and len(pattern) > MAX_PATTERN_LENGTH:
+            return await interaction.response.send_message(f"❌ O padrão pode ter no máximo {MAX_PATTERN_LENGTH} caracteres.", ephemeral=True)
+        try:
+            before_obj = discord.Object(id=int(before)) if before else None
+            after_obj = discord.Object(id=int(after)) if after else None
+        except ValueError:
+            return await interaction.response.send_message("❌ `before` e `after` devem ser IDs de mensagem.", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+        check = build_filter(author, contains, compile_glob(pattern) if pattern else None, links, attachments, bots)
+        progress = ProgressMessage(await interaction.followup.send(f"⏳ Procurando mensagens em {channel.mention}...", ephemeral=True, wait=True), "Apagando")
+
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        batch: list[discord.Message] = []
+        old_messages: list[discord.Message] = []
+        bulk_deleted = scanned = matched = 0
+        reason = f"Purge por {interaction.user} ({interaction.user.id})"
+
+        async def flush_batch():
+            nonlocal bulk_deleted
+            if not batch:
+                return
+            try:
+                await channel.delete_messages(batch, reason=reason)
+                bulk_deleted += len(batch)
+            except discord.HTTPException as e:
+                # Uma mensagem já apagada invalida o lote inteiro: refaz individualmente
+                logger.warning(f"bulk_delete falhou em {channel.id} ({e}); reenviando {len(batch)} mensagens individualmente.")
+                old_messages.extend(batch)
+            batch.clear()
+            await progress.update(bulk_deleted, amount)
+
+        single_deleted = 0
+        old_limit_reached = False
+        failure = None
+        try:
+            # O histórico é lido em páginas de 100 conforme é consumido; nada além do lote atual fica em memória.
+            # Com `after`, o discord.py lê do mais antigo para o mais novo por padrão; aqui é sempre do mais novo.
+            async for message in channel.history(limit=MAX_SCAN, before=before_obj, after=after_obj, oldest_first=False):
+                scanned += 1
+                if not check(message):
+                    continue
+                matched += 1
+                if message.created_at > cutoff:
+                    batch.append(message)
+                    if len(batch) >= BULK_DELETE_SIZE:
+                        await flush_batch()
+                else:
+                    old_messages.append(message)
+                # O histórico vem do mais novo para o mais antigo: atingido o limite de antigas, o restante também é antigo
+                if matched >= amount or len(old_messages) >= MAX_OLD_DELETES:
+                    break
+            await flush_batch()
+            old_limit_reached = len(old_messages) >= MAX_OLD_DELETES
+            del old_messages[MAX_OLD_DELETES:] # Lotes recusados pelo bulk_delete também entram nessa fila
+
+            if old_messages:
+                async def delete_one(message: discord.Message):
+                    try:
+                        await message.delete()
+                    except discord.NotFound:
+                        return False # Já apagada
+                    return True
+
+                async def report(done: int, total: int):
+                    await progress.update(bulk_deleted + done, bulk_deleted + total)
+
+                results = await run_limited(old_messages, delete_one, concurrency=1, limiter=self.old_limiter, on_progress=report)
+                single_deleted = sum(1 for _, result in results if result is True)
+        except discord.Forbidden:
+            failure = f"❌ Não tenho permissão para ler ou apagar mensagens em {channel.mention}."
+        except discord.HTTPException as e:
+            logger.error(f"Erro HTTP durante o purge em {channel.id} ({e.status}): {e}", exc_info=True)
+            failure = f"❌ O Discord retornou um erro ({e.status}) e o purge em {channel.mention} foi interrompido."
+
+        deleted = bulk_deleted + single_deleted
+        elapsed = time.perf_counter() - progress.started
+        rate = deleted / elapsed if elapsed > 0 else deleted
+        await progress.finish(
+            (f"{failure}\n🧹 Até a interrupção: " if failure else f"🧹 Purge concluído em {channel.mention}: ")
+            + f"**{deleted}** mensagens apagadas "
+            f"({bulk_deleted} em massa, {single_deleted} antigas uma a uma) de {scanned} lidas, "
+            f"em {elapsed:.1f}s ({rate:.1f} msg/s)."
+            + (f"\n⚠️ Limite de {MAX_OLD_DELETES} mensagens antigas (mais de 14 dias) por comando atingido." if old_limit_reached else "")
+        )
+
+        if deleted:
+            filters = ", ".join(
+                f"{name}={value}" for name, value in (
+                    ("author", author.id if author else None), ("contains", contains), ("pattern", pattern),
+                    ("links", links or None), ("attachments", attachments or None), ("bots", bots or None),
+                    ("before", before), ("after", after)
+                ) if value is not None
+            )
+            # target_id é sempre um usuário: sem filtro de autor, o alvo registrado é o próprio moderador (o canal fica na razão)
+            execute_query(
+                "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason) VALUES (?, ?, ?, ?, ?)",
+                (interaction.guild.id, "purge", author.id if author else interaction.user.id, interaction.user.id,
+                 f"#{channel.name}: {deleted} mensagens apagadas" + (f" ({filters})" if filters else ""))
+            )
+        logger.info(f"Purge em {channel.id} por {interaction.user.id}: {deleted} apagadas ({bulk_deleted} em massa, {single_deleted} individuais), {scanned} lidas em {elapsed:.1f}s.")
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot: commands.Bot):
+    """Adiciona o cog de Purge ao bot."""
+    await bot.add_cog(PurgeCommand(bot))
+    logger.info("Cog de Purge configurada e adicionada ao bot.")
@@ -0,0 +1,208 @@
+# cogs/moderation/temp_actions.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import datetime
+import logging
+import time
+from typing import Optional
+
+from database import execute_query, execute_many
+from utils.rate_limit import RateLimiter, run_limited
+from cogs.moderation.moderation_commands import parse_duration, TEMP_ACTION_MAX_SECONDS
+from cogs.moderation.mass_actions import log_moderation_actions
+
+logger = logging.getLogger(__name__)
+
+# Quantas expirações vencidas são lidas e processadas por vez
+EXPIRY_BATCH_SIZE = 100
+EXPIRY_CONCURRENCY = 5
+EXPIRY_RATE_PER_SECOND = 10
+# Falhas transitórias (ex: API indisponível) são tentadas de novo após este intervalo
+EXPIRY_RETRY_SECONDS = 60
+# Teto de espera do loop, para tolerar mudanças no relógio do sistema
+MAX_SLEEP_SECONDS = 3600
+
+
+class TempActions(commands.Cog):
+    """
+    Banimentos temporários e cargos temporários.
+
+    As expirações ficam em `scheduled_expiries` (indexada por expires_at). Um único loop consulta
+    MIN(expires_at), dorme até lá (ou até ser acordado por um agendamento mais próximo) e processa
+    as expirações vencidas em lotes. Após um reinício o loop simplesmente retoma pelo índice,
+    sem carregar a tabela inteira.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.limiter = RateLimiter(EXPIRY_RATE_PER_SECOND)
+        self._wakeup = asyncio.Event()
+        self._next_at: Optional[int] = None # Próximo vencimento conhecido pelo loop
+        self._task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def cog_unload(self):
+        if self._task:
+            self._task.cancel()
+
+    # --- Agendamento ---
+    def schedule(self, guild_id: int, kind: str, user_id: int, expires_at: int, reason: Optional[str],
+                 moderator_id: int, role_id: Optional[int] = None):
+        """Registra (ou substitui) a expiração de um banimento ('unban') ou cargo ('role')."""
+        execute_query(
+            "DELETE FROM scheduled_expiries WHERE guild_id = ? AND user_id = ? AND kind = ? AND role_id IS ?",
+            (guild_id, user_id, kind, role_id)
+        )
+        execute_query(
+            "INSERT INTO scheduled_expiries (guild_id, kind, user_id, role_id, expires_at, reason, moderator_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (guild_id, kind, user_id, role_id, expires_at, reason, moderator_id)
+        )
+        if self._next_at is None or expires_at < self._next_at:
+            self._wakeup.set() # Vence antes do que o loop está esperando
+        logger.info(f"Expiração '{kind}' agendada para {user_id} na guild {guild_id} em {expires_at}.")
+
+    def cancel(self, guild_id: int, kind: str, user_id: int, role_id: Optional[int] = None):
+        execute_query(
+            "DELETE FROM scheduled_expiries WHERE guild_id = ? AND user_id = ? AND kind = ? AND role_id IS ?",
+            (guild_id, user_id, kind, role_id)
+        )
+
+    # --- Loop de expiração ---
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                self._wakeup.clear()
+                row = execute_query("SELECT MIN(expires_at) FROM scheduled_expiries", fetchone=True)
+                self._next_at = row[0] if row else None
+                if self._next_at is None:
+                    await self._wakeup.wait()
+                    continue
+
+                delay = self._next_at - time.time()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, MAX_SLEEP_SECONDS))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._process_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro no loop de expirações: {e}", exc_info=True)
+                await asyncio.sleep(EXPIRY_RETRY_SECONDS)
+
+    async def _process_due(self):
+        now = int(time.time())
+        due = execute_query(
+            "SELECT id, guild_id, kind, user_id, role_id, reason FROM scheduled_expiries WHERE expires_at <= ? ORDER BY expires_at LIMIT ?",
+            (now, EXPIRY_BATCH_SIZE), fetchall=True
+        ) or []
+        if not due:
+            return
+
+        results = await run_limited(due, self._expire, concurrency=EXPIRY_CONCURRENCY, limiter=self.limiter)
+
+        finished, retry, log_rows = [], [], []
+        for (expiry_id, guild_id, kind, user_id, role_id, reason), result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Falha ao expirar '{kind}' de {user_id} na guild {guild_id}; nova tentativa em {EXPIRY_RETRY_SECONDS}s: {result}")
+                retry.append((now + EXPIRY_RETRY_SECONDS, expiry_id))
+                continue
+            finished.append((expiry_id,))
+            if result: # A ação foi de fato aplicada (não apenas descartada)
+                action = "unban" if kind == "unban" else "role_remove"
+                log_reason = f"Expiração automática: {reason}" if reason else "Expiração automática."
+                log_rows.append((guild_id, action, user_id, self.bot.user.id, log_reason, None))
+
+        execute_many("DELETE FROM scheduled_expiries WHERE id = ?", finished)
+        execute_many("UPDATE scheduled_expiries SET expires_at = ? WHERE id = ?", retry)
+        log_moderation_actions(log_rows)
+        logger.info(f"Expirações processadas: {len(log_rows)} aplicadas, {len(finished) - len(log_rows)} descartadas, {len(retry)} adiadas.")
+
+    async def _expire(self, row: tuple) -> bool:
+        """Aplica uma expiração. Retorna True se algo foi desfeito, False se não havia mais nada a fazer."""
+        _, guild_id, kind, user_id, role_id, reason = row
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return False # O bot saiu da guild
+
+        try:
+            if kind == "unban":
+                await guild.unban(discord.Object(id=user_id), reason="Banimento temporário expirado.")
+                return True
+
+            member = guild.get_member(user_id)
+            role = guild.get_role(role_id)
+            if not member or not role or role not in member.roles:
+                return False # Membro saiu, cargo apagado ou já removido manualmente
+            await member.remove_roles(role, reason="Cargo temporário expirado.")
+            return True
+        except discord.NotFound:
+            return False # Já desbanido / membro não existe mais
+        except discord.Forbidden:
+            logger.warning(f"Sem permissão para expirar '{kind}' de {user_id} na guild {guild_id}; expiração descartada.")
+            return False
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        # Desbanimento manual: a expiração pendente não é mais necessária
+        self.cancel(guild.id, "unban", user.id)
+
+    # --- Comandos ---
+    @app_commands.command(name="temprole", description="Dá um cargo a um membro por um tempo determinado.")
+    @app_commands.checks.has_permissions(manage_roles=True)
+    @app_commands.describe(
+        member="O membro que receberá o cargo.",
+        role="O cargo a ser dado.",
+        duration="Por quanto tempo (ex: 1h, 7d; máx: 365d).",
+        reason="Motivo (opcional)."
+    )
+    async def temprole(self, interaction: discord.Interaction, member: discord.Member, role: discord.Role,
+                       duration: str, reason: Optional[str] = None):
+        try:
+            delta = parse_duration(duration, max_seconds=TEMP_ACTION_MAX_SECONDS)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        if role.managed or role.is_default():
+            await interaction.response.send_message("❌ Este cargo não pode ser atribuído manualmente.", ephemeral=True)
+            return
+        if role >= interaction.guild.me.top_role:
+            await interaction.response.send_message("❌ Este cargo está acima do meu cargo mais alto.", ephemeral=True)
+            return
+        if role >= interaction.user.top_role and interaction.user.id != interaction.guild.owner_id:
+            await interaction.response.send_message("❌ Você não pode atribuir um cargo igual ou superior ao seu.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        expires_at = int((datetime.datetime.now(datetime.timezone.utc) + delta).timestamp())
+        try:
+            if role not in member.roles:
+                await member.add_roles(role, reason=reason or f"Cargo temporário ({duration}) por {interaction.user}")
+        except discord.Forbidden:
+            await interaction.followup.send("❌ Não tenho permissão para dar este cargo.", ephemeral=True)
+            return
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ Erro ao dar o cargo: {e}", ephemeral=True)
+            return
+
+        self.schedule(interaction.guild.id, "role", member.id, expires_at, reason, interaction.user.id, role_id=role.id)
+        execute_query(
+            "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason, duration) VALUES (?, ?, ?, ?, ?, ?)",
+            (interaction.guild.id, "temprole", member.id, interaction.user.id, f"{role.name}: {reason}" if reason else role.name, duration)
+        )
+        await interaction.followup.send(f"✅ {member.mention} recebeu {role.mention} até <t:{expires_at}:F> (<t:{expires_at}:R>).", ephemeral=True)
+        logger.info(f"Cargo temporário {role.id} dado a {member.id} por {interaction.user.id} na guild {interaction.guild.id} até {expires_at}.")
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot: commands.Bot):
+    """Adiciona o cog de Ações Temporárias ao bot."""
+    await bot.add_cog(TempActions(bot))
+    logger.info("Cog de Ações Temporárias configurada e adicionada ao bot.")
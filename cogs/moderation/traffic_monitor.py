@@ -0,0 +1,105 @@
+# cogs/moderation/traffic_monitor.py
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Valores de slowmode (em segundos) usados pelo auto-slowmode, do mais leve ao mais pesado
+SLOWMODE_STEPS = (0, 2, 5, 10, 15, 30, 60, 120, 300)
+# Intervalo mínimo entre duas edições de slowmode no mesmo canal (no máximo 3 por minuto)
+EDIT_COOLDOWN_SECONDS = 20
+# O slowmode só é aliviado quando a taxa cai abaixo desta fração do alvo
+RELAX_RATIO = 0.5
+
+
+class RateCounter:
+    """
+    Contador de mensagens em janela deslizante, com número fixo de buckets (ring buffer).
+    Memória constante por canal, independentemente do volume de mensagens.
+    """
+    __slots__ = ("bucket_seconds", "counts", "slots")
+
+    def __init__(self, buckets: int = 12, bucket_seconds: int = 5):
+        self.bucket_seconds = bucket_seconds
+        self.counts = [0] * buckets
+        self.slots = [-1] * buckets # Qual intervalo de tempo cada posição representa
+
+    def hit(self, now: float):
+        slot = int(now // self.bucket_seconds)
+        index = slot % len(self.counts)
+        if self.slots[index] != slot: # Posição reaproveitada: o intervalo antigo saiu da janela
+            self.slots[index] = slot
+            self.counts[index] = 0
+        self.counts[index] += 1
+
+    def per_minute(self, now: float) -> float:
+        oldest = int(now // self.bucket_seconds) - len(self.counts) + 1
+        total = sum(count for count, slot in zip(self.counts, self.slots) if slot >= oldest)
+        return total * 60 / (len(self.counts) * self.bucket_seconds)
+
+
+class ChannelTraffic:
+    __slots__ = ("counter", "last_edit", "original_delay")
+
+    def __init__(self, original_delay: Optional[int] = None, last_edit: float = 0.0):
+        self.counter = RateCounter()
+        self.last_edit = last_edit
+        # Slowmode do canal antes do auto-slowmode agir (None se o bot não alterou o canal)
+        self.original_delay = original_delay
+
+
+def _step_index(delay: int) -> int:
+    """Índice do maior degrau menor ou igual a `delay`."""
+    index = 0
+    for i, step in enumerate(SLOWMODE_STEPS):
+        if step <= delay:
+            index = i
+    return index
+
+
+class TrafficMonitor:
+    """Mantém os contadores por canal e decide quando subir ou aliviar o slowmode."""
+    def __init__(self):
+        self.channels: dict[int, ChannelTraffic] = {}
+
+    def record(self, channel_id: int, now: float) -> ChannelTraffic:
+        traffic = self.channels.get(channel_id)
+        if traffic is None:
+            traffic = self.channels[channel_id] = ChannelTraffic()
+        traffic.counter.hit(now)
+        return traffic
+
+    def next_delay(self, traffic: ChannelTraffic, now: float, current_delay: int, threshold: int, max_delay: int) -> Optional[int]:
+        """
+        Retorna o novo slowmode do canal, ou None se nada deve mudar agora
+        (dentro do cooldown de edição, taxa dentro do alvo ou já no limite).
+        """
+        if now - traffic.last_edit < EDIT_COOLDOWN_SECONDS:
+            return None
+        rate = traffic.counter.per_minute(now)
+
+        if rate > threshold:
+            # Quanto mais acima do alvo, maior o salto (1 a 3 degraus por edição)
+            ratio = rate / threshold
+            jump = 1 if ratio < 2 else 2 if ratio < 4 else 3
+            index = min(_step_index(current_delay) + jump, len(SLOWMODE_STEPS) - 1)
+            target = min(SLOWMODE_STEPS[index], max_delay)
+            return target if target > current_delay else None
+
+        if traffic.original_delay is not None and rate < threshold * RELAX_RATIO:
+            if current_delay <= traffic.original_delay:
+                return traffic.original_delay if current_delay != traffic.original_delay else None
+            index = _step_index(current_delay)
+            if SLOWMODE_STEPS[index] == current_delay:
+                index -= 1
+            return max(SLOWMODE_STEPS[max(index, 0)], traffic.original_delay)
+        return None
+
+    def forget_idle(self, now: float):
+        """Descarta contadores de canais sem tráfego que o bot não está controlando."""
+        idle = [
+            channel_id for channel_id, traffic in self.channels.items()
+            if traffic.original_delay is None and traffic.counter.per_minute(now) == 0
+        ]
+        for channel_id in idle:
+            del self.channels[channel_id]
@@ -0,0 +1,153 @@
+# cogs/utility/export_commands.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Literal
+
+from database import iterate_query
+
+logger = logging.getLogger(__name__)
+
+# Linhas lidas do banco por vez (o resultado completo nunca fica na memória)
+EXPORT_CHUNK_SIZE = 1000
+# Folga abaixo do limite de upload: o gzip ainda guarda dados em buffer e um bloco inteiro é escrito antes de verificar o tamanho
+PART_SIZE_MARGIN = 2 * 1024 * 1024
+
+# Conjuntos exportáveis: query (filtrada por guild) e colunas
+EXPORT_DATASETS = {
+    "moderation_logs": (
+        "SELECT log_id, case_no, guild_id, action, target_id, moderator_id, reason, timestamp, duration FROM moderation_logs WHERE guild_id = ? ORDER BY log_id",
+        ["log_id", "case_no", "guild_id", "action", "target_id", "moderator_id", "reason", "timestamp", "duration"],
+    ),
+    "tickets": (
+        "SELECT ticket_id, guild_id, user_id, channel_id, opened_at, status, closed_by_id, closed_at FROM active_tickets WHERE guild_id = ? ORDER BY ticket_id",
+        ["ticket_id", "guild_id", "user_id", "channel_id", "opened_at", "status", "closed_by_id", "closed_at"],
+    ),
+}
+
+
+class _PartWriter:
+    """Escreve linhas em arquivos .gz sucessivos, abrindo uma nova parte quando a atual chega ao tamanho máximo."""
+    def __init__(self, directory: str, basename: str, fmt: str, columns: list[str], max_bytes: int):
+        self.directory = directory
+        self.basename = basename
+        self.fmt = fmt
+        self.columns = columns
+        self.max_bytes = max_bytes
+        self.paths: list[str] = []
+        self.rows_written = 0
+        self._raw = self._gzip = self._text = self._csv = None
+
+    def _open_part(self):
+        path = os.path.join(self.directory, f"{self.basename}.part{len(self.paths) + 1}.{self.fmt}.gz")
+        self.paths.append(path)
+        self._raw = open(path, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._text = io.TextIOWrapper(self._gzip, encoding="utf-8", newline="")
+        if self.fmt == "csv":
+            self._csv = csv.writer(self._text)
+            self._csv.writerow(self.columns) # Cabeçalho repetido em cada parte
+
+    def _close_part(self):
+        if self._text:
+            self._text.close() # Fecha também o GzipFile (que escreve o rodapé)
+            self._raw.close()
+            self._raw = self._gzip = self._text = self._csv = None
+
+    def write_rows(self, rows: list[tuple]):
+        if self._text is None:
+            self._open_part()
+        if self.fmt == "csv":
+            self._csv.writerows(rows)
+        else:
+            for row in rows:
+                self._text.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n")
+        self.rows_written += len(rows)
+        self._text.flush()
+        if self._raw.tell() >= self.max_bytes:
+            self._close_part()
+
+    def close(self) -> list[str]:
+        self._close_part()
+        return self.paths
+
+
+def export_to_files(query: str, params: tuple, columns: list[str], fmt: str, directory: str, basename: str, max_bytes: int):
+    """Executado em uma thread: lê do banco em blocos e grava direto nos arquivos comprimidos."""
+    writer = _PartWriter(directory, basename, fmt, columns, max_bytes)
+    try:
+        for rows in iterate_query(query, params, chunk_size=EXPORT_CHUNK_SIZE):
+            writer.write_rows(rows)
+    finally:
+        paths = writer.close()
+    return paths, writer.rows_written
+
+
+class ExportCommands(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._running: set[int] = set() # Uma exportação por guild de cada vez
+
+    @app_commands.command(name="export", description="Exporta o histórico de moderação ou de tickets em CSV/JSONL comprimido.")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(
+        dataset="O que exportar: logs de moderação ou tickets.",
+        file_format="Formato do arquivo: csv ou jsonl (ambos comprimidos com gzip)."
+    )
+    async def export(self, interaction: discord.Interaction, dataset: Literal["moderation_logs", "tickets"],
+                     file_format: Literal["csv", "jsonl"] = "csv"):
+        if interaction.guild.id in self._running:
+            await interaction.response.send_message("⚠️ Já existe uma exportação em andamento neste servidor.", ephemeral=True)
+            return
+        await interaction.response.defer(ephemeral=True)
+        self._running.add(interaction.guild.id)
+
+        query, columns = EXPORT_DATASETS[dataset]
+        max_bytes = max(interaction.guild.filesize_limit - PART_SIZE_MARGIN, 1024 * 1024)
+        basename = f"{dataset}_{interaction.guild.id}_{time.strftime('%Y%m%d_%H%M%S')}"
+        directory = tempfile.mkdtemp(prefix="export_")
+        started = time.perf_counter()
+        try:
+            paths, rows_written = await asyncio.to_thread(
+                export_to_files, query, (interaction.guild.id,), columns, file_format, directory, basename, max_bytes
+            )
+            if not rows_written:
+                await interaction.followup.send("ℹ️ Não há registros para exportar.", ephemeral=True)
+                return
+
+            elapsed = time.perf_counter() - started
+            await interaction.followup.send(
+                f"📦 Exportação de `{dataset}` concluída: {rows_written} registros em {len(paths)} arquivo(s) ({elapsed:.1f}s).",
+                ephemeral=True
+            )
+            # Um arquivo por mensagem, para que cada envio fique dentro do limite de upload
+            for index, path in enumerate(paths, start=1):
+                await interaction.followup.send(
+                    content=f"Parte {index}/{len(paths)}",
+                    file=discord.File(path, filename=os.path.basename(path)),
+                    ephemeral=True
+                )
+            logger.info(f"Exportação de '{dataset}' ({file_format}) da guild {interaction.guild.id} por {interaction.user.id}: {rows_written} registros, {len(paths)} partes.")
+        except Exception as e:
+            await interaction.followup.send(f"❌ Ocorreu um erro durante a exportação: {e}", ephemeral=True)
+            logger.error(f"Erro na exportação de '{dataset}' da guild {interaction.guild.id}: {e}", exc_info=True)
+        finally:
+            self._running.discard(interaction.guild.id)
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# Esta função é CRUCIAL para o bot carregar o cog.
+async def setup(bot: commands.Bot):
+    """Adiciona o cog de Exportação ao bot."""
+    await bot.add_cog(ExportCommands(bot))
+    logger.info("Cog de Exportação configurada e adicionada ao bot.")
@@ -0,0 +1,60 @@
+# cogs/utility/ticket_index.py
+import asyncio
+import contextlib
+import logging
+from typing import Optional
+
+from database import execute_query
+
+logger = logging.getLogger(__name__)
+
+
+class OpenTicketIndex:
+    """
+    Índice em memória dos tickets abertos: (guild_id, user_id) -> channel_id, e o inverso por canal.
+    Carregado uma vez de active_tickets e mantido pelo próprio sistema de tickets ao abrir/fechar.
+    Também fornece um lock por (guild_id, user_id), para que cliques simultâneos do mesmo usuário
+    não criem dois canais: o segundo espera o primeiro terminar e encontra o ticket já no índice.
+    """
+    def __init__(self):
+        self._by_user: dict[tuple[int, int], int] = {}
+        self._by_channel: dict[int, tuple[int, int]] = {}
+        self._locks: dict[tuple[int, int], list] = {} # chave -> [Lock, número de usuários do lock]
+        for guild_id, user_id, channel_id in execute_query(
+            "SELECT guild_id, user_id, channel_id FROM active_tickets WHERE status = 'open'", fetchall=True
+        ) or []:
+            self.add(guild_id, user_id, channel_id)
+        logger.info(f"Índice de tickets abertos carregado ({len(self._by_user)} tickets).")
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._by_channel
+
+    def channel_for(self, guild_id: int, user_id: int) -> Optional[int]:
+        return self._by_user.get((guild_id, user_id))
+
+    def owner_of(self, channel_id: int) -> Optional[tuple[int, int]]:
+        """Retorna (guild_id, user_id) do ticket aberto no canal, ou None se o canal não for um ticket aberto."""
+        return self._by_channel.get(channel_id)
+
+    def add(self, guild_id: int, user_id: int, channel_id: int):
+        self._by_user[(guild_id, user_id)] = channel_id
+        self._by_channel[channel_id] = (guild_id, user_id)
+
+    def remove_channel(self, channel_id: int):
+        key = self._by_channel.pop(channel_id, None)
+        if key and self._by_user.get(key) == channel_id:
+            del self._by_user[key]
+
+    @contextlib.asynccontextmanager
+    async def lock(self, guild_id: int, user_id: int):
+        """Lock por usuário; é descartado quando ninguém mais o está usando."""
+        key = (guild_id, user_id)
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
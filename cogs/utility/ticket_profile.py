@@ -0,0 +1,108 @@
+# cogs/utility/ticket_profile.py
+import discord
+from discord import PermissionOverwrite
+import json
+import logging
+from typing import Optional
+
+from database import execute_query
+
+logger = logging.getLogger(__name__)
+
+USER_PLACEHOLDER = "{user}"
+GUILD_PLACEHOLDER = "{guild}"
+
+MEMBER_OVERWRITE = PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True)
+BOT_OVERWRITE = PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True, manage_channels=True)
+
+
+class TicketProfile:
+    """
+    Configuração de tickets de uma guild já resolvida: categoria, cargo de suporte, modelo de permissões
+    e embed inicial (JSON já decodificado, com {guild} substituído). Abrir um ticket só completa o que
+    depende do usuário ({user} e a permissão dele no canal).
+    """
+    def __init__(self, guild: discord.Guild, category_id: Optional[int], transcript_channel_id: Optional[int],
+                 ticket_role_id: Optional[int], initial_embed_json: Optional[str]):
+        self.guild_id = guild.id
+        self.transcript_channel_id = transcript_channel_id
+        channel = guild.get_channel(category_id) if category_id else None
+        self.category: Optional[discord.CategoryChannel] = channel if isinstance(channel, discord.CategoryChannel) else None
+        self.role: Optional[discord.Role] = guild.get_role(ticket_role_id) if ticket_role_id else None
+        if ticket_role_id and not self.role:
+            logger.warning(f"Cargo de ticket configurado ({ticket_role_id}) não encontrado no guild {guild.id}.")
+
+        self.base_overwrites = {
+            guild.default_role: PermissionOverwrite(read_messages=False),
+            guild.me: BOT_OVERWRITE,
+        }
+        if self.role:
+            self.base_overwrites[self.role] = MEMBER_OVERWRITE
+
+        self.greeting = "{mention}, seu ticket foi aberto! A equipe de suporte estará com você em breve."
+        if self.role:
+            self.greeting += f"\n{self.role.mention}" # Menciona o cargo de suporte
+
+        self.embed_template: Optional[dict] = None
+        self._user_fields: list[tuple[str, Optional[str]]] = [] # (chave, subchave) dos textos com {user}
+        if initial_embed_json:
+            try:
+                self.embed_template = self._compile_embed(json.loads(initial_embed_json), guild.name)
+            except json.JSONDecodeError:
+                logger.error(f"Erro ao decodificar JSON do embed inicial do ticket para guild {guild.id}.")
+
+    def _compile_embed(self, embed_data: dict, guild_name: str) -> dict:
+        # Mesmas regras de substituição de antes: textos no primeiro nível e dentro de objetos (author, footer...)
+        for key, value in embed_data.items():
+            if isinstance(value, str):
+                embed_data[key] = value.replace(GUILD_PLACEHOLDER, guild_name)
+                if USER_PLACEHOLDER in value:
+                    self._user_fields.append((key, None))
+            elif isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, str):
+                        value[sub_key] = sub_value.replace(GUILD_PLACEHOLDER, guild_name)
+                        if USER_PLACEHOLDER in sub_value:
+                            self._user_fields.append((key, sub_key))
+        return embed_data
+
+    def overwrites_for(self, member: discord.Member) -> dict:
+        overwrites = dict(self.base_overwrites)
+        overwrites[member] = MEMBER_OVERWRITE
+        return overwrites
+
+    def initial_message(self, member: discord.Member) -> str:
+        return self.greeting.format(mention=member.mention)
+
+    def initial_embed(self, member: discord.Member) -> Optional[discord.Embed]:
+        if self.embed_template is None:
+            return None
+        embed_data = dict(self.embed_template)
+        for key, sub_key in self._user_fields:
+            if sub_key is None:
+                embed_data[key] = embed_data[key].replace(USER_PLACEHOLDER, member.mention)
+            else:
+                embed_data[key] = {**embed_data[key], sub_key: embed_data[key][sub_key].replace(USER_PLACEHOLDER, member.mention)}
+        return discord.Embed.from_dict(embed_data)
+
+
+class TicketProfileCache:
+    """
+    Cache por guild dos TicketProfile. Carregado do banco no primeiro uso e descartado pelos comandos
+    que alteram ticket_settings e pelos eventos que mudam o que foi resolvido (categoria/cargo removidos, nome da guild).
+    """
+    def __init__(self):
+        self._profiles: dict[int, Optional[TicketProfile]] = {}
+
+    def get(self, guild: discord.Guild) -> Optional[TicketProfile]:
+        """Retorna o perfil da guild, ou None se o sistema de tickets não estiver configurado nela."""
+        if guild.id not in self._profiles:
+            settings = execute_query(
+                "SELECT category_id, transcript_channel_id, ticket_role_id, ticket_initial_embed_json FROM ticket_settings WHERE guild_id = ?",
+                (guild.id,), fetchone=True
+            )
+            self._profiles[guild.id] = TicketProfile(guild, *settings) if settings else None
+        return self._profiles[guild.id]
+
+    def invalidate(self, guild_id: int):
+        self._profiles.pop(guild_id, None)
@@ -1,114 +1,103 @@
 # cogs/utility/ticket_system.py
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import logging
 from discord.ui import Button, View
-from discord import ButtonStyle, app_commands, PermissionOverwrite
-from database import execute_query
+from discord import ButtonStyle, app_commands
+from database import execute_query, execute_many, insert_ticket_transcript
+from utils.persistent_views import PanelType
 import json # Para lidar com embeds
+import asyncio
+import itertools
+import os
+import shutil
+import tempfile
+import time
 from typing import Optional # Adicionado: Importa Optional para tipagem
+from config import TRANSCRIPT_STORE_DIR
+from cogs.utility.ticket_transcript import generate_transcript, iter_index
+from cogs.utility.transcript_store import TranscriptStore
+from cogs.utility.ticket_profile import TicketProfileCache
+from cogs.utility.ticket_index import OpenTicketIndex
+from cogs.moderation.moderation_commands import build_fts_query
 
 logger = logging.getLogger(__name__)
 
+# Intervalo de gravação em lote da última atividade dos tickets (mensagens não geram escrita no DB)
+ACTIVITY_FLUSH_SECONDS = 60
+# Intervalo da verificação de tickets inativos
+AUTO_CLOSE_CHECK_MINUTES = 10
+# Tempo entre o aviso de inatividade e o fechamento (limitado ao próprio prazo configurado)
+AUTO_CLOSE_WARNING_SECONDS = 12 * 3600
+# Fechamentos automáticos simultâneos (cada um lê o histórico, baixa anexos e envia a transcrição)
+AUTO_CLOSE_CONCURRENCY = 2
+
 class TicketPanelButtons(View):
-    def __init__(self, bot):
+    def __init__(self, bot, profiles: TicketProfileCache, open_tickets: OpenTicketIndex):
         super().__init__(timeout=None)
         self.bot = bot
+        self.profiles = profiles
+        self.open_tickets = open_tickets
 
     @discord.ui.button(label="Abrir Ticket", style=ButtonStyle.primary, custom_id="ticket_system:open_ticket")
     async def open_ticket(self, interaction: discord.Interaction, button: Button):
         await interaction.response.defer(ephemeral=True) # Defer para evitar timeout
 
+        # Cliques repetidos do mesmo usuário esperam aqui; quando o primeiro termina, o ticket já está no índice
+        async with self.open_tickets.lock(interaction.guild.id, interaction.user.id):
+            await self._open_ticket(interaction)
+
+    async def _open_ticket(self, interaction: discord.Interaction):
         guild_id = interaction.guild.id
         user_id = interaction.user.id
 
-        # Verifica se o usuário já tem um ticket aberto
-        existing_ticket = execute_query(
-            "SELECT channel_id FROM active_tickets WHERE guild_id = ? AND user_id = ? AND status = 'open'",
-            (guild_id, user_id), fetchone=True
-        )
+        # Verifica se o usuário já tem um ticket aberto (índice em memória, sem consultar o DB)
+        existing_channel_id = self.open_tickets.channel_for(guild_id, user_id)
 
-        if existing_ticket:
-            existing_channel = self.bot.get_channel(existing_ticket[0])
+        if existing_channel_id:
+            existing_channel = interaction.guild.get_channel(existing_channel_id)
             if existing_channel:
                 return await interaction.followup.send(f"Você já tem um ticket aberto: {existing_channel.mention}", ephemeral=True)
             else:
                 # O canal não existe mais, remove do DB
-                execute_query("DELETE FROM active_tickets WHERE channel_id = ?", (existing_ticket[0],))
+                execute_query("DELETE FROM active_tickets WHERE channel_id = ?", (existing_channel_id,))
+                self.open_tickets.remove_channel(existing_channel_id)
 
 
-        # Obter configurações do ticket para o guild
-        settings = execute_query(
-            "SELECT category_id, transcript_channel_id, ticket_role_id, ticket_initial_embed_json FROM ticket_settings WHERE guild_id = ?",
-            (guild_id,), fetchone=True
-        )
+        # Configurações do ticket para o guild (cache; recarregado só quando alguma configuração muda)
+        profile = self.profiles.get(interaction.guild)
 
-        if not settings:
+        if not profile:
             return await interaction.followup.send("❌ O sistema de tickets não está configurado para este servidor.", ephemeral=True)
 
-        category_id, transcript_channel_id, ticket_role_id, initial_embed_json = settings
-        category = interaction.guild.get_channel(category_id)
-        
-        if not category or not isinstance(category, discord.CategoryChannel):
+        if not profile.category:
             return await interaction.followup.send("❌ A categoria de tickets configurada não é válida ou não foi encontrada.", ephemeral=True)
 
-        # Definir permissões para o novo canal de ticket
-        overwrites = {
-            interaction.guild.default_role: PermissionOverwrite(read_messages=False),
-            interaction.user: PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True),
-            self.bot.user: PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True, manage_channels=True)
-        }
-
-        # Adicionar permissão para o cargo de suporte, se configurado
-        if ticket_role_id:
-            ticket_role = interaction.guild.get_role(ticket_role_id)
-            if ticket_role:
-                overwrites[ticket_role] = PermissionOverwrite(read_messages=True, send_messages=True, attach_files=True)
-            else:
-                logger.warning(f"Cargo de ticket configurado ({ticket_role_id}) não encontrado no guild {guild_id}.")
-
         try:
             # Criar o canal de ticket
             ticket_channel = await interaction.guild.create_text_channel(
                 name=f"ticket-{interaction.user.name.lower().replace(' ', '-')}",
-                category=category,
-                overwrites=overwrites,
+                category=profile.category,
+                overwrites=profile.overwrites_for(interaction.user),
                 topic=f"Ticket de {interaction.user.name} (ID: {user_id})"
             )
 
-            # Inserir ticket no DB
-            execute_query(
-                "INSERT INTO active_tickets (guild_id, user_id, channel_id, status) VALUES (?, ?, ?, ?)",
-                (guild_id, user_id, ticket_channel.id, 'open')
-            )
+            # Inserir ticket no DB (o índice único parcial garante um ticket aberto por usuário)
+            if not execute_query(
+                "INSERT INTO active_tickets (guild_id, user_id, channel_id, status, last_activity_at) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, user_id, ticket_channel.id, 'open', int(time.time()))
+            ):
+                await ticket_channel.delete(reason="Falha ao registrar o ticket")
+                return await interaction.followup.send("❌ Não foi possível registrar o ticket. Tente novamente.", ephemeral=True)
+            self.open_tickets.add(guild_id, user_id, ticket_channel.id)
             
             # Enviar mensagem inicial no ticket
-            ticket_initial_message_content = f"{interaction.user.mention}, seu ticket foi aberto! A equipe de suporte estará com você em breve."
-            if ticket_role_id and ticket_role:
-                ticket_initial_message_content += f"\n{ticket_role.mention}" # Menciona o cargo de suporte
-
-            if initial_embed_json:
-                try:
-                    embed_data = json.loads(initial_embed_json)
-                    # Substituir placeholders no embed inicial do ticket
-                    for key, value in embed_data.items():
-                        if isinstance(value, str):
-                            embed_data[key] = value.replace("{user}", interaction.user.mention).replace("{guild}", interaction.guild.name)
-                        elif isinstance(value, dict):
-                            for sub_key, sub_value in value.items():
-                                if isinstance(sub_value, str):
-                                    embed_data[key][sub_key] = sub_value.replace("{user}", interaction.user.mention).replace("{guild}", interaction.guild.name)
-                    
-                    ticket_embed = discord.Embed.from_dict(embed_data)
-                    await ticket_channel.send(content=ticket_initial_message_content, embed=ticket_embed)
-                except json.JSONDecodeError:
-                    logger.error(f"Erro ao decodificar JSON do embed inicial do ticket para guild {guild_id}.")
-                    await ticket_channel.send(ticket_initial_message_content) # Envia apenas a mensagem se o embed falhar
-                except Exception as e:
-                    logger.error(f"Erro ao enviar embed inicial do ticket para guild {guild_id}: {e}", exc_info=True)
-                    await ticket_channel.send(ticket_initial_message_content) # Envia apenas a mensagem se o embed falhar
-            else:
-                await ticket_channel.send(ticket_initial_message_content)
+            ticket_initial_message_content = profile.initial_message(interaction.user)
+            try:
+                await ticket_channel.send(content=ticket_initial_message_content, embed=profile.initial_embed(interaction.user))
+            except Exception as e:
+                logger.error(f"Erro ao enviar embed inicial do ticket para guild {guild_id}: {e}", exc_info=True)
+                await ticket_channel.send(ticket_initial_message_content) # Envia apenas a mensagem se o embed falhar
 
 
             await interaction.followup.send(f"✅ Seu ticket foi aberto em {ticket_channel.mention}", ephemeral=True)
@@ -124,15 +113,150 @@ class TicketPanelButtons(View):
 class TicketSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.transcript_store = TranscriptStore(TRANSCRIPT_STORE_DIR)
+        self.profiles = TicketProfileCache()
+        self.open_tickets = OpenTicketIndex()
+        self._activity: dict[int, int] = {} # channel_id -> epoch da última mensagem ainda não gravada
+        self._auto_close_semaphore = asyncio.Semaphore(AUTO_CLOSE_CONCURRENCY)
+        self._auto_closing: dict[int, asyncio.Task] = {} # channel_id -> fechamento automático em andamento
+        self.flush_activity.start()
+        self.auto_close_check.start()
         logger.info("Cog de Sistema de Tickets inicializada.")
-        self.bot.add_view(TicketPanelButtons(self.bot)) # Adiciona a view persistente
+        # A view persistente é restaurada pelo registro central junto com os demais painéis
+        self.bot.persistent_views.register(PanelType(
+            name="ticket_panel",
+            load_rows=lambda: execute_query(
+                "SELECT guild_id, ticket_channel_id, ticket_message_id FROM ticket_settings WHERE ticket_channel_id IS NOT NULL AND ticket_message_id IS NOT NULL",
+                fetchall=True
+            ),
+            make_view=lambda guild_id: TicketPanelButtons(self.bot, self.profiles, self.open_tickets),
+            # Apenas desvincula o painel; as demais configurações de ticket permanecem
+            cleanup_query="UPDATE ticket_settings SET ticket_channel_id = NULL, ticket_message_id = NULL, panel_embed_json = NULL WHERE guild_id IN ({placeholders})"
+        ))
+
+    def cog_unload(self):
+        self.bot.persistent_views.unregister("ticket_panel")
+        self.auto_close_check.cancel()
+        for task in self._auto_closing.values():
+            task.cancel() # O ticket continua aberto no DB e será fechado na próxima verificação
+        self.flush_activity.cancel()
+        self._flush_activity()
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        # Só memória: a atividade é gravada em lote por flush_activity
+        if not message.author.bot and message.channel.id in self.open_tickets:
+            self._activity[message.channel.id] = int(time.time())
+
+    def _flush_activity(self):
+        if not self._activity:
+            return
+        pending, self._activity = self._activity, {}
+        # Nova atividade também cancela um aviso de fechamento por inatividade
+        execute_many(
+            "UPDATE active_tickets SET last_activity_at = ?, inactivity_warned_at = NULL WHERE channel_id = ? AND status = 'open'",
+            [(timestamp, channel_id) for channel_id, timestamp in pending.items()]
+        )
+
+    @tasks.loop(seconds=ACTIVITY_FLUSH_SECONDS)
+    async def flush_activity(self):
+        self._flush_activity()
+
+    @tasks.loop(minutes=AUTO_CLOSE_CHECK_MINUTES)
+    async def auto_close_check(self):
+        """Avisa nos tickets inativos além do prazo da guild e fecha os que continuaram inativos após o aviso."""
+        self._flush_activity()
+        shortest = execute_query("SELECT MIN(auto_close_hours) FROM ticket_settings WHERE auto_close_hours > 0", fetchone=True)
+        if not shortest or not shortest[0]:
+            return
+        now = int(time.time())
+        # A faixa pelo menor prazo configurado usa o índice parcial de last_activity_at; o prazo de cada guild filtra o resto
+        stale = execute_query(
+            """
+            SELECT a.ticket_id, a.guild_id, a.user_id, a.channel_id, a.inactivity_warned_at, s.auto_close_hours
+            FROM active_tickets a
+            JOIN ticket_settings s ON s.guild_id = a.guild_id
+            WHERE a.status = 'open' AND a.last_activity_at < ?
+              AND s.auto_close_hours > 0 AND a.last_activity_at < ? - s.auto_close_hours * 3600
+            """,
+            (now - shortest[0] * 3600, now), fetchall=True
+        ) or []
+
+        warned = []
+        for ticket_id, guild_id, user_id, channel_id, warned_at, hours in stale:
+            channel = self.bot.get_channel(channel_id)
+            if not channel:
+                # O canal foi apagado manualmente: o ticket só é marcado como fechado
+                execute_query("UPDATE active_tickets SET status = 'closed', closed_at = CURRENT_TIMESTAMP WHERE ticket_id = ?", (ticket_id,))
+                self.open_tickets.remove_channel(channel_id)
+                continue
+            grace = min(AUTO_CLOSE_WARNING_SECONDS, hours * 3600)
+            if warned_at is None:
+                try:
+                    await channel.send(
+                        f"⏰ <@{user_id}>, este ticket está sem atividade há mais de {hours}h e será fechado automaticamente "
+                        f"<t:{now + grace}:R> se não houver novas mensagens."
+                    )
+                    warned.append((now, ticket_id))
+                except discord.HTTPException as e:
+                    logger.warning(f"Não foi possível avisar sobre inatividade no ticket {ticket_id}: {e}")
+            elif now - warned_at >= grace and channel_id not in self._auto_closing:
+                # Cada fechamento roda na sua própria task: um acúmulo de tickets não trava este loop nem o flush de atividade
+                task = asyncio.create_task(self._auto_close(channel, ticket_id, user_id, hours))
+                self._auto_closing[channel_id] = task
+                task.add_done_callback(lambda _, channel_id=channel_id: self._auto_closing.pop(channel_id, None))
+        if warned:
+            execute_many("UPDATE active_tickets SET inactivity_warned_at = ? WHERE ticket_id = ?", warned)
+            logger.info(f"{len(warned)} tickets avisados sobre fechamento por inatividade.")
+
+    async def _auto_close(self, channel: discord.TextChannel, ticket_id: int, user_id: int, hours: int):
+        async with self._auto_close_semaphore:
+            try:
+                await self.close_ticket_channel(
+                    channel, ticket_id, user_id, channel.guild.me,
+                    lambda content, **kwargs: channel.send(content),
+                    reason=f"Ticket fechado automaticamente após {hours}h sem atividade"
+                )
+            except Exception as e:
+                logger.error(f"Erro ao fechar automaticamente o ticket {ticket_id}: {e}", exc_info=True)
+
+    @auto_close_check.before_loop
+    async def before_auto_close_check(self):
+        await self.bot.wait_until_ready()
+
+    def _update_setting(self, guild_id: int, column: str, value):
+        """Altera uma única coluna de ticket_settings, preservando as demais, e descarta o perfil em cache da guild."""
+        execute_query(
+            f"INSERT INTO ticket_settings (guild_id, {column}) VALUES (?, ?) ON CONFLICT(guild_id) DO UPDATE SET {column} = excluded.{column}",
+            (guild_id, value)
+        )
+        self.profiles.invalidate(guild_id)
+
+    # O perfil guarda a categoria, o cargo e o nome da guild já resolvidos; estes eventos o tornam obsoleto
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        if isinstance(channel, discord.CategoryChannel):
+            self.profiles.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.profiles.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        if before.name != after.name:
+            self.profiles.invalidate(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.profiles.invalidate(guild.id)
 
     @commands.hybrid_group(name="ticket", description="Comandos para gerenciar o sistema de tickets.")
     @commands.has_permissions(manage_channels=True)
     async def ticket_group(self, ctx: commands.Context):
         """Comandos para gerenciar o sistema de tickets."""
         if ctx.invoked_subcommand is None:
-            await ctx.send("Comando inválido para ticket. Use `setup_panel`, `remove_panel`, `set_category`, `set_transcript_channel`, `set_role`, `set_initial_embed`, `close`, `add_user`, `remove_user`.")
+            await ctx.send("Comando inválido para ticket. Use `setup_panel`, `remove_panel`, `set_category`, `set_transcript_channel`, `set_role`, `set_initial_embed`, `set_auto_close`, `search`, `transcript`, `close`, `add_user`, `remove_user`.")
 
     @ticket_group.command(name="setup_panel", description="Configura o painel de criação de tickets em um canal.")
     @app_commands.describe(
@@ -169,13 +293,16 @@ class TicketSystem(commands.Cog):
             panel_embed.set_footer(text="Ao abrir um ticket, um novo canal privado será criado para você.")
 
         try:
-            message = await channel.send(embed=panel_embed, view=TicketPanelButtons(self.bot))
+            message = await channel.send(embed=panel_embed, view=TicketPanelButtons(self.bot, self.profiles, self.open_tickets))
             
             # Salva no banco de dados
             execute_query(
-                "INSERT OR REPLACE INTO ticket_settings (guild_id, ticket_channel_id, ticket_message_id, panel_embed_json) VALUES (?, ?, ?, ?)",
+                "INSERT INTO ticket_settings (guild_id, ticket_channel_id, ticket_message_id, panel_embed_json) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(guild_id) DO UPDATE SET ticket_channel_id = excluded.ticket_channel_id, "
+                "ticket_message_id = excluded.ticket_message_id, panel_embed_json = excluded.panel_embed_json",
                 (ctx.guild.id, channel.id, message.id, panel_embed_json)
             )
+            self.profiles.invalidate(ctx.guild.id)
             await ctx.send(f"✅ Painel de tickets configurado em {channel.mention}.", ephemeral=True)
             logger.info(f"Painel de tickets configurado no guild {ctx.guild.id} no canal {channel.id} (message_id: {message.id}).")
         except discord.Forbidden:
@@ -227,21 +354,21 @@ class TicketSystem(commands.Cog):
     @ticket_group.command(name="set_category", description="Define a categoria para novos canais de ticket.")
     @app_commands.describe(category="A categoria onde os tickets serão criados.")
     async def set_category(self, ctx: commands.Context, category: discord.CategoryChannel):
-        execute_query("INSERT OR REPLACE INTO ticket_settings (guild_id, category_id) VALUES (?, ?)", (ctx.guild.id, category.id))
+        self._update_setting(ctx.guild.id, "category_id", category.id)
         await ctx.send(f"✅ Categoria para tickets definida para: {category.mention}")
         logger.info(f"Categoria de tickets para guild {ctx.guild.id} definida como {category.id}.")
 
     @ticket_group.command(name="set_transcript_channel", description="Define o canal para transcrições de tickets fechados.")
     @app_commands.describe(channel="O canal onde as transcrições serão enviadas.")
     async def set_transcript_channel(self, ctx: commands.Context, channel: discord.TextChannel):
-        execute_query("INSERT OR REPLACE INTO ticket_settings (guild_id, transcript_channel_id) VALUES (?, ?)", (ctx.guild.id, channel.id))
+        self._update_setting(ctx.guild.id, "transcript_channel_id", channel.id)
         await ctx.send(f"✅ Canal de transcrições definido para: {channel.mention}")
         logger.info(f"Canal de transcrições para guild {ctx.guild.id} definido como {channel.id}.")
 
     @ticket_group.command(name="set_role", description="Define o cargo que terá acesso aos tickets.")
     @app_commands.describe(role="O cargo que será notificado e terá acesso aos tickets.")
     async def set_role(self, ctx: commands.Context, role: discord.Role):
-        execute_query("INSERT OR REPLACE INTO ticket_settings (guild_id, ticket_role_id) VALUES (?, ?)", (ctx.guild.id, role.id))
+        self._update_setting(ctx.guild.id, "ticket_role_id", role.id)
         await ctx.send(f"✅ Cargo de suporte de tickets definido para: {role.mention}")
         logger.info(f"Cargo de suporte de tickets para guild {ctx.guild.id} definido como {role.id}.")
 
@@ -252,27 +379,38 @@ class TicketSystem(commands.Cog):
         if not embed_data:
             return await ctx.send("❌ Embed com este nome não encontrado. Use `/embed_creator list` para ver os embeds salvos.")
         
-        execute_query("INSERT OR REPLACE INTO ticket_settings (guild_id, ticket_initial_embed_json) VALUES (?, ?)", (ctx.guild.id, embed_data[0]))
+        self._update_setting(ctx.guild.id, "ticket_initial_embed_json", embed_data[0])
         await ctx.send(f"✅ Embed inicial do ticket definido para '{embed_name}'.")
         logger.info(f"Embed inicial do ticket para guild {ctx.guild.id} definido como '{embed_name}'.")
     
     @ticket_group.command(name="clear_initial_embed", description="Limpa o embed inicial do ticket, usando apenas a mensagem de texto padrão.")
     async def clear_initial_embed(self, ctx: commands.Context):
-        execute_query("INSERT OR REPLACE INTO ticket_settings (guild_id, ticket_initial_embed_json) VALUES (?, ?)", (ctx.guild.id, None))
+        self._update_setting(ctx.guild.id, "ticket_initial_embed_json", None)
         await ctx.send("✅ Embed inicial do ticket limpo. Apenas a mensagem de texto padrão será usada.")
         logger.info(f"Embed inicial do ticket limpo para guild {ctx.guild.id}.")
 
 
+    @ticket_group.command(name="set_auto_close", description="Fecha automaticamente tickets sem atividade após o número de horas definido.")
+    @commands.has_permissions(manage_channels=True)
+    @app_commands.describe(hours="Horas sem mensagens até o aviso e o fechamento automático (0 desativa).")
+    async def set_auto_close(self, ctx: commands.Context, hours: app_commands.Range[int, 0, 720]):
+        self._update_setting(ctx.guild.id, "auto_close_hours", hours or None)
+        if hours:
+            await ctx.send(f"✅ Tickets sem atividade por {hours}h receberão um aviso e depois serão fechados automaticamente.")
+        else:
+            await ctx.send("✅ Fechamento automático de tickets inativos desativado.")
+        logger.info(f"Fechamento automático de tickets para guild {ctx.guild.id} definido como {hours}h.")
+
     @ticket_group.command(name="show", description="Mostra as configurações atuais do sistema de tickets.")
     async def show_ticket_settings(self, ctx: commands.Context):
         settings = execute_query(
-            "SELECT category_id, transcript_channel_id, ticket_role_id, ticket_channel_id, ticket_message_id, panel_embed_json, ticket_initial_embed_json FROM ticket_settings WHERE guild_id = ?",
+            "SELECT category_id, transcript_channel_id, ticket_role_id, ticket_channel_id, ticket_message_id, panel_embed_json, ticket_initial_embed_json, auto_close_hours FROM ticket_settings WHERE guild_id = ?",
             (ctx.guild.id,), fetchone=True
         )
         if not settings:
             return await ctx.send("ℹ️ Nenhuma configuração de ticket encontrada para este servidor.")
 
-        category_id, transcript_channel_id, ticket_role_id, panel_channel_id, panel_message_id, panel_embed_json, initial_embed_json = settings
+        category_id, transcript_channel_id, ticket_role_id, panel_channel_id, panel_message_id, panel_embed_json, initial_embed_json, auto_close_hours = settings
 
         category_name = self.bot.get_channel(category_id).mention if category_id else "Não definido"
         transcript_channel_name = self.bot.get_channel(transcript_channel_id).mention if transcript_channel_id else "Não definido"
@@ -288,10 +426,117 @@ class TicketSystem(commands.Cog):
         embed.add_field(name="Local do Painel", value=panel_location, inline=False)
         embed.add_field(name="Embed do Painel", value=panel_embed_status, inline=True)
         embed.add_field(name="Embed Inicial do Ticket", value=initial_embed_status, inline=True)
+        embed.add_field(name="Fechamento Automático", value=f"Após {auto_close_hours}h sem atividade" if auto_close_hours else "Desativado", inline=True)
 
         await ctx.send(embed=embed)
 
 
+    @ticket_group.command(name="search", description="Busca nas transcrições dos tickets fechados.")
+    @commands.has_permissions(manage_channels=True)
+    @app_commands.describe(query="Palavras a buscar (use aspas para a frase exata).")
+    async def search_transcripts(self, ctx: commands.Context, *, query: str):
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return await ctx.send("⚠️ Digite ao menos uma palavra para buscar.", ephemeral=True)
+
+        # Várias mensagens da mesma transcrição podem casar; fica a mais relevante de cada uma
+        matches = execute_query(
+            """
+            SELECT t.transcript_id, t.ticket_id, t.created_at, t.message_count, f.author,
+                   snippet(ticket_transcripts_fts, 1, '**', '**', '…', 12)
+            FROM ticket_transcripts_fts f
+            JOIN ticket_transcripts t ON t.transcript_id = f.transcript_id
+            WHERE ticket_transcripts_fts MATCH ? AND t.guild_id = ?
+            ORDER BY bm25(ticket_transcripts_fts)
+            LIMIT 100
+            """,
+            (fts_query, ctx.guild.id), fetchall=True
+        )
+        best_by_transcript = {}
+        for row in matches or []:
+            best_by_transcript.setdefault(row[0], row)
+        rows = list(best_by_transcript.values())[:10]
+        if not rows:
+            return await ctx.send(f"🔍 Nenhuma transcrição encontrada para `{query}`.", ephemeral=True)
+
+        embed = discord.Embed(title=f"🔍 Transcrições com \"{query[:100]}\"", color=discord.Color.blue())
+        for transcript_id, ticket_id, created_at, message_count, author, excerpt in rows:
+            embed.add_field(
+                name=f"Ticket #{ticket_id} · {created_at} · {message_count} mensagens",
+                value=f"{author[:100]}: {excerpt[:900]}",
+                inline=False
+            )
+        embed.set_footer(text="Use /ticket transcript <id> para baixar a transcrição.")
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @ticket_group.command(name="transcript", description="Envia a transcrição arquivada de um ticket fechado.")
+    @commands.has_permissions(manage_channels=True)
+    @app_commands.describe(ticket_id="O número do ticket.")
+    async def get_transcript(self, ctx: commands.Context, ticket_id: int):
+        stored = execute_query(
+            "SELECT html_sha256, text_sha256 FROM ticket_transcripts WHERE ticket_id = ? AND guild_id = ? ORDER BY transcript_id DESC LIMIT 1",
+            (ticket_id, ctx.guild.id), fetchone=True
+        )
+        if not stored:
+            return await ctx.send(f"⚠️ Nenhuma transcrição encontrada para o ticket #{ticket_id}.", ephemeral=True)
+
+        # Os arquivos já estão prontos (gzip) no arquivo local: nada é renderizado de novo
+        files = [
+            discord.File(self.transcript_store.path_for(digest), filename=f"ticket-{ticket_id}.{extension}.gz")
+            for digest, extension in zip(stored, ("html", "txt"))
+            if digest and self.transcript_store.exists(digest)
+        ]
+        if not files:
+            return await ctx.send(f"❌ Os arquivos da transcrição do ticket #{ticket_id} não estão no arquivo local.", ephemeral=True)
+        await ctx.send(f"📝 Transcrição do ticket #{ticket_id}:", files=files, ephemeral=True)
+
+    async def _send_transcript(self, channel: discord.TextChannel, transcript_channel: discord.TextChannel,
+                               ticket_id: int, user_id: int, closed_by: discord.abc.User):
+        """
+        Gera a transcrição (HTML + texto, gzip) em um diretório temporário e a envia ao canal de transcrições.
+        Os arquivos e anexos também vão para o arquivo local (endereçado por hash) e o texto é indexado para `/ticket search`.
+        """
+        opener = self.bot.get_user(user_id)
+        directory = tempfile.mkdtemp(prefix="transcript_")
+        try:
+            result = await generate_transcript(channel, directory, ticket_id, opener=f"{opener} ({user_id})" if opener else str(user_id),
+                                               store=self.transcript_store)
+            html_sha256, _ = await asyncio.to_thread(self.transcript_store.put_file, result.html_path)
+            text_sha256, _ = await asyncio.to_thread(self.transcript_store.put_file, result.text_path)
+            files = [
+                discord.File(path, filename=os.path.basename(path))
+                for path in (result.html_path, result.text_path)
+                if os.path.getsize(path) <= transcript_channel.guild.filesize_limit
+            ]
+            embed = discord.Embed(
+                title=f"Transcrição do Ticket #{ticket_id}",
+                description=f"Canal: `#{channel.name}`\nAberto por: <@{user_id}>\nFechado por: {closed_by.mention}",
+                color=discord.Color.blue(),
+                timestamp=discord.utils.utcnow()
+            )
+            embed.set_footer(text=f"{result.message_count} mensagens")
+            if len(files) < 2:
+                embed.add_field(name="⚠️ Aviso", value="Parte da transcrição excedeu o limite de upload do servidor e não foi anexada.", inline=False)
+            message = await transcript_channel.send(embed=embed, files=files)
+            # Linha de metadados: permite achar o ticket pelo número, canal ou por quem abriu/fechou
+            meta_row = (f"{opener or ''} {user_id} {closed_by} {closed_by.id}", f"Ticket #{ticket_id} #{channel.name}")
+            transcript_id = await asyncio.to_thread(
+                insert_ticket_transcript,
+                (ticket_id, channel.guild.id, transcript_channel.id, message.id, result.message_count, html_sha256, text_sha256),
+                result.attachments,
+                itertools.chain([meta_row], iter_index(result.index_path))
+            )
+            if transcript_id is None:
+                # Os arquivos foram enviados ao canal, mas a transcrição não ficará disponível em /ticket search nem /ticket transcript
+                logger.error(f"Transcrição do ticket {ticket_id} enviada para {transcript_channel.id}, mas não registrada no arquivo de transcrições.")
+                await transcript_channel.send(
+                    f"⚠️ A transcrição do ticket #{ticket_id} acima não pôde ser registrada no arquivo: ela não aparecerá em `/ticket search` nem `/ticket transcript`."
+                )
+                return
+            logger.info(f"Transcrição para ticket {ticket_id} do usuário {user_id} gerada ({result.message_count} mensagens) e enviada para {transcript_channel.id}.")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
     @commands.hybrid_command(name="close_ticket", description="Fecha o ticket atual.")
     @commands.has_permissions(manage_channels=True)
     async def close_ticket(self, ctx: commands.Context):
@@ -307,38 +552,44 @@ class TicketSystem(commands.Cog):
             return await ctx.send("⚠️ Este canal não é um ticket ativo ou já foi fechado.", ephemeral=True)
 
         ticket_id, user_id = ticket_info
-        
-        # Opcional: Gerar transcrição antes de deletar
-        transcript_channel_id = execute_query("SELECT transcript_channel_id FROM ticket_settings WHERE guild_id = ?", (ctx.guild.id,), fetchone=True)
-        if transcript_channel_id and transcript_channel_id[0]:
-            transcript_channel = self.bot.get_channel(transcript_channel_id[0])
+        await self.close_ticket_channel(ctx.channel, ticket_id, user_id, ctx.author, ctx.send)
+
+    async def close_ticket_channel(self, channel: discord.TextChannel, ticket_id: int, user_id: int, closed_by: discord.abc.User,
+                                   respond, reason: Optional[str] = None):
+        """
+        Caminho único de fechamento (comando close_ticket e fechamento automático por inatividade):
+        gera e envia a transcrição, marca o ticket como fechado e deleta o canal.
+        `respond(content, ephemeral=...)` envia os avisos de andamento/erro (ctx.send, ou uma função que escreve no canal).
+        """
+        # Gera a transcrição antes de deletar o canal
+        profile = self.profiles.get(channel.guild)
+        if profile and profile.transcript_channel_id:
+            transcript_channel = self.bot.get_channel(profile.transcript_channel_id)
             if transcript_channel:
+                await respond("📝 Gerando transcrição...")
                 try:
-                    # Implementar lógica de transcrição aqui. Ex:
-                    # messages = [msg async for msg in ctx.channel.history(limit=None, oldest_first=True)]
-                    # transcript_content = "\n".join([f"[{msg.created_at}] {msg.author.display_name}: {msg.clean_content}" for msg in messages])
-                    # await transcript_channel.send(f"Transcrição do Ticket #{ticket_id} ({self.bot.get_user(user_id).name}):\n```\n{transcript_content}\n```")
-                    await ctx.send("Gerando transcrição... (Funcionalidade de transcrição a ser implementada)")
-                    logger.info(f"Transcrição para ticket {ticket_id} do usuário {user_id} gerada e enviada para {transcript_channel.id}.")
+                    await self._send_transcript(channel, transcript_channel, ticket_id, user_id, closed_by)
                 except Exception as e:
                     logger.error(f"Erro ao gerar ou enviar transcrição para ticket {ticket_id}: {e}", exc_info=True)
-                    await ctx.send("❌ Não foi possível gerar ou enviar a transcrição, mas o ticket será fechado.", ephemeral=True)
+                    await respond("❌ Não foi possível gerar ou enviar a transcrição, mas o ticket será fechado.", ephemeral=True)
             else:
-                logger.warning(f"Canal de transcrição configurado ({transcript_channel_id[0]}) não encontrado no guild {ctx.guild.id}.")
+                logger.warning(f"Canal de transcrição configurado ({profile.transcript_channel_id}) não encontrado no guild {channel.guild.id}.")
 
         try:
             # Atualiza o status no DB
             execute_query(
                 "UPDATE active_tickets SET status = 'closed', closed_by_id = ?, closed_at = CURRENT_TIMESTAMP WHERE ticket_id = ?",
-                (ctx.author.id, ticket_id)
+                (closed_by.id, ticket_id)
             )
-            await ctx.channel.delete(reason=f"Ticket fechado por {ctx.author.display_name}")
-            logger.info(f"Ticket {ticket_id} (canal {ctx.channel.id}) fechado por {ctx.author.id} no guild {ctx.guild.id}.")
+            self.open_tickets.remove_channel(channel.id)
+            self._activity.pop(channel.id, None)
+            await channel.delete(reason=reason or f"Ticket fechado por {closed_by.display_name}")
+            logger.info(f"Ticket {ticket_id} (canal {channel.id}) fechado por {closed_by.id} no guild {channel.guild.id}.")
         except discord.Forbidden:
-            await ctx.send("🚫 Não tenho permissão para deletar este canal de ticket. Verifique minhas permissões.", ephemeral=True)
+            await respond("🚫 Não tenho permissão para deletar este canal de ticket. Verifique minhas permissões.", ephemeral=True)
         except Exception as e:
-            await ctx.send(f"❌ Ocorreu um erro ao fechar o ticket: {e}", ephemeral=True)
-            logger.error(f"Erro ao fechar ticket {ticket_id} (canal {ctx.channel.id}): {e}", exc_info=True)
+            await respond(f"❌ Ocorreu um erro ao fechar o ticket: {e}", ephemeral=True)
+            logger.error(f"Erro ao fechar ticket {ticket_id} (canal {channel.id}): {e}", exc_info=True)
 
     @commands.hybrid_command(name="add_user_to_ticket", description="Adiciona um usuário ao ticket atual.")
     @commands.has_permissions(manage_channels=True)
@@ -387,13 +638,6 @@ class TicketSystem(commands.Cog):
             await ctx.send(f"❌ Ocorreu um erro ao remover o usuário: {e}", ephemeral=True)
             logger.error(f"Erro ao remover usuário {user.id} do ticket {ctx.channel.id}: {e}", exc_info=True)
 
-
-    @commands.Cog.listener()
-    async def on_ready(self):
-        # Garante que as views persistentes são adicionadas ao bot ao iniciar
-        self.bot.add_view(TicketPanelButtons(self.bot))
-        logger.info("Views persistentes do Sistema de Tickets garantidas.")
-
 # Esta função é CRUCIAL para o bot carregar o cog.
 async def setup(bot):
     """Adiciona o cog do Sistema de Tickets ao bot."""
@@ -0,0 +1,193 @@
+# cogs/utility/ticket_transcript.py
+import discord
+import asyncio
+import gzip
+import html
+import io
+import json
+import logging
+import os
+from typing import NamedTuple, Optional
+
+from cogs.utility.transcript_store import TranscriptStore
+
+logger = logging.getLogger(__name__)
+
+# Mensagens lidas do histórico por página (o mesmo tamanho de página da API)
+TRANSCRIPT_PAGE_SIZE = 100
+# Anexos maiores que isso não são baixados para o arquivo de transcrições (fica só o link)
+MAX_ARCHIVED_ATTACHMENT_BYTES = 8 * 1024 * 1024
+
+HTML_HEADER = """<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; background: #313338; color: #dbdee1; margin: 24px; }}
+h1 {{ font-size: 20px; }} .meta {{ color: #949ba4; margin-bottom: 16px; }}
+.msg {{ padding: 6px 0; border-top: 1px solid #3f4147; }}
+.author {{ font-weight: bold; color: #f2f3f5; }} .bot {{ background: #5865f2; border-radius: 3px; font-size: 10px; padding: 1px 4px; margin-left: 4px; }}
+.time {{ color: #949ba4; font-size: 12px; margin-left: 6px; }}
+.content {{ white-space: pre-wrap; word-wrap: break-word; }} a {{ color: #00a8fc; }}
+</style></head><body>
+<h1>{title}</h1>
+<div class="meta">{meta}</div>
+"""
+HTML_FOOTER = """<div class="meta">{count} mensagens.</div>
+</body></html>
+"""
+
+
+class TranscriptMessage(NamedTuple):
+    """Cópia leve de uma mensagem: só o que a transcrição usa, para não manter objetos Message vivos."""
+    created_at: str
+    author_name: str
+    author_id: int
+    is_bot: bool
+    content: str
+    attachments: tuple[tuple[str, str, Optional[str]], ...] # (nome do arquivo, URL, SHA-256 no arquivo ou None)
+    embeds: tuple[str, ...] # Títulos/descrições resumidos dos embeds
+
+
+class TranscriptResult(NamedTuple):
+    html_path: str
+    text_path: str
+    index_path: str # JSON lines (gzip) com (autor, texto) por mensagem, para o índice de busca
+    message_count: int
+    attachments: list[tuple[str, str, int]] # (nome do arquivo, SHA-256, tamanho) dos anexos arquivados
+
+
+def snapshot(message: discord.Message, digests: Optional[dict[int, str]] = None) -> TranscriptMessage:
+    digests = digests or {}
+    return TranscriptMessage(
+        created_at=message.created_at.strftime('%Y-%m-%d %H:%M:%S UTC'),
+        author_name=message.author.display_name,
+        author_id=message.author.id,
+        is_bot=message.author.bot,
+        content=message.clean_content,
+        attachments=tuple((attachment.filename, attachment.url, digests.get(attachment.id)) for attachment in message.attachments),
+        embeds=tuple((embed.title or embed.description or "embed")[:200] for embed in message.embeds),
+    )
+
+
+class TranscriptWriter:
+    """
+    Escreve a transcrição em arquivos gzip (HTML, texto e o índice de busca) conforme as páginas chegam.
+    Os métodos são síncronos e devem rodar numa thread (asyncio.to_thread); nada além da página atual fica em memória.
+    """
+    def __init__(self, directory: str, basename: str, title: str, meta: str):
+        self.html_path = os.path.join(directory, f"{basename}.html.gz")
+        self.text_path = os.path.join(directory, f"{basename}.txt.gz")
+        self.index_path = os.path.join(directory, f"{basename}.index.jsonl.gz")
+        self.count = 0
+        self.attachments: list[tuple[str, str, int]] = []
+        self._html = io.TextIOWrapper(gzip.open(self.html_path, "wb"), encoding="utf-8")
+        self._text = io.TextIOWrapper(gzip.open(self.text_path, "wb"), encoding="utf-8")
+        self._index = io.TextIOWrapper(gzip.open(self.index_path, "wb"), encoding="utf-8")
+        self._html.write(HTML_HEADER.format(title=html.escape(title), meta=html.escape(meta)))
+        self._text.write(f"{title}\n{meta}\n{'=' * 60}\n")
+
+    def write_page(self, messages: list[TranscriptMessage]):
+        for message in messages:
+            self._write_html(message)
+            self._write_text(message)
+            self._write_index(message)
+        self.count += len(messages)
+
+    def _write_html(self, message: TranscriptMessage):
+        parts = [
+            f'<div class="msg"><span class="author">{html.escape(message.author_name)}</span>',
+            '<span class="bot">BOT</span>' if message.is_bot else "",
+            f'<span class="time">{message.created_at} · {message.author_id}</span>',
+            f'<div class="content">{html.escape(message.content)}</div>',
+        ]
+        for filename, url, digest in message.attachments:
+            stored = f' <span class="time">sha256 {digest[:12]}</span>' if digest else ""
+            parts.append(f'<div>📎 <a href="{html.escape(url, quote=True)}">{html.escape(filename)}</a>{stored}</div>')
+        for embed in message.embeds:
+            parts.append(f'<div>🔖 {html.escape(embed)}</div>')
+        parts.append("</div>\n")
+        self._html.write("".join(parts))
+
+    def _write_text(self, message: TranscriptMessage):
+        self._text.write(f"[{message.created_at}] {message.author_name} ({message.author_id}){' [BOT]' if message.is_bot else ''}: {message.content}\n")
+        for filename, url, digest in message.attachments:
+            self._text.write(f"    📎 {filename}: {url}{f' (sha256 {digest})' if digest else ''}\n")
+        for embed in message.embeds:
+            self._text.write(f"    🔖 {embed}\n")
+
+    def _write_index(self, message: TranscriptMessage):
+        text = "\n".join([message.content, *message.embeds, *(filename for filename, _, _ in message.attachments)]).strip()
+        if text:
+            self._index.write(json.dumps([f"{message.author_name} {message.author_id}", text], ensure_ascii=False) + "\n")
+
+    def close(self) -> TranscriptResult:
+        self._html.write(HTML_FOOTER.format(count=self.count))
+        self._text.write(f"{'=' * 60}\n{self.count} mensagens.\n")
+        self._html.close()
+        self._text.close()
+        self._index.close()
+        return TranscriptResult(self.html_path, self.text_path, self.index_path, self.count, self.attachments)
+
+    def abort(self):
+        for stream in (self._html, self._text, self._index):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+def iter_index(path: str):
+    """Lê o índice de busca gerado pelo TranscriptWriter, linha a linha, como tuplas (autor, texto)."""
+    with gzip.open(path, "rt", encoding="utf-8") as index_file:
+        for line in index_file:
+            author, text = json.loads(line)
+            yield author, text
+
+
+async def _archive_attachments(message: discord.Message, store: TranscriptStore, archived: list) -> dict[int, str]:
+    """Baixa os anexos da mensagem (até o limite de tamanho) para o armazenamento por hash. Retorna {attachment_id: sha256}."""
+    digests = {}
+    for attachment in message.attachments:
+        if attachment.size > MAX_ARCHIVED_ATTACHMENT_BYTES:
+            continue
+        try:
+            data = await attachment.read()
+        except discord.HTTPException as e:
+            logger.warning(f"Não foi possível baixar o anexo {attachment.id} para o arquivo de transcrições: {e}")
+            continue
+        digest, size = await asyncio.to_thread(store.put_bytes, data)
+        digests[attachment.id] = digest
+        archived.append((attachment.filename, digest, size))
+    return digests
+
+
+async def generate_transcript(channel: discord.TextChannel, directory: str, ticket_id: int, opener: Optional[str] = None,
+                              store: Optional[TranscriptStore] = None) -> TranscriptResult:
+    """
+    Lê o histórico do canal página a página (da mais antiga para a mais nova) e grava cada página
+    numa thread, enquanto a próxima é buscada. A memória usada não depende do tamanho do ticket.
+    Com `store`, os anexos também são copiados para o armazenamento endereçado por conteúdo.
+    """
+    title = f"Transcrição do Ticket #{ticket_id} — #{channel.name}"
+    meta = f"Servidor: {channel.guild.name} ({channel.guild.id})" + (f" · Aberto por: {opener}" if opener else "")
+    writer = await asyncio.to_thread(TranscriptWriter, directory, f"ticket-{ticket_id}", title, meta)
+    pending_write: Optional[asyncio.Future] = None
+    page: list[TranscriptMessage] = []
+    try:
+        async for message in channel.history(limit=None, oldest_first=True):
+            digests = await _archive_attachments(message, store, writer.attachments) if store and message.attachments else None
+            page.append(snapshot(message, digests))
+            if len(page) >= TRANSCRIPT_PAGE_SIZE:
+                if pending_write:
+                    await pending_write # No máximo uma página sendo gravada e uma sendo lida
+                pending_write = asyncio.ensure_future(asyncio.to_thread(writer.write_page, page))
+                page = []
+        if pending_write:
+            await pending_write
+        if page:
+            await asyncio.to_thread(writer.write_page, page)
+        return await asyncio.to_thread(writer.close)
+    except BaseException:
+        if pending_write and not pending_write.done():
+            await asyncio.wait([pending_write])
+        await asyncio.to_thread(writer.abort)
+        raise
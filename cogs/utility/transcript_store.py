@@ -0,0 +1,71 @@
+# cogs/utility/transcript_store.py
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class TranscriptStore:
+    """
+    Armazenamento em disco endereçado por conteúdo (SHA-256) para transcrições e anexos de tickets.
+    Cada blob fica em `objects/<2 primeiros hex>/<restante>`; conteúdo repetido (ex: o mesmo anexo
+    enviado em vários tickets) é gravado uma única vez. As transcrições já chegam comprimidas (gzip);
+    os anexos são comprimidos aqui, mas endereçados pelo hash do conteúdo original.
+    Os métodos fazem I/O bloqueante e devem rodar numa thread.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path_for(digest))
+
+    def _commit(self, digest: str, write) -> bool:
+        """Grava o blob via arquivo temporário + rename atômico. Retorna False se ele já existia."""
+        target = self.path_for(digest)
+        if os.path.exists(target):
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                write(temp_file)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return True
+
+    def put_bytes(self, data: bytes) -> tuple[str, int]:
+        """Grava bytes comprimidos com gzip (ler com gzip.open). Retorna (SHA-256 do conteúdo original, tamanho original)."""
+        digest = hashlib.sha256(data).hexdigest()
+        if self._commit(digest, lambda out: out.write(gzip.compress(data, mtime=0))):
+            logger.debug(f"Blob {digest[:12]} gravado ({len(data)} bytes).")
+        return digest, len(data)
+
+    def put_file(self, path: str) -> tuple[str, int]:
+        """Copia um arquivo para o armazenamento, lendo em blocos (sem carregá-lo inteiro)."""
+        sha = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as source:
+            while chunk := source.read(HASH_CHUNK_SIZE):
+                sha.update(chunk)
+                size += len(chunk)
+        digest = sha.hexdigest()
+
+        def copy(out):
+            with open(path, "rb") as source:
+                while chunk := source.read(HASH_CHUNK_SIZE):
+                    out.write(chunk)
+
+        self._commit(digest, copy)
+        return digest, size
@@ -8,6 +8,7 @@ load_dotenv() # Carrega as variáveis do arquivo .env
 DISCORD_BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 COMMAND_PREFIX = "!" # Ou o prefixo que preferir
 TEST_GUILD_ID = 1387502748387377223 # Substitua pelo ID do seu servidor de testes (opcional)
+TRANSCRIPT_STORE_DIR = os.getenv("TRANSCRIPT_STORE_DIR", "transcripts") # Arquivo local das transcrições de tickets
 
 # --- Adicione esta linha ---
 DISCORD_BOT_APPLICATION_ID = os.getenv("DISCORD_BOT_APPLICATION_ID")
@@ -103,6 +103,16 @@ def init_db():
             """)
             logging.info("Tabela 'ticket_settings' verificada/criada (incluindo ticket_initial_embed_json).")
 
+            # ALTER TABLE para adicionar 'auto_close_hours' (horas sem atividade até o fechamento automático; NULL = desativado) SE JÁ EXISTIR
+            try:
+                cursor.execute("ALTER TABLE ticket_settings ADD COLUMN auto_close_hours INTEGER;")
+                logging.info("Coluna 'auto_close_hours' adicionada à tabela 'ticket_settings' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: auto_close_hours" in str(e):
+                    logging.info("Coluna 'auto_close_hours' já existe na tabela 'ticket_settings'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'auto_close_hours' à tabela 'ticket_settings': {e}", exc_info=True)
+
 
             # Tabela para tickets ativos
             cursor.execute("""
@@ -119,6 +129,102 @@ def init_db():
             """)
             logging.info("Tabela 'active_tickets' verificada/criada.")
 
+            # ALTER TABLE para adicionar 'last_activity_at' (epoch da última mensagem de um usuário no ticket) SE JÁ EXISTIR
+            try:
+                cursor.execute("ALTER TABLE active_tickets ADD COLUMN last_activity_at INTEGER;")
+                # Tickets existentes começam a contar a partir da abertura
+                cursor.execute("UPDATE active_tickets SET last_activity_at = CAST(strftime('%s', opened_at) AS INTEGER) WHERE last_activity_at IS NULL")
+                logging.info("Coluna 'last_activity_at' adicionada à tabela 'active_tickets' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: last_activity_at" in str(e):
+                    logging.info("Coluna 'last_activity_at' já existe na tabela 'active_tickets'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'last_activity_at' à tabela 'active_tickets': {e}", exc_info=True)
+
+            # ALTER TABLE para adicionar 'inactivity_warned_at' (epoch do aviso de fechamento por inatividade) SE JÁ EXISTIR
+            try:
+                cursor.execute("ALTER TABLE active_tickets ADD COLUMN inactivity_warned_at INTEGER;")
+                logging.info("Coluna 'inactivity_warned_at' adicionada à tabela 'active_tickets' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: inactivity_warned_at" in str(e):
+                    logging.info("Coluna 'inactivity_warned_at' já existe na tabela 'active_tickets'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'inactivity_warned_at' à tabela 'active_tickets': {e}", exc_info=True)
+
+            # Busca dos tickets abertos inativos por faixa de last_activity_at
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_active_tickets_open_activity ON active_tickets(last_activity_at) WHERE status = 'open'")
+            logging.info("Índice 'idx_active_tickets_open_activity' verificado/criado.")
+
+            # No máximo um ticket aberto por usuário em cada guild (índice único parcial).
+            # Na primeira criação, tickets abertos duplicados (cliques duplos antigos) são fechados, mantendo o mais recente.
+            open_index_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_active_tickets_open_user'"
+            ).fetchone()
+            if not open_index_exists:
+                cursor.execute("""
+                    UPDATE active_tickets SET status = 'closed', closed_at = CURRENT_TIMESTAMP
+                    WHERE status = 'open' AND ticket_id NOT IN (
+                        SELECT MAX(ticket_id) FROM active_tickets WHERE status = 'open' GROUP BY guild_id, user_id
+                    )
+                """)
+                if cursor.rowcount:
+                    logging.warning(f"{cursor.rowcount} tickets abertos duplicados foram fechados antes de criar o índice único.")
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_active_tickets_open_user ON active_tickets(guild_id, user_id) WHERE status = 'open'"
+            )
+            logging.info("Índice 'idx_active_tickets_open_user' verificado/criado.")
+
+            # Transcrições geradas ao fechar tickets (referência à mensagem com os arquivos no canal de transcrições)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ticket_transcripts (
+                    transcript_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ticket_id INTEGER REFERENCES active_tickets(ticket_id) ON DELETE SET NULL,
+                    guild_id INTEGER NOT NULL,
+                    channel_id INTEGER NOT NULL, -- Canal de transcrições onde os arquivos foram enviados
+                    message_id INTEGER NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticket_transcripts_ticket ON ticket_transcripts(ticket_id)")
+            logging.info("Tabela 'ticket_transcripts' verificada/criada.")
+
+            # ALTER TABLE para adicionar os hashes (SHA-256) dos arquivos no arquivo de transcrições SE JÁ EXISTIR
+            for column in ("html_sha256", "text_sha256"):
+                try:
+                    cursor.execute(f"ALTER TABLE ticket_transcripts ADD COLUMN {column} TEXT;")
+                    logging.info(f"Coluna '{column}' adicionada à tabela 'ticket_transcripts' (via ALTER TABLE).")
+                except sqlite3.OperationalError as e:
+                    if f"duplicate column name: {column}" in str(e):
+                        logging.info(f"Coluna '{column}' já existe na tabela 'ticket_transcripts'.")
+                    else:
+                        logging.error(f"Erro ao adicionar coluna '{column}' à tabela 'ticket_transcripts': {e}", exc_info=True)
+
+            # Anexos das transcrições: os bytes ficam uma única vez no armazenamento em disco, identificados pelo hash
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS transcript_attachments (
+                    transcript_id INTEGER NOT NULL REFERENCES ticket_transcripts(transcript_id) ON DELETE CASCADE,
+                    filename TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transcript_attachments_transcript ON transcript_attachments(transcript_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transcript_attachments_sha256 ON transcript_attachments(sha256)")
+            logging.info("Tabela 'transcript_attachments' verificada/criada.")
+
+            # Índice de busca textual (FTS5) sobre as transcrições: uma linha por mensagem,
+            # mais uma linha de metadados por transcrição (número do ticket, canal, quem abriu/fechou)
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS ticket_transcripts_fts USING fts5(
+                    author,
+                    content,
+                    transcript_id UNINDEXED,
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            logging.info("Tabela 'ticket_transcripts_fts' verificada/criada.")
+
 
             # Tabela para sistema de Casamento
             cursor.execute("""
@@ -160,6 +266,243 @@ def init_db():
                 else:
                     logging.error(f"Erro ao adicionar coluna 'duration' à tabela 'moderation_logs': {e}", exc_info=True)
 
+            # ALTER TABLE para adicionar 'audit_entry_id' (ID da entrada do registro de auditoria importada) SE JÁ EXISTIR
+            try:
+                cursor.execute("ALTER TABLE moderation_logs ADD COLUMN audit_entry_id INTEGER;")
+                logging.info("Coluna 'audit_entry_id' adicionada à tabela 'moderation_logs' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: audit_entry_id" in str(e):
+                    logging.info("Coluna 'audit_entry_id' já existe na tabela 'moderation_logs'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'audit_entry_id' à tabela 'moderation_logs': {e}", exc_info=True)
+            # Cada entrada de auditoria é importada no máximo uma vez (INSERT OR IGNORE no ingestor)
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_moderation_logs_audit_entry
+                ON moderation_logs(audit_entry_id) WHERE audit_entry_id IS NOT NULL
+            """)
+
+            # Números de caso por guild: moderation_logs.case_no vem de guild_counters, na mesma transação do INSERT
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS guild_counters (
+                    guild_id INTEGER PRIMARY KEY,
+                    last_case_no INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            try:
+                cursor.execute("ALTER TABLE moderation_logs ADD COLUMN case_no INTEGER;")
+                logging.info("Coluna 'case_no' adicionada à tabela 'moderation_logs' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: case_no" in str(e):
+                    logging.info("Coluna 'case_no' já existe na tabela 'moderation_logs'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'case_no' à tabela 'moderation_logs': {e}", exc_info=True)
+            # Numera o histórico ainda sem número (na primeira criação, ou se uma numeração anterior falhou),
+            # em ordem de log_id, continuando do maior número já usado por cada guild. Roda a cada início, até não restar nenhum.
+            try:
+                if cursor.execute("SELECT 1 FROM moderation_logs WHERE case_no IS NULL LIMIT 1").fetchone():
+                    cursor.execute("""
+                        UPDATE moderation_logs SET case_no = numbered.case_no
+                        FROM (
+                            SELECT l.log_id,
+                                   MAX(COALESCE(c.last_case_no, 0), COALESCE((SELECT MAX(m.case_no) FROM moderation_logs m WHERE m.guild_id = l.guild_id), 0))
+                                   + ROW_NUMBER() OVER (PARTITION BY l.guild_id ORDER BY l.log_id) AS case_no
+                            FROM moderation_logs l
+                            LEFT JOIN guild_counters c ON c.guild_id = l.guild_id
+                            WHERE l.case_no IS NULL
+                        ) AS numbered
+                        WHERE moderation_logs.log_id = numbered.log_id
+                    """)
+                    numbered = cursor.rowcount
+                    cursor.execute("""
+                        INSERT INTO guild_counters (guild_id, last_case_no)
+                        SELECT guild_id, MAX(case_no) FROM moderation_logs GROUP BY guild_id
+                        ON CONFLICT(guild_id) DO UPDATE SET last_case_no = MAX(last_case_no, excluded.last_case_no)
+                    """)
+                    logging.info(f"{numbered} logs de moderação sem número de caso foram numerados.")
+            except sqlite3.Error as e:
+                logging.error(f"Erro ao numerar o histórico de 'moderation_logs': {e}", exc_info=True)
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_moderation_logs_case_no ON moderation_logs(guild_id, case_no)")
+            # INSERTs sem case_no (a maioria) recebem o próximo número da guild; inserts em lote já trazem o número
+            # reservado por allocate_case_numbers e não passam por aqui.
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS moderation_logs_case_no AFTER INSERT ON moderation_logs
+                WHEN new.case_no IS NULL BEGIN
+                    INSERT INTO guild_counters (guild_id, last_case_no) VALUES (new.guild_id, 1)
+                    ON CONFLICT(guild_id) DO UPDATE SET last_case_no = last_case_no + 1;
+                    UPDATE moderation_logs SET case_no = (SELECT last_case_no FROM guild_counters WHERE guild_id = new.guild_id)
+                    WHERE log_id = new.log_id;
+                END
+            """)
+            logging.info("Tabela 'guild_counters' e numeração de casos verificadas/criadas.")
+
+            # Última entrada do registro de auditoria importada por guild
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS audit_log_cursors (
+                    guild_id INTEGER PRIMARY KEY,
+                    last_entry_id INTEGER NOT NULL
+                )
+            """)
+            logging.info("Tabela 'audit_log_cursors' verificada/criada.")
+
+            # Índice de busca textual (FTS5) sobre as razões dos logs de moderação.
+            # Tabela de conteúdo externo: o texto fica só em moderation_logs; os triggers mantêm o índice sincronizado.
+            fts_exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'moderation_logs_fts'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS moderation_logs_fts USING fts5(
+                    reason,
+                    content='moderation_logs',
+                    content_rowid='log_id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS moderation_logs_fts_insert AFTER INSERT ON moderation_logs BEGIN
+                    INSERT INTO moderation_logs_fts (rowid, reason) VALUES (new.log_id, new.reason);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS moderation_logs_fts_delete AFTER DELETE ON moderation_logs BEGIN
+                    INSERT INTO moderation_logs_fts (moderation_logs_fts, rowid, reason) VALUES ('delete', old.log_id, old.reason);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS moderation_logs_fts_update AFTER UPDATE OF reason ON moderation_logs BEGIN
+                    INSERT INTO moderation_logs_fts (moderation_logs_fts, rowid, reason) VALUES ('delete', old.log_id, old.reason);
+                    INSERT INTO moderation_logs_fts (rowid, reason) VALUES (new.log_id, new.reason);
+                END
+            """)
+            if not fts_exists:
+                # Primeira criação: indexa os logs que já existiam
+                cursor.execute("INSERT INTO moderation_logs_fts (moderation_logs_fts) VALUES ('rebuild')")
+                logging.info("Índice 'moderation_logs_fts' criado e populado com os logs existentes.")
+            logging.info("Tabela 'moderation_logs_fts' e triggers verificados/criados.")
+
+            # Regras de escalonamento de advertências (ex: 3 advertências = timeout de 1h, 5 = expulsão)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS warn_escalation_rules (
+                    guild_id INTEGER NOT NULL,
+                    warn_count INTEGER NOT NULL,
+                    action TEXT NOT NULL,
+                    duration TEXT,
+                    PRIMARY KEY (guild_id, warn_count)
+                )
+            """)
+            logging.info("Tabela 'warn_escalation_rules' verificada/criada.")
+
+            # Contador materializado de advertências por (guild, usuário), mantido por triggers em moderation_logs,
+            # para não precisar de COUNT(*) sobre os logs a cada advertência
+            counters_exist = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'warn_counters'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS warn_counters (
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    active_warns INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, user_id)
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS warn_counters_insert AFTER INSERT ON moderation_logs
+                WHEN new.action = 'warn' BEGIN
+                    INSERT INTO warn_counters (guild_id, user_id, active_warns) VALUES (new.guild_id, new.target_id, 1)
+                    ON CONFLICT (guild_id, user_id) DO UPDATE SET active_warns = active_warns + 1;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS warn_counters_delete AFTER DELETE ON moderation_logs
+                WHEN old.action = 'warn' BEGIN
+                    UPDATE warn_counters SET active_warns = MAX(active_warns - 1, 0)
+                    WHERE guild_id = old.guild_id AND user_id = old.target_id;
+                END
+            """)
+            if not counters_exist:
+                # Primeira criação: conta as advertências que já existiam
+                cursor.execute("""
+                    INSERT INTO warn_counters (guild_id, user_id, active_warns)
+                    SELECT guild_id, target_id, COUNT(*) FROM moderation_logs WHERE action = 'warn' GROUP BY guild_id, target_id
+                """)
+                logging.info("Tabela 'warn_counters' criada e populada com as advertências existentes.")
+            logging.info("Tabela 'warn_counters' e triggers verificados/criados.")
+
+            # Estatísticas de moderação agregadas por dia, moderador e ação (mantidas por triggers),
+            # para que o /modstats não precise de GROUP BY sobre todo o histórico de moderation_logs
+            stats_exist = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'moderation_stats_daily'"
+            ).fetchone()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS moderation_stats_daily (
+                    guild_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    moderator_id INTEGER NOT NULL,
+                    action TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, day, moderator_id, action)
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS moderation_stats_insert AFTER INSERT ON moderation_logs BEGIN
+                    INSERT INTO moderation_stats_daily (guild_id, day, moderator_id, action, count)
+                    VALUES (new.guild_id, COALESCE(date(new.timestamp), date('now')), new.moderator_id, new.action, 1)
+                    ON CONFLICT (guild_id, day, moderator_id, action) DO UPDATE SET count = count + 1;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS moderation_stats_delete AFTER DELETE ON moderation_logs BEGIN
+                    UPDATE moderation_stats_daily SET count = MAX(count - 1, 0)
+                    WHERE guild_id = old.guild_id AND day = COALESCE(date(old.timestamp), date('now'))
+                      AND moderator_id = old.moderator_id AND action = old.action;
+                END
+            """)
+            if not stats_exist:
+                # Primeira criação: agrega o histórico existente uma única vez
+                cursor.execute("""
+                    INSERT INTO moderation_stats_daily (guild_id, day, moderator_id, action, count)
+                    SELECT guild_id, COALESCE(date(timestamp), date('now')), moderator_id, action, COUNT(*)
+                    FROM moderation_logs GROUP BY 1, 2, 3, 4
+                """)
+                logging.info("Tabela 'moderation_stats_daily' criada e populada com o histórico existente.")
+            logging.info("Tabela 'moderation_stats_daily' e triggers verificados/criados.")
+
+            # Expirações agendadas (temp-ban e cargos temporários); o agendador só consulta pelo índice de expires_at
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_expiries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL, -- 'unban' ou 'role'
+                    user_id INTEGER NOT NULL,
+                    role_id INTEGER,
+                    expires_at INTEGER NOT NULL, -- Timestamp Unix
+                    reason TEXT,
+                    moderator_id INTEGER
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_expiries_expires_at ON scheduled_expiries(expires_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_expiries_target ON scheduled_expiries(guild_id, user_id, kind)")
+            logging.info("Tabela 'scheduled_expiries' verificada/criada.")
+
+            # Grupos de sincronização de banimentos entre servidores (cada guild participa de no máximo um grupo)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ban_sync_groups (
+                    group_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    owner_guild_id INTEGER NOT NULL,
+                    join_code TEXT NOT NULL UNIQUE,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ban_sync_members (
+                    guild_id INTEGER PRIMARY KEY,
+                    group_id INTEGER NOT NULL,
+                    joined_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ban_sync_members_group ON ban_sync_members(group_id)")
+            logging.info("Tabelas 'ban_sync_groups' e 'ban_sync_members' verificadas/criadas.")
+
             # --- NOVAS TABELAS PARA LOCKDOWN ---
             # Tabela para canais em lockdown (persistência do estado de lockdown)
             cursor.execute("""
@@ -173,6 +516,65 @@ def init_db():
             """)
             logging.info("Tabela 'locked_channels' verificada/criada.")
 
+            # ALTER TABLE para adicionar 'scope' (canal individual ou lockdown do servidor) SE JÁ EXISTIR
+            try:
+                cursor.execute("ALTER TABLE locked_channels ADD COLUMN scope TEXT DEFAULT 'channel';")
+                logging.info("Coluna 'scope' adicionada à tabela 'locked_channels' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: scope" in str(e):
+                    logging.info("Coluna 'scope' já existe na tabela 'locked_channels'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'scope' à tabela 'locked_channels': {e}", exc_info=True)
+
+            # ALTER TABLE para adicionar 'category_id' (canal bloqueado como parte do lockdown de uma categoria) SE JÁ EXISTIR
+            try:
+                cursor.execute("ALTER TABLE locked_channels ADD COLUMN category_id INTEGER;")
+                logging.info("Coluna 'category_id' adicionada à tabela 'locked_channels' (via ALTER TABLE).")
+            except sqlite3.OperationalError as e:
+                if "duplicate column name: category_id" in str(e):
+                    logging.info("Coluna 'category_id' já existe na tabela 'locked_channels'.")
+                else:
+                    logging.error(f"Erro ao adicionar coluna 'category_id' à tabela 'locked_channels': {e}", exc_info=True)
+
+            # Tabela para categorias em lockdown (o overwrite da categoria vale para todos os canais sincronizados)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS locked_categories (
+                    category_id INTEGER PRIMARY KEY,
+                    guild_id INTEGER NOT NULL,
+                    reason TEXT,
+                    locked_by_id INTEGER,
+                    locked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            logging.info("Tabela 'locked_categories' verificada/criada.")
+
+            # O agendador de desbloqueios é reidratado a partir do LockdownState (já carregado inteiro na memória);
+            # o índice parcial por locked_until_timestamp criado antes não era usado por nenhuma consulta.
+            cursor.execute("DROP INDEX IF EXISTS idx_locked_channels_until")
+
+            # Tabela com o overwrite de @everyone de cada canal ANTES do lockdown, para restaurá-lo exatamente
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lockdown_overwrite_snapshots (
+                    channel_id INTEGER PRIMARY KEY,
+                    guild_id INTEGER NOT NULL,
+                    had_overwrite BOOLEAN NOT NULL,
+                    allow_value INTEGER NOT NULL DEFAULT 0,
+                    deny_value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            logging.info("Tabela 'lockdown_overwrite_snapshots' verificada/criada.")
+
+            # Tabela para lockdowns do servidor inteiro
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS guild_lockdowns (
+                    guild_id INTEGER PRIMARY KEY,
+                    reason TEXT,
+                    locked_by_id INTEGER,
+                    locked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            logging.info("Tabela 'guild_lockdowns' verificada/criada.")
+
             # Tabela para as configurações do painel de lockdown (onde o painel está)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS lockdown_panel_settings (
@@ -183,6 +585,40 @@ def init_db():
             """)
             logging.info("Tabela 'lockdown_panel_settings' verificada/criada.")
 
+            # Tabela para as configurações do auto-slowmode (configurado junto ao painel de lockdown)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS auto_slowmode_settings (
+                    guild_id INTEGER PRIMARY KEY,
+                    enabled BOOLEAN DEFAULT 0,
+                    threshold_per_minute INTEGER DEFAULT 30,
+                    max_delay_seconds INTEGER DEFAULT 30
+                )
+            """)
+            logging.info("Tabela 'auto_slowmode_settings' verificada/criada.")
+
+            # Tabela com o slowmode original dos canais alterados pelo auto-slowmode (para aliviá-lo após reiniciar)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS auto_slowmode_channels (
+                    channel_id INTEGER PRIMARY KEY,
+                    guild_id INTEGER NOT NULL,
+                    original_delay INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            logging.info("Tabela 'auto_slowmode_channels' verificada/criada.")
+
+            # Tabela para o filtro automático (automod) de palavras e domínios bloqueados
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS automod_blocked_terms (
+                    guild_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    term TEXT NOT NULL,
+                    added_by_id INTEGER,
+                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (guild_id, kind, term)
+                )
+            """)
+            logging.info("Tabela 'automod_blocked_terms' verificada/criada.")
+
             conn.commit()
             logging.info("Tabelas do banco de dados verificadas/criadas com sucesso.")
         except sqlite3.Error as e:
@@ -208,4 +644,122 @@ def execute_query(query, params=(), fetchone=False, fetchall=False):
             return False 
         finally:
             conn.close()
-    return False
\ No newline at end of file
+    return False
+
+def execute_many(query, seq_of_params):
+    """Executa a mesma query para vários conjuntos de parâmetros em uma única transação."""
+    conn = connect_db()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, seq_of_params)
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            logging.error(f"Erro ao executar query em lote '{query}': {e}", exc_info=True)
+            return False
+        finally:
+            conn.close()
+    return False
+
+def insert_moderation_logs(rows):
+    """
+    Registra várias ações em moderation_logs numa única transação.
+    Cada linha: (guild_id, action, target_id, moderator_id, reason, duration).
+    Os números de caso de cada guild são reservados em bloco, com um único UPSERT ... RETURNING por guild,
+    em vez de passar pelo trigger linha a linha.
+    """
+    rows_by_guild = {}
+    for row in rows:
+        rows_by_guild.setdefault(row[0], []).append(row)
+    if not rows_by_guild:
+        return True
+
+    conn = connect_db()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            numbered = []
+            for guild_id, guild_rows in rows_by_guild.items():
+                last_case_no = cursor.execute(
+                    "INSERT INTO guild_counters (guild_id, last_case_no) VALUES (?, ?) "
+                    "ON CONFLICT(guild_id) DO UPDATE SET last_case_no = last_case_no + excluded.last_case_no RETURNING last_case_no",
+                    (guild_id, len(guild_rows))
+                ).fetchone()[0]
+                first_case_no = last_case_no - len(guild_rows) + 1
+                numbered.extend((*row, first_case_no + i) for i, row in enumerate(guild_rows))
+            cursor.executemany(
+                "INSERT INTO moderation_logs (guild_id, action, target_id, moderator_id, reason, duration, case_no) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                numbered
+            )
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            conn.rollback()
+            logging.error(f"Erro ao registrar {len(rows)} ações de moderação em lote: {e}", exc_info=True)
+            return False
+        finally:
+            conn.close()
+    return False
+
+def insert_ticket_transcript(row, attachments, index_rows, chunk_size=500):
+    """
+    Registra uma transcrição arquivada numa única transação e retorna o transcript_id (ou None em caso de erro).
+    row: (ticket_id, guild_id, channel_id, message_id, message_count, html_sha256, text_sha256).
+    attachments: [(filename, sha256, size)]. index_rows: iterável de (author, content) para o índice FTS5,
+    consumido em blocos de `chunk_size` (pode ser um gerador lendo de arquivo).
+    """
+    conn = connect_db()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO ticket_transcripts (ticket_id, guild_id, channel_id, message_id, message_count, html_sha256, text_sha256) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            transcript_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO transcript_attachments (transcript_id, filename, sha256, size) VALUES (?, ?, ?, ?)",
+                [(transcript_id, *attachment) for attachment in attachments]
+            )
+            chunk = []
+            for author, content in index_rows:
+                chunk.append((author, content, transcript_id))
+                if len(chunk) >= chunk_size:
+                    cursor.executemany("INSERT INTO ticket_transcripts_fts (author, content, transcript_id) VALUES (?, ?, ?)", chunk)
+                    chunk = []
+            if chunk:
+                cursor.executemany("INSERT INTO ticket_transcripts_fts (author, content, transcript_id) VALUES (?, ?, ?)", chunk)
+            conn.commit()
+            return transcript_id
+        except sqlite3.Error as e:
+            conn.rollback()
+            logging.error(f"Erro ao registrar a transcrição do ticket {row[0]}: {e}", exc_info=True)
+            return None
+        finally:
+            conn.close()
+    return None
+
+def iterate_query(query, params=(), chunk_size=1000):
+    """
+    Gera o resultado de uma query em blocos de até `chunk_size` linhas (fetchmany),
+    sem carregar o resultado inteiro na memória. Usa uma conexão própria, fechada ao fim da iteração.
+    """
+    conn = connect_db()
+    if not conn:
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    except sqlite3.Error as e:
+        logging.error(f"Erro ao iterar query '{query}' com params {params}: {e}", exc_info=True)
+        raise
+    finally:
+        conn.close()
\ No newline at end of file
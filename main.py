@@ -11,6 +11,9 @@ from flask import Flask
 # Importa as configurações e o banco de dados
 from config import DISCORD_BOT_TOKEN, COMMAND_PREFIX, TEST_GUILD_ID, DISCORD_BOT_APPLICATION_ID
 from database import init_db 
+from utils.persistent_views import PersistentViewRegistry
+from utils.user_cache import UserResolver
+from utils.channel_index import SendableChannelIndex
 
 # Configurações de logging para o bot
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
@@ -32,6 +35,14 @@ class MyBot(commands.Bot):
         
         self.TEST_GUILD_ID = TEST_GUILD_ID 
 
+        # Registro central das views persistentes (painéis de raid, lockdown, tickets...)
+        self.persistent_views = PersistentViewRegistry(self)
+        # Cache compartilhado de nomes de usuários para listagens (logs, advertências, casais...)
+        self.user_resolver = UserResolver(self)
+        # Índice de canais onde o bot pode enviar mensagens, usado pelos seletores de canal
+        self.channel_index = SendableChannelIndex(self)
+        self.channel_index.register()
+
         self.initial_extensions = []
         self.load_cogs_from_folders()
 
@@ -47,9 +58,9 @@ class MyBot(commands.Bot):
         cogs_to_load_ordered = [
             ("owner", ["owner_commands"]),
             ("logs", ["log_system"]), # Remova ou comente se não tiver 'cogs/logs/log_system.py'
-            ("moderation", ["moderation_commands", "lockdown_core", "lockdown_panel"]), # Coloque core antes do panel
-            ("events", ["raid_protection", "welcome_leave", "event_listeners"]),
-            ("utility", ["ticket_system", "embed_creator", "backup_commands", "say_command", "utility_commands"]),
+            ("moderation", ["moderation_commands", "mass_actions", "temp_actions", "purge_command", "ban_sync", "automod", "lockdown_core", "lockdown_panel"]), # Coloque core antes do panel
+            ("events", ["raid_protection", "welcome_leave", "event_listeners", "audit_log_ingester"]),
+            ("utility", ["ticket_system", "embed_creator", "backup_commands", "export_commands", "say_command", "utility_commands"]),
             ("diversion", ["diversion_commands", "hug_command", "marriage_system"]),
         ]
 
@@ -81,6 +92,9 @@ class MyBot(commands.Bot):
                 logging.info(f"Cog '{extension}' carregado com sucesso.")
             except Exception as e:
                 logging.error(f"Falha ao carregar cog '{extension}': {e}", exc_info=True)
+
+        # Restaura todos os painéis registrados pelos cogs assim que o bot estiver pronto
+        self.persistent_views.start()
         
         logging.info("Sincronizando comandos de barra...")
         if self.TEST_GUILD_ID:
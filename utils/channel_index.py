@@ -0,0 +1,107 @@
+# utils/channel_index.py
+import discord
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SendableChannelIndex:
+    """
+    Índice, por guild, dos canais de texto onde o bot pode enviar mensagens.
+
+    É montado na primeira consulta de cada guild (um único passe de permissions_for) e depois mantido
+    pelos eventos on_guild_channel_* e de cargos/membro do próprio bot, então abrir um seletor de canal
+    não recalcula permissões de todos os canais. A lista ordenada é guardada até a próxima mudança.
+    """
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self._channels: dict[int, dict[int, tuple[int, int, str]]] = {} # guild_id -> {channel_id: (pos. categoria, posição, nome)}
+        self._sorted: dict[int, list[tuple[int, str]]] = {} # guild_id -> [(channel_id, nome)] na ordem da lista de canais
+
+    def register(self):
+        """Conecta os listeners de eventos ao bot."""
+        for event in ("on_guild_channel_create", "on_guild_channel_update", "on_guild_channel_delete",
+                      "on_guild_role_update", "on_guild_role_delete", "on_member_update", "on_guild_remove"):
+            self.bot.add_listener(getattr(self, event), event)
+
+    @staticmethod
+    def _sort_key(channel: discord.TextChannel) -> tuple[int, int, str]:
+        return (channel.category.position if channel.category else -1, channel.position, channel.name)
+
+    @staticmethod
+    def _is_sendable(channel: discord.abc.GuildChannel) -> bool:
+        return isinstance(channel, discord.TextChannel) and channel.permissions_for(channel.guild.me).send_messages
+
+    def _build(self, guild: discord.Guild) -> dict[int, tuple[int, int, str]]:
+        entries = {channel.id: self._sort_key(channel) for channel in guild.text_channels if self._is_sendable(channel)}
+        self._channels[guild.id] = entries
+        logger.debug(f"Índice de canais da guild {guild.id} montado: {len(entries)} canais.")
+        return entries
+
+    def channels(self, guild: discord.Guild) -> list[tuple[int, str]]:
+        """Canais onde o bot pode enviar mensagens, como (channel_id, nome), na ordem da lista de canais."""
+        cached = self._sorted.get(guild.id)
+        if cached is not None:
+            return cached
+        entries = self._channels.get(guild.id)
+        if entries is None:
+            entries = self._build(guild)
+        ordered = [(channel_id, key[2]) for channel_id, key in sorted(entries.items(), key=lambda item: item[1])]
+        self._sorted[guild.id] = ordered
+        return ordered
+
+    def search(self, guild: discord.Guild, query: str) -> list[tuple[int, str]]:
+        query = query.lower().lstrip("#")
+        return [entry for entry in self.channels(guild) if query in entry[1].lower()]
+
+    def invalidate(self, guild_id: int):
+        self._channels.pop(guild_id, None)
+        self._sorted.pop(guild_id, None)
+
+    def _refresh_channel(self, channel: discord.abc.GuildChannel):
+        entries = self._channels.get(channel.guild.id)
+        if entries is None:
+            return # Guild ainda não indexada: será montada na próxima consulta
+        if self._is_sendable(channel):
+            entries[channel.id] = self._sort_key(channel)
+        else:
+            entries.pop(channel.id, None)
+        self._sorted.pop(channel.guild.id, None)
+
+    # --- Eventos ---
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self._refresh_channel(channel)
+
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if isinstance(after, discord.CategoryChannel):
+            # Mudanças numa categoria afetam a ordem e, se sincronizados, as permissões dos canais filhos
+            self.invalidate(after.guild.id)
+        else:
+            self._refresh_channel(after)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        entries = self._channels.get(channel.guild.id)
+        if entries is not None and entries.pop(channel.id, None) is not None:
+            self._sorted.pop(channel.guild.id, None)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        # Só importa se o cargo é do bot (ou @everyone) e suas permissões mudaram
+        if before.permissions != after.permissions and (after.is_default() or after in after.guild.me.roles):
+            self.invalidate(after.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.invalidate(role.guild.id)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.id == self.bot.user.id and before.roles != after.roles:
+            self.invalidate(after.guild.id)
+
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.invalidate(guild.id)
+
+
+def channel_page(entries: list[tuple[int, str]], page: int, page_size: int = 25) -> tuple[list[tuple[int, str]], int, int]:
+    """Retorna (itens da página, página ajustada, total de páginas)."""
+    pages = max(1, -(-len(entries) // page_size))
+    page = min(max(page, 0), pages - 1)
+    return entries[page * page_size:(page + 1) * page_size], page, pages
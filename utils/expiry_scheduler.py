@@ -0,0 +1,100 @@
+# utils/expiry_scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryScheduler:
+    """
+    Agendador único para expirações (ex: fim de lockdowns temporários).
+    Em vez de uma task dormindo por item, mantém um min-heap de (timestamp, chave) e uma única
+    corrotina que dorme apenas até o próximo vencimento, acordando antes se algo mais cedo for agendado.
+
+    - schedule(key, when): O(log n). Reagendar a mesma chave substitui o vencimento anterior.
+    - cancel(key): O(1); a entrada antiga no heap é descartada quando chega ao topo (remoção preguiçosa).
+    - callback(key) é chamado para cada chave vencida; chaves vencidas juntas são processadas em paralelo.
+    """
+    def __init__(self, callback: Callable[[Hashable], Awaitable[Any]], name: str = "expiry"):
+        self.callback = callback
+        self.name = name
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._deadlines: dict[Hashable, float] = {} # Vencimento atual de cada chave ativa
+        self._counter = itertools.count() # Desempate estável no heap
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable):
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, when: float):
+        """Agenda (ou reagenda) `key` para o timestamp Unix `when`."""
+        self._deadlines[key] = when
+        heapq.heappush(self._heap, (when, next(self._counter), key))
+        if self._heap[0][2] == key and self._heap[0][0] == when:
+            self._wakeup.set() # O novo item é o próximo: acorda o loop para recalcular a espera
+
+    def cancel(self, key: Hashable) -> bool:
+        removed = self._deadlines.pop(key, None) is not None
+        if removed and len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+        return removed
+
+    def _compact(self):
+        """Reconstrói o heap sem as entradas canceladas/substituídas."""
+        self._heap = [entry for entry in self._heap if self._deadlines.get(entry[2]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _pop_due(self, now: float) -> list[Hashable]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == when: # Ignora entradas canceladas ou reagendadas
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    async def _run_callback(self, key: Hashable):
+        try:
+            await self.callback(key)
+        except Exception as e:
+            logger.error(f"Erro ao processar expiração '{key}' do agendador '{self.name}': {e}", exc_info=True)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            # Descarta do topo as entradas obsoletas antes de calcular a espera
+            while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self._pop_due(time.time())
+            if due:
+                await asyncio.gather(*(self._run_callback(key) for key in due))
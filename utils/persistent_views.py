@@ -0,0 +1,159 @@
+# utils/persistent_views.py
+import discord
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Sequence
+
+from database import execute_query
+
+logger = logging.getLogger(__name__)
+
+# Quantas restaurações de painel podem chamar a API ao mesmo tempo
+DEFAULT_CONCURRENCY = 20
+# Limite de parâmetros por DELETE/UPDATE em lote (o SQLite aceita no máximo 999 em versões antigas)
+CLEANUP_CHUNK_SIZE = 500
+
+
+class PanelType:
+    """
+    Descreve um tipo de painel persistente (raid, lockdown, ticket...).
+
+    - load_rows: retorna as linhas do DB; cada linha começa com (guild_id, channel_id, message_id)
+      e pode trazer colunas extras, repassadas para on_restore.
+    - make_view: cria a view do painel a partir do guild_id.
+    - cleanup_query: query com `{placeholders}` no lugar da lista de guild_ids, usada para limpar linhas obsoletas.
+    - on_cleanup: alternativa a cleanup_query, chamada com a lista de guild_ids obsoletos; para cogs que mantêm
+      um índice em memória das linhas e precisam removê-las pelo próprio índice.
+    - per_message: se True, a view é registrada por mensagem (views com estado por guild).
+      Se False, uma única instância com custom_ids fixos atende todas as mensagens.
+    - on_restore: corrotina opcional (view, channel, row) chamada para atualizar a mensagem;
+      deve retornar False se a mensagem não existe mais (a linha será limpa).
+    """
+    def __init__(self, name: str, load_rows: Callable[[], Sequence[tuple]], make_view: Callable[[Optional[int]], discord.ui.View],
+                 cleanup_query: Optional[str] = None, per_message: bool = False,
+                 on_restore: Optional[Callable[[discord.ui.View, discord.TextChannel, tuple], Awaitable[bool]]] = None,
+                 on_cleanup: Optional[Callable[[list[int]], None]] = None):
+        if (cleanup_query is None) == (on_cleanup is None):
+            raise ValueError(f"Painel '{name}': informe exatamente um entre cleanup_query e on_cleanup.")
+        self.name = name
+        self.load_rows = load_rows
+        self.make_view = make_view
+        self.cleanup_query = cleanup_query
+        self.per_message = per_message
+        self.on_restore = on_restore
+        self.on_cleanup = on_cleanup
+
+
+class PersistentViewRegistry:
+    """
+    Registro central das views persistentes do bot.
+    Cada cog registra seu tipo de painel e, após o bot ficar pronto, todos os painéis são
+    restaurados concorrentemente (com paralelismo limitado), buscando canais primeiro no cache
+    e removendo do DB, em lote, as linhas que apontam para guilds/canais/mensagens que não existem mais.
+    """
+    def __init__(self, bot, concurrency: int = DEFAULT_CONCURRENCY):
+        self.bot = bot
+        self.concurrency = concurrency
+        self._panels: dict[str, PanelType] = {}
+        self._restored = False
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, panel: PanelType):
+        """Registra (ou substitui) um tipo de painel. Se a restauração inicial já ocorreu, restaura-o imediatamente."""
+        self._panels[panel.name] = panel
+        logger.info(f"Tipo de painel persistente '{panel.name}' registrado.")
+        if self._restored:
+            asyncio.get_running_loop().create_task(self._restore_panel_type(panel, asyncio.Semaphore(self.concurrency)))
+
+    def unregister(self, name: str):
+        self._panels.pop(name, None)
+
+    def start(self):
+        """Agenda a restauração de todos os painéis para quando o bot estiver pronto (executa apenas uma vez)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._restore_when_ready())
+
+    async def _restore_when_ready(self):
+        await self.bot.wait_until_ready()
+        await self.restore_all()
+
+    async def restore_all(self):
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        panels = list(self._panels.values())
+        results = await asyncio.gather(
+            *(self._restore_panel_type(panel, semaphore) for panel in panels),
+            return_exceptions=True
+        )
+        self._restored = True
+
+        for panel, result in zip(panels, results):
+            if isinstance(result, Exception):
+                logger.error(f"Erro ao restaurar painéis '{panel.name}': {result}", exc_info=result)
+        logger.info(f"Restauração de painéis persistentes concluída em {time.perf_counter() - started:.2f}s.")
+
+    async def _restore_panel_type(self, panel: PanelType, semaphore: asyncio.Semaphore):
+        rows = panel.load_rows() or []
+        if not panel.per_message:
+            self.bot.add_view(panel.make_view(None))
+
+        statuses = await asyncio.gather(*(self._restore_row(panel, row, semaphore) for row in rows))
+
+        stale_guild_ids = [row[0] for row, status in zip(rows, statuses) if status == "stale"]
+        restored = statuses.count("ok")
+        failed = statuses.count("error")
+        if stale_guild_ids:
+            self._cleanup(panel, stale_guild_ids)
+        logger.info(f"Painéis '{panel.name}': {restored} restaurados, {len(stale_guild_ids)} obsoletos removidos, {failed} com erro.")
+
+    async def _restore_row(self, panel: PanelType, row: tuple, semaphore: asyncio.Semaphore) -> str:
+        guild_id, channel_id, message_id = row[0], row[1], row[2]
+        if channel_id is None or message_id is None:
+            return "stale"
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            logger.warning(f"Guild {guild_id} não encontrada para painel persistente '{panel.name}'.")
+            return "stale"
+        if guild.unavailable:
+            return "error" # Indisponível temporariamente (outage); não apaga a configuração
+
+        try:
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                # Só chama a API se o canal não estiver no cache
+                async with semaphore:
+                    channel = await guild.fetch_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                logger.warning(f"Canal {channel_id} do painel '{panel.name}' não é de texto na guild {guild_id}.")
+                return "stale"
+
+            view = panel.make_view(guild_id) if panel.per_message else None
+            if view is not None:
+                self.bot.add_view(view, message_id=message_id)
+
+            if panel.on_restore:
+                async with semaphore:
+                    if await panel.on_restore(view, channel, row) is False:
+                        return "stale"
+            return "ok"
+        except discord.NotFound:
+            logger.warning(f"Canal {channel_id} ou mensagem {message_id} do painel '{panel.name}' não encontrado na guild {guild_id}.")
+            return "stale"
+        except discord.Forbidden:
+            logger.error(f"Bot sem permissão para acessar o canal {channel_id} do painel '{panel.name}' na guild {guild_id}.")
+            return "error"
+        except Exception as e:
+            logger.error(f"Erro inesperado ao restaurar painel '{panel.name}' na guild {guild_id}: {e}", exc_info=True)
+            return "error"
+
+    def _cleanup(self, panel: PanelType, guild_ids: list[int]):
+        """Remove/limpa as linhas obsoletas em lotes, em vez de uma query por guild."""
+        if panel.on_cleanup:
+            panel.on_cleanup(guild_ids)
+            return
+        for start in range(0, len(guild_ids), CLEANUP_CHUNK_SIZE):
+            chunk = guild_ids[start:start + CLEANUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            execute_query(panel.cleanup_query.format(placeholders=placeholders), tuple(chunk))
@@ -0,0 +1,97 @@
+# utils/rate_limit.py
+import discord
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket assíncrono: no máximo `rate` operações a cada `per` segundos, com rajadas de até `burst`.
+    Usado para espalhar chamadas à API do Discord em operações em massa, em vez de dispará-las todas de uma vez
+    e esbarrar no limite global (50 req/s) ou nos limites por rota.
+    """
+    def __init__(self, rate: float, per: float = 1.0, burst: Optional[int] = None):
+        self.rate = rate
+        self.per = per
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock: # Os pedidos são atendidos em ordem de chegada
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+    def pause(self, seconds: float):
+        """Suspende todas as aquisições por `seconds` (ex: ao receber um 429 com retry_after)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Retorna quanto esperar antes de tentar de novo, ou None se o erro não for transitório."""
+    if isinstance(error, discord.HTTPException):
+        if error.status == 429:
+            return getattr(error, "retry_after", None) or 2 ** attempt
+        if error.status >= 500:
+            return 2 ** attempt
+    return None
+
+
+async def run_limited(items: Iterable[Any], action: Callable[[Any], Awaitable[Any]], *, concurrency: int = 8,
+                      limiter: Optional[RateLimiter] = None, retries: int = 3,
+                      on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> list[tuple[Any, Any]]:
+    """
+    Executa `action(item)` para cada item concorrentemente, com no máximo `concurrency` chamadas em andamento
+    e respeitando o `limiter`. Erros transitórios (429/5xx) são repetidos com backoff.
+    Retorna uma lista de (item, resultado) na ordem original; em caso de falha, o resultado é a exceção.
+    `on_progress(concluídos, total)` é chamado após cada item.
+    """
+    items = list(items)
+    total = len(items)
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+
+    async def run_one(item):
+        nonlocal done
+        async with semaphore:
+            attempt = 0
+            while True:
+                if limiter:
+                    await limiter.acquire()
+                try:
+                    result = await action(item)
+                    break
+                except Exception as e:
+                    delay = _retry_delay(e, attempt)
+                    if delay is None or attempt >= retries:
+                        result = e
+                        break
+                    attempt += 1
+                    if limiter and isinstance(e, discord.HTTPException) and e.status == 429:
+                        limiter.pause(delay)
+                    logger.warning(f"Erro transitório ({e}); nova tentativa {attempt}/{retries} em {delay:.1f}s.")
+                    await asyncio.sleep(delay)
+        done += 1
+        if on_progress:
+            try:
+                await on_progress(done, total)
+            except Exception as e:
+                logger.error(f"Erro no callback de progresso: {e}", exc_info=True)
+        return item, result
+
+    return await asyncio.gather(*(run_one(item) for item in items))
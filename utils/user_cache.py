@@ -0,0 +1,117 @@
+# utils/user_cache.py
+import discord
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Quanto tempo um nome resolvido fica em cache (usuários que saíram raramente mudam de nome)
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+# Usuários inexistentes (NotFound) são lembrados por menos tempo
+NOT_FOUND_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_SIZE = 10000
+# Quantos fetch_user podem rodar ao mesmo tempo
+DEFAULT_CONCURRENCY = 8
+
+
+class UserResolver:
+    """
+    Resolve IDs de usuários em nomes para listagens (logs, advertências, casais...).
+
+    Para cada listagem, todos os IDs são resolvidos de uma vez: primeiro pelos membros da guild e
+    pelo cache do discord.py, depois por um cache TTL/LRU próprio; só o que sobra vai para a API,
+    em paralelo e com concorrência limitada. Buscas do mesmo ID em andamento são compartilhadas.
+    """
+    def __init__(self, bot: discord.Client, ttl: float = DEFAULT_TTL_SECONDS, max_size: int = DEFAULT_MAX_SIZE,
+                 concurrency: int = DEFAULT_CONCURRENCY):
+        self.bot = bot
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: OrderedDict[int, tuple[Optional[str], float]] = OrderedDict() # user_id -> (nome ou None, expira_em)
+        self._inflight: dict[int, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def _cache_get(self, user_id: int, now: float) -> tuple[bool, Optional[str]]:
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        name, expires_at = entry
+        if expires_at <= now:
+            del self._cache[user_id]
+            return False, None
+        self._cache.move_to_end(user_id)
+        return True, name
+
+    def _cache_set(self, user_id: int, name: Optional[str], ttl: float):
+        self._cache[user_id] = (name, time.monotonic() + ttl)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self._cache.pop(user_id, None)
+
+    async def _fetch(self, user_id: int) -> Optional[str]:
+        async with self._semaphore:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                self._cache_set(user_id, None, NOT_FOUND_TTL_SECONDS)
+                return None
+            except discord.HTTPException as e:
+                logger.warning(f"Não foi possível buscar o usuário {user_id}: {e}")
+                return None # Erro transitório: não guarda em cache
+        name = user.display_name
+        self._cache_set(user_id, name, self.ttl)
+        return name
+
+    async def _fetch_shared(self, user_id: int) -> Optional[str]:
+        future = self._inflight.get(user_id)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(user_id))
+            self._inflight[user_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        return await asyncio.shield(future)
+
+    async def resolve_many(self, user_ids: Iterable[int], guild: Optional[discord.Guild] = None) -> dict[int, Optional[str]]:
+        """
+        Retorna {user_id: nome} para todos os IDs (None para usuários que não existem mais).
+        Membros da guild usam o apelido no servidor.
+        """
+        names: dict[int, Optional[str]] = {}
+        misses: list[int] = []
+        now = time.monotonic()
+        for user_id in dict.fromkeys(user_ids): # Remove duplicados mantendo a ordem
+            if user_id is None:
+                continue
+            member = guild.get_member(user_id) if guild else None
+            if member:
+                names[user_id] = member.display_name
+                continue
+            user = self.bot.get_user(user_id)
+            if user:
+                names[user_id] = user.display_name
+                self._cache_set(user_id, user.display_name, self.ttl)
+                continue
+            found, name = self._cache_get(user_id, now)
+            if found:
+                names[user_id] = name
+            else:
+                misses.append(user_id)
+
+        if misses:
+            results = await asyncio.gather(*(self._fetch_shared(user_id) for user_id in misses))
+            names.update(zip(misses, results))
+            logger.debug(f"UserResolver: {len(names) - len(misses)} IDs do cache, {len(misses)} buscados na API.")
+        return names
+
+    @staticmethod
+    def label(user_id: int, names: dict[int, Optional[str]]) -> str:
+        """Texto para exibir um usuário numa listagem: nome + menção, ou só o ID se não foi possível resolver."""
+        name = names.get(user_id)
+        if name:
+            return f"{discord.utils.escape_markdown(name)} (<@{user_id}>)"
+        return f"Usuário Desconhecido (ID: {user_id})"
@@ -0,0 +1,100 @@
+# utils/word_filter.py
+import re
+from typing import Iterable, Optional
+
+# Tamanho máximo de um termo bloqueado (evita padrões gigantes e recursão profunda na trie)
+MAX_TERM_LENGTH = 100
+
+_DOMAIN_RE = re.compile(r"^[a-z0-9-]+(?:\.[a-z0-9-]+)+$")
+
+
+def normalize_word(term: str) -> Optional[str]:
+    """Normaliza uma palavra/frase bloqueada (minúsculas, espaços colapsados)."""
+    term = " ".join(term.lower().split())
+    if not term or len(term) > MAX_TERM_LENGTH:
+        return None
+    return term
+
+
+def normalize_domain(domain: str) -> Optional[str]:
+    """
+    Normaliza um domínio bloqueado. Aceita URLs completas (ex: 'https://www.site.com/x')
+    e devolve apenas o host ('site.com'), ou None se o valor não for um domínio válido.
+    """
+    domain = domain.strip().lower()
+    domain = re.sub(r"^[a-z][a-z0-9+.-]*://", "", domain) # Remove o esquema (http://, https://...)
+    domain = re.split(r"[/?#:]", domain, maxsplit=1)[0]
+    if domain.startswith("www."):
+        domain = domain[4:]
+    domain = domain.strip(".")
+    if not domain or len(domain) > MAX_TERM_LENGTH or not _DOMAIN_RE.match(domain):
+        return None
+    return domain
+
+
+def _build_trie(terms: Iterable[str]) -> dict:
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {} # Marca o fim de um termo
+    return trie
+
+
+def _trie_to_pattern(node: dict) -> str:
+    """
+    Converte a trie em uma regex onde prefixos comuns são compartilhados.
+    Como cada ramo começa com um caractere diferente, o motor de regex descarta
+    os ramos que não casam logo no primeiro caractere, em vez de testar cada termo.
+    O espaço (único, após normalize_word) casa com qualquer sequência de espaços ou quebras de linha.
+    """
+    is_end = "" in node
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_to_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not is_end:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if is_end else pattern
+
+
+class CompiledFilter:
+    """
+    Lista de palavras e domínios bloqueados de uma guild compilada em uma única regex.
+    Uma mensagem é verificada com uma única passada (`search`), independentemente do tamanho da lista.
+    """
+    __slots__ = ("pattern", "word_count", "domain_count")
+
+    def __init__(self, words: Iterable[str], domains: Iterable[str]):
+        words = sorted(set(words))
+        domains = sorted(set(domains))
+        self.word_count = len(words)
+        self.domain_count = len(domains)
+
+        alternatives = []
+        if words:
+            # Palavras casam apenas inteiras (não bloqueia 'classe' por causa de 'ass')
+            alternatives.append(r"(?P<word>(?<!\w)" + _trie_to_pattern(_build_trie(words)) + r"(?!\w))")
+        if domains:
+            # Domínios casam também com subdomínios (ex: 'discord.gg' bloqueia 'www.discord.gg/abc')
+            alternatives.append(
+                r"(?P<domain>(?<![\w.-])(?:[\w-]+\.)*" + _trie_to_pattern(_build_trie(domains)) + r"(?![\w-]|\.[\w-]))"
+            )
+        self.pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def __len__(self) -> int:
+        return self.word_count + self.domain_count
+
+    def search(self, content: str) -> Optional[tuple[str, str]]:
+        """Retorna (tipo, trecho) do primeiro termo bloqueado encontrado, ou None."""
+        if not self.pattern or not content:
+            return None
+        match = self.pattern.search(content)
+        if not match:
+            return None
+        kind = match.lastgroup
+        return kind, match.group(kind)